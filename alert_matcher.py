@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# alert_matcher.py
+# Fetch active NWS alerts once per state or zone and match facilities to them locally
+
+import math
+from collections import defaultdict
+
+from nws_client import NWS_API_BASE, RunCache, nws_get_json
+from zone_cache import get_zone_cache, zone_id_from_url
+
+# Grid bucket size (degrees) for the alert polygon index
+GRID_CELL_DEGREES = 0.5
+
+# Region names used in configuration.py mapped to NWS area codes
+STATE_CODES = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
+    "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "District of Columbia": "DC",
+    "Florida": "FL", "Georgia": "GA", "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL",
+    "Indiana": "IN", "Iowa": "IA", "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA",
+    "Maine": "ME", "Maryland": "MD", "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN",
+    "Mississippi": "MS", "Missouri": "MO", "Montana": "MT", "Nebraska": "NE", "Nevada": "NV",
+    "New Hampshire": "NH", "New Jersey": "NJ", "New Mexico": "NM", "New York": "NY",
+    "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH", "Oklahoma": "OK", "Oregon": "OR",
+    "Pennsylvania": "PA", "Puerto Rico": "PR", "Rhode Island": "RI", "South Carolina": "SC",
+    "South Dakota": "SD", "Tennessee": "TN", "Texas": "TX", "Utah": "UT", "Vermont": "VT",
+    "Virginia": "VA", "Washington": "WA", "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY",
+}
+
+def get_area_code(region):
+    """Return the NWS area code for a configured region, or None if unknown"""
+    if not region:
+        return None
+    if region.upper() in STATE_CODES.values():
+        return region.upper()
+    return STATE_CODES.get(region.strip().title())
+
+def _point_in_ring(lon, lat, ring):
+    """Ray casting test for one closed [lon, lat] ring"""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > lat) != (yj > lat):
+            x_cross = (xj - xi) * (lat - yi) / (yj - yi) + xi
+            if lon < x_cross:
+                inside = not inside
+        j = i
+    return inside
+
+def point_in_geometry(lon, lat, geometry):
+    """Check whether a point falls inside a GeoJSON Polygon or MultiPolygon"""
+    if not geometry:
+        return False
+
+    if geometry.get('type') == 'Polygon':
+        polygons = [geometry.get('coordinates', [])]
+    elif geometry.get('type') == 'MultiPolygon':
+        polygons = geometry.get('coordinates', [])
+    else:
+        return False
+
+    for rings in polygons:
+        if not rings:
+            continue
+        # First ring is the outline, any others are holes
+        if _point_in_ring(lon, lat, rings[0]) and not any(_point_in_ring(lon, lat, hole) for hole in rings[1:]):
+            return True
+    return False
+
+def _geometry_bbox(geometry):
+    """Return (min_lon, min_lat, max_lon, max_lat) of a polygon geometry"""
+    if geometry.get('type') == 'Polygon':
+        polygons = [geometry.get('coordinates', [])]
+    else:
+        polygons = geometry.get('coordinates', [])
+
+    points = [point for rings in polygons for ring in rings[:1] for point in ring]
+    if not points:
+        return None
+    lons = [p[0] for p in points]
+    lats = [p[1] for p in points]
+    return min(lons), min(lats), max(lons), max(lats)
+
+def alert_zone_ids(alert):
+    """All zone and county IDs an alert applies to"""
+    props = alert.get('properties', {})
+    zones = set(props.get('geocode', {}).get('UGC', []))
+    zones.update(zone_id_from_url(url) for url in props.get('affectedZones', []))
+    zones.discard(None)
+    return zones
+
+class AlertIndex:
+    """Grid-bucket spatial index over one area's active alerts
+
+    Alerts with polygons are registered in every grid cell their bounding
+    box touches. Alerts without geometry are matched by zone ID instead.
+    """
+
+    def __init__(self, alerts, cell_size=GRID_CELL_DEGREES):
+        self.alerts = list(alerts)
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+        self._bboxes = {}
+        self._zone_alerts = defaultdict(list)
+
+        for i, alert in enumerate(self.alerts):
+            geometry = alert.get('geometry')
+            bbox = _geometry_bbox(geometry) if geometry else None
+
+            if bbox:
+                self._bboxes[i] = bbox
+                min_lon, min_lat, max_lon, max_lat = bbox
+                for cx in range(self._cell(min_lon), self._cell(max_lon) + 1):
+                    for cy in range(self._cell(min_lat), self._cell(max_lat) + 1):
+                        self._cells[(cx, cy)].append(i)
+            else:
+                for zone_id in alert_zone_ids(alert):
+                    self._zone_alerts[zone_id].append(i)
+
+    def _cell(self, degrees):
+        return int(math.floor(degrees / self.cell_size))
+
+    @property
+    def has_zone_only_alerts(self):
+        """True if some alerts can only be matched by zone ID"""
+        return bool(self._zone_alerts)
+
+    def match(self, lat, lon, zone_ids=()):
+        """Return the alerts covering a point, in feed order"""
+        matched = set()
+
+        for i in self._cells.get((self._cell(lon), self._cell(lat)), []):
+            min_lon, min_lat, max_lon, max_lat = self._bboxes[i]
+            if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+                continue
+            if point_in_geometry(lon, lat, self.alerts[i]['geometry']):
+                matched.add(i)
+
+        for zone_id in zone_ids:
+            matched.update(self._zone_alerts.get(zone_id, []))
+
+        return [self.alerts[i] for i in sorted(matched)]
+
+def fetch_area_alerts(area):
+    """Fetch all active alerts for a state or marine area in one request"""
+    return nws_get_json(f"{NWS_API_BASE}/alerts/active?area={area}", timeout=15).get('features', [])
+
+def fetch_zone_alerts(zone_id):
+    """Fetch active alerts for one forecast zone or county"""
+    return nws_get_json(f"{NWS_API_BASE}/alerts/active/zone/{zone_id}", timeout=15).get('features', [])
+
+class AreaAlertMatcher:
+    """Per-run alert source: one /alerts/active call per area, matched locally"""
+
+    def __init__(self):
+        self._indexes = RunCache(lambda area: AlertIndex(fetch_area_alerts(area)))
+
+    def area_count(self):
+        """Number of areas fetched so far"""
+        return len(self._indexes)
+
+    def alerts_for(self, config):
+        """Return the active alert features for a configured location
+
+        Returns None if the location's region has no known area code, so
+        the caller can fall back to a point query.
+        """
+        area = get_area_code(config.get('region'))
+        if not area:
+            return None
+
+        index = self._indexes.get(area)
+        lat = config['alerts_gps']['lat']
+        lon = config['alerts_gps']['lon']
+
+        # Zone lookups are only needed when the feed has alerts without polygons
+        zone_ids = get_zone_cache().get_zone_ids(lat, lon) if index.has_zone_only_alerts else ()
+        return index.match(lat, lon, zone_ids)
+
+class ZoneAlertMatcher:
+    """Per-run alert source: one /alerts/active/zone call per unique zone
+
+    Each location's forecast zone and county come from the on-disk zone
+    cache, so alert traffic scales with the number of distinct zones rather
+    than the number of facilities.
+    """
+
+    def __init__(self):
+        self._indexes = RunCache(lambda zone_id: AlertIndex(fetch_zone_alerts(zone_id)))
+
+    def zone_count(self):
+        """Number of zones fetched so far"""
+        return len(self._indexes)
+
+    def alerts_for(self, config):
+        """Return the active alert features for a configured location
+
+        Returns None if the location's zones cannot be resolved, so the
+        caller can fall back to a point query.
+        """
+        lat = config['alerts_gps']['lat']
+        lon = config['alerts_gps']['lon']
+
+        try:
+            zones = get_zone_cache().get_zones(lat, lon)
+        except Exception:
+            return None
+
+        zone_ids = [zones.get('forecast'), zones.get('county')]
+        zone_ids = [zone_id for zone_id in zone_ids if zone_id]
+        if not zone_ids:
+            return None
+
+        # Alerts come back from both the zone and county feeds; keep one copy.
+        # Polygon alerts still have to contain the point itself.
+        seen = set()
+        alerts = []
+        all_zone_ids = get_zone_cache().get_zone_ids(lat, lon)
+        for zone_id in zone_ids:
+            for alert in self._indexes.get(zone_id).match(lat, lon, all_zone_ids):
+                alert_key = alert.get('id') or alert.get('properties', {}).get('id')
+                if alert_key in seen:
+                    continue
+                seen.add(alert_key)
+                alerts.append(alert)
+        return alerts
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# alert_registry.py
+# One copy of every NWS alert, keyed by alert ID
+#
+# An alert stays active for hours or days, and its headline used to be
+# stored again in every hourly record. The registry keeps each alert's
+# properties (event, severity, onset, expires, geometry, ...) once in an
+# append-only file; records carry `alert_ids` that point into it.
+
+import hashlib
+import json
+import os
+import threading
+
+ALERT_REGISTRY_FILE = "../raw_weather_json/alert_registry.jsonl"
+
+# Alert properties kept in the registry
+ALERT_FIELDS = ('event', 'headline', 'severity', 'urgency', 'certainty', 'areaDesc',
+                'sent', 'onset', 'expires', 'ends', 'affectedZones')
+
+# Alert texts the collector stores when it could not get alerts
+ALERT_ERROR_PREFIXES = ('Error fetching alerts', 'Unable to retrieve')
+
+def alert_id(feature):
+    """NWS identifier of an alert feature (a local hash if it has none)"""
+    properties = feature.get('properties', {})
+    identifier = properties.get('id') or feature.get('id')
+    if identifier:
+        return identifier
+    text = f"{properties.get('headline')}|{properties.get('sent')}|{properties.get('event')}"
+    return "local:" + hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+def alert_entry(feature):
+    """Registry entry for an alert feature"""
+    properties = feature.get('properties', {})
+    entry = {"id": alert_id(feature)}
+    entry.update({field: properties.get(field) for field in ALERT_FIELDS})
+    entry["geometry"] = feature.get('geometry')
+    return entry
+
+class AlertRegistry:
+    """Alerts by ID, loaded from and appended to ALERT_REGISTRY_FILE
+
+    Each line of the file is one alert entry. An alert is written again
+    only if its properties change (for example a new expiry time); the
+    last line for an ID wins.
+    """
+
+    def __init__(self, path=ALERT_REGISTRY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.alerts = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.alerts[entry['id']] = entry
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def __contains__(self, identifier):
+        return identifier in self.alerts
+
+    def get(self, identifier):
+        return self.alerts.get(identifier)
+
+    def register(self, features):
+        """Record alert features; returns their IDs in the same order"""
+        identifiers = []
+        new_entries = []
+        with self._lock:
+            for feature in features:
+                entry = alert_entry(feature)
+                identifiers.append(entry['id'])
+                if self.alerts.get(entry['id']) != entry:
+                    self.alerts[entry['id']] = entry
+                    new_entries.append(entry)
+
+            if new_entries:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a') as f:
+                    for entry in new_entries:
+                        f.write(json.dumps(entry, separators=(',', ':')) + "\n")
+        return identifiers
+
+    def headline(self, identifier):
+        """Headline of a registered alert (its event name if there is none)"""
+        entry = self.alerts.get(identifier)
+        if entry is None:
+            return None
+        return entry.get('headline') or entry.get('event') or identifier
+
+    def headlines(self, record):
+        """Alert headlines of a location record, from its alert IDs if the text was left out"""
+        if 'alerts' in record:
+            return record['alerts']
+        return [self.headline(identifier) or identifier for identifier in record.get('alert_ids', [])]
+
+def compact_alerts(record):
+    """Drop the repeated headline list from a record that has alert IDs
+
+    Error messages stored in `alerts` (no IDs to point at) are kept.
+    """
+    if 'alert_ids' in record:
+        record.pop('alerts', None)
+    return record
+
+def record_alerts(record, registry=None):
+    """[(alert key, headline, event)] for the alerts in a location record
+
+    Records with `alert_ids` are keyed by ID, with headline and event from
+    the registry (so --compact-alerts records read the same as full ones).
+    Older records are keyed by headline; error texts are skipped.
+    """
+    if 'alert_ids' in record:
+        registry = registry or get_alert_registry()
+        alerts = []
+        for identifier, headline in zip(record['alert_ids'], registry.headlines(record)):
+            entry = registry.get(identifier) or {}
+            alerts.append((identifier, headline, entry.get('event') or headline))
+        return alerts
+    return [(headline, headline, headline) for headline in record.get('alerts', [])
+            if headline and not headline.startswith(ALERT_ERROR_PREFIXES)]
+
+def hazard_alert(hazard, registry=None):
+    """(alert key, headline) of a weather_alert hazard entry, or None
+
+    The key is the hazard's `alert_id` when it has one, as in
+    record_alerts; a hazard without its headline text gets it from the
+    registry.
+    """
+    identifier = hazard.get('alert_id')
+    headline = hazard.get('measurement')
+    if not headline and identifier:
+        headline = (registry or get_alert_registry()).headline(identifier)
+    if not headline:
+        return None
+    return identifier or headline, headline
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_alert_registry():
+    """Return the process-wide alert registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AlertRegistry()
+        return _registry
+
+def main():
+    """List registered alerts"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show the alerts recorded in the alert registry')
+    parser.add_argument('--event', help='Only alerts of this event type (e.g. "Heat Advisory")')
+
+    args = parser.parse_args()
+
+    registry = get_alert_registry()
+    entries = sorted(registry.alerts.values(), key=lambda entry: entry.get('sent') or '')
+    if args.event:
+        entries = [entry for entry in entries if (entry.get('event') or '').lower() == args.event.lower()]
+
+    for entry in entries:
+        print(f"{entry.get('sent') or '':25s} {entry.get('event') or '':30s} {entry.get('headline') or ''}")
+    print(f"\n {len(entries)} of {len(registry)} alert(s) in {registry.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# center_aggregator.py
+# Running per-center daily hazard analysis, updated as each report is saved
+#
+# The collector folds every consolidated report into one small state file
+# per day, so the day's center report is already built when the day ends:
+# "so far today" and the midnight report are both a snapshot of that
+# state, whatever the data volume.
+#
+# Each center's state is the daily analyzer's CenterAccumulator and each
+# record is classified by hazard_rules.detect_hazards (the README Part 7
+# thresholds), so the snapshot has exactly the center report's fields.
+
+import bisect
+import datetime
+import json
+import os
+import threading
+
+from daily_weather_analyzer import CenterAccumulator
+from hazard_rules import analysis_record
+from nws_client import load_json_file, save_json_file
+from report_store import load_saved_reports
+
+AGGREGATE_DIR = "../daily_aggregates"
+AGGREGATE_PREFIX = "center_aggregates_"
+
+HAZARD_DEFINITIONS = 'README Part 7 thresholds (hazard_rules.py)'
+
+class DailyCenterAggregates:
+    """Running center analysis for every center on one day, saved after each update
+
+    State: the collection times of the reports counted and, per location
+    code, the center name and its CenterAccumulator state. A report
+    collected before ones already counted (for example by
+    observation_backfill.py) is folded in like any other; the affected
+    centers put their entries back in time order once, when the state is
+    next read.
+    """
+
+    def __init__(self, day, path=AGGREGATE_DIR):
+        self.day = day
+        self.file_path = os.path.join(path, f"{AGGREGATE_PREFIX}{day}.json")
+        state = load_json_file(self.file_path, None)
+        # State files from before the accumulator was shared have no
+        # 'reports' list and are rebuilt by update_center_aggregates
+        self.outdated = state is not None and 'reports' not in state
+        if state is None or self.outdated:
+            self.clear()
+            return
+        self.state = state
+        self._reports = set(state['reports'])
+        self._accumulators = {location_code: CenterAccumulator.from_state(center['analysis'])
+                              for location_code, center in state['centers'].items()}
+
+    def clear(self):
+        self.state = {'date': self.day, 'reports': [], 'centers': {}}
+        self._reports = set()
+        self._accumulators = {}
+
+    def add_record(self, record):
+        """Fold one successful location record into its center's analysis"""
+        location_code = record.get('location_code')
+        if not location_code or record.get('status') != 'SUCCESS':
+            return
+        if location_code not in self._accumulators:
+            self._accumulators[location_code] = CenterAccumulator()
+            self.state['centers'][location_code] = {
+                'location_name': record.get('location_name') or location_code}
+        self._accumulators[location_code].add(analysis_record(record))
+
+    def add_report(self, report):
+        """Fold in a consolidated report; returns False if it was already counted"""
+        collected = report.get('report_metadata', {}).get('collection_timestamp')
+        if collected and collected in self._reports:
+            return False
+        for record in report.get('location_data', []):
+            self.add_record(record)
+        if collected:
+            self._reports.add(collected)
+            bisect.insort(self.state['reports'], collected)
+        return True
+
+    def last_report(self):
+        return self.state['reports'][-1] if self.state['reports'] else None
+
+    def save(self):
+        for location_code, accumulator in self._accumulators.items():
+            self.state['centers'][location_code]['analysis'] = accumulator.to_state()
+        save_json_file(self.file_path, self.state)
+
+    def center_report(self):
+        """The day's center report (create_center_focused_report fields) as of the last report"""
+        report = {
+            'date': self.day,
+            'analysis_timestamp': datetime.datetime.now().isoformat(),
+            'hazard_definitions': HAZARD_DEFINITIONS,
+            'last_report': self.last_report(),
+            'total_centers': len(self._accumulators),
+            'centers': {}
+        }
+        for location_code, accumulator in self._accumulators.items():
+            report['centers'][self.state['centers'][location_code]['location_name']] = accumulator.result()
+        return report
+
+_update_lock = threading.Lock()
+
+def update_center_aggregates(report, path=AGGREGATE_DIR):
+    """Add a just-saved consolidated report to its day's running state"""
+    collected = report.get('report_metadata', {}).get('collection_timestamp')
+    if not collected:
+        return False
+    with _update_lock:
+        aggregates = DailyCenterAggregates(collected[:10], path)
+        if aggregates.outdated:
+            print(f" Center aggregates for {aggregates.day} are in an older format - rebuilding the day")
+            rebuild_day(aggregates.day, path)
+            return True
+        added = aggregates.add_report(report)
+        if added:
+            aggregates.save()
+    return added
+
+def rebuild_day(day, path=AGGREGATE_DIR):
+    """Recompute one day's state from the saved reports (after a lost file)"""
+    start = datetime.datetime.fromisoformat(day)
+    reports = sorted(load_saved_reports(start, start + datetime.timedelta(days=1)),
+                     key=lambda report: report.get('report_metadata', {}).get('collection_timestamp', ''))
+    aggregates = DailyCenterAggregates(day, path)
+    aggregates.clear()
+    for report in reports:
+        aggregates.add_report(report)
+    aggregates.save()
+    return aggregates
+
+def load_center_report(day, path=AGGREGATE_DIR):
+    """Snapshot of a day's running state as a center report, or None if nothing was aggregated"""
+    aggregates = DailyCenterAggregates(day, path)
+    if aggregates.outdated:
+        aggregates = rebuild_day(day, path)
+    if not aggregates.state['centers']:
+        return None
+    return aggregates.center_report()
+
+def print_running_totals(report):
+    """Print a day's center report so far"""
+    print(f"\nRUNNING HAZARD TOTALS - {report['date']} (through {report['last_report']})")
+    print(f"Hazards: {report['hazard_definitions']}")
+    print("=" * 80)
+
+    for center_name, center in sorted(report['centers'].items(), key=lambda x: x[1]['total_hazards'], reverse=True):
+        print(f"\n📍 {center_name}: {center['total_records']} records, {center['total_hazards']} hazard detections, "
+              f"{center['hours_covered']} hours with hazards")
+        measurements = center['measurements']
+        if measurements['max_heat_index'] is not None:
+            print(f"  Heat Index Range: {measurements['min_heat_index']:.1f}°F - {measurements['max_heat_index']:.1f}°F")
+        if measurements['max_temperature'] is not None:
+            print(f"  Temperature Range: {measurements['min_temperature']:.1f}°F - {measurements['max_temperature']:.1f}°F")
+        for hazard_type, periods in center['hazard_periods'].items():
+            spans = ", ".join(f"{p['start_hour']:02d}-{p['end_hour']:02d}h" for p in periods)
+            print(f"  • {hazard_type.replace('_', ' ').title()}: {center['hazard_summary'][hazard_type]} detections ({spans})")
+        for alert in measurements['alerts_detected']:
+            print(f"  ⚠️  {alert}")
+
+def main():
+    """Show or save the running center report for a day"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Running per-center hazard analysis for a day')
+    parser.add_argument('--date', default=datetime.date.today().isoformat(),
+                        help='Day to show (YYYY-MM-DD, default: today so far)')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute the day from saved reports first')
+    parser.add_argument('--save', action='store_true', help='Save the report as JSON next to the state file')
+
+    args = parser.parse_args()
+
+    if args.rebuild:
+        print(f"Rebuilding aggregates for {args.date} from saved reports...")
+        rebuild_day(args.date)
+
+    report = load_center_report(args.date)
+    if report is None:
+        print(f"No reports have been aggregated for {args.date}")
+        return
+
+    print_running_totals(report)
+
+    if args.save:
+        totals_path = os.path.join(AGGREGATE_DIR, f"running_totals_{args.date}.json")
+        with open(totals_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved: {totals_path}")
+
+if __name__ == "__main__":
+    main()
@@ -7,22 +7,34 @@ import datetime
 import hashlib
 import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def load_analysis_data(date_str):
-    """Load the existing enhanced analysis data"""
-    
-    # Try to find the analysis file
+from alert_registry import hazard_alert
+
+# Characters read at a time by the streaming loader (--stream)
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Days analyzed at the same time for --start/--end and --dates
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+def find_analysis_file(date_str):
+    """Path of the enhanced analysis file for a date, or None"""
     possible_paths = [
         f"daily_analysis/enhanced_analysis_{date_str}.json",
         f"../daily_analysis/enhanced_analysis_{date_str}.json",
         f"enhanced_analysis_{date_str}.json"
     ]
     
-    analysis_file = None
     for path in possible_paths:
         if os.path.exists(path):
-            analysis_file = path
-            break
+            return path
+    return None
+
+def load_analysis_data(date_str):
+    """Load the existing enhanced analysis data"""
+    
+    # Try to find the analysis file
+    analysis_file = find_analysis_file(date_str)
     
     if not analysis_file:
         print(f"Error: Could not find enhanced analysis file for {date_str}")
@@ -31,6 +43,95 @@ def load_analysis_data(date_str):
     with open(analysis_file, 'r') as f:
         return json.load(f)
 
+class _JSONStream:
+    """Reads JSON values one at a time from a file without loading all of it"""
+    
+    def __init__(self, f, chunk_size=STREAM_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+    
+    def _fill(self):
+        """Read another chunk, dropping the part of the buffer already parsed"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+    
+    def peek(self):
+        """Next non-whitespace character ('' at the end of the file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+    
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in analysis file")
+        self.pos += 1
+    
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+def iter_detailed_analysis(path, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield the records of an analysis file's detailed_analysis list one at a time
+    
+    Other top-level sections are parsed and discarded, so memory use does
+    not grow with the number of records.
+    """
+    with open(path, 'r') as f:
+        stream = _JSONStream(f, chunk_size)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            key = stream.value()
+            stream.expect(':')
+            if key == 'detailed_analysis' and stream.peek() == '[':
+                stream.expect('[')
+                if stream.peek() == ']':
+                    stream.expect(']')
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.peek() == ',':
+                            stream.expect(',')
+                            continue
+                        stream.expect(']')
+                        break
+            else:
+                stream.value()
+            
+            if stream.peek() == ',':
+                stream.expect(',')
+                continue
+            stream.expect('}')
+            return
+
 def organize_by_detention_center(analysis_data):
     """Organize all hazards and measurements by detention center"""
     
@@ -45,132 +146,213 @@ def organize_by_detention_center(analysis_data):
     
     return centers
 
-def analyze_center_hazards(center_records):
-    """Analyze hazards for a specific detention center throughout the day"""
-    
-    # Sort records by timestamp to see progression through day
-    sorted_records = sorted(center_records, 
-                          key=lambda x: x.get('analysis_timestamp', ''))
-    
-    # Track hazards throughout the day
-    hazard_timeline = []
-    hazard_summary = defaultdict(int)
-    total_hazards = 0
-    
-    # Track continuous vs intermittent hazards
-    hazard_periods = defaultdict(list)
-    current_hazards = set()
-    
-    for i, record in enumerate(sorted_records):
+class CenterAccumulator:
+    """Single-pass hazard analysis for one detention center
+    
+    Records can be added one at a time, in any order. Records that arrive
+    in time order are folded straight into the hazard timeline, periods
+    and alerts, so result() is only a copy of the running state. A record
+    older than one already folded marks the state for one refold of the
+    small per-record entries (timestamp, hazards, alerts) in time order,
+    done when the state is next read; result() always equals analyzing
+    the full sorted list at once. to_state() / from_state() let the state
+    be saved between records (center_aggregator.py).
+    """
+    
+    # Measurement key -> (raw_measurements field, keep the larger value)
+    EXTREMES = (
+        ('max_heat_index', 'heat_index_f', True),
+        ('min_heat_index', 'heat_index_f', False),
+        ('max_temperature', 'temperature_f', True),
+        ('min_temperature', 'temperature_f', False),
+        ('max_humidity', 'humidity_percent', True),
+        ('max_precipitation', 'precipitation_rate_in_hr', True)
+    )
+    
+    def __init__(self):
+        self.entries = []
+        self.extremes = {}
+        self.needs_refold = False
+        self._clear_folded()
+    
+    def _clear_folded(self):
+        self.hazard_timeline = []
+        self.hazard_summary = {}
+        self.total_hazards = 0
+        self.hazard_periods = {}
+        self.hazard_hours = set()
+        self.current_hazards = []
+        self.alerts_detected = {}
+        self.last_timestamp = None
+        self.folded = 0
+    
+    def add(self, record):
+        """Fold one detailed_analysis record into the running analysis"""
         timestamp = record.get('analysis_timestamp', '')
-        try:
-            dt = datetime.datetime.fromisoformat(timestamp)
-            hour = dt.hour
-        except:
-            hour = i  # fallback to record order
+        # Ties go to the earliest record in time order, as in a sorted pass
+        order = (timestamp, len(self.entries))
         
-        record_hazards = set()
+        raw = record.get('raw_measurements', {})
+        for key, field, larger in self.EXTREMES:
+            value = raw.get(field)
+            if not value:
+                continue
+            current = self.extremes.get(key)
+            if (current is None or (value > current[0] if larger else value < current[0])
+                    or (value == current[0] and order < current[1])):
+                self.extremes[key] = (value, order)
         
+        hazards = []
+        alerts = []
         for hazard in record.get('hazard_analysis', []):
-            hazard_type = hazard['type']
-            hazard_summary[hazard_type] += 1
-            total_hazards += 1
-            record_hazards.add(hazard_type)
+            hazards.append((hazard['type'], hazard['severity'], hazard['description'],
+                            hazard.get('measurement'), hazard.get('risk_level')))
+            if hazard['type'] == 'weather_alert':
+                # Keyed by alert ID when the hazard has one; the headline
+                # comes from the registry if the record left it out
+                alert = hazard_alert(hazard)
+                if alert:
+                    alerts.append(alert)
+        
+        # Empty tuples are shared, so hazard-free records cost almost nothing
+        entry = (timestamp, tuple(hazards), tuple(alerts))
+        self.entries.append(entry)
+        if self.needs_refold:
+            return
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            self.needs_refold = True
+        else:
+            self._fold(entry)
+    
+    def _fold(self, entry):
+        """Add the next entry in time order to the timeline, periods and alerts"""
+        timestamp, hazards, alerts = entry
+        try:
+            hour = datetime.datetime.fromisoformat(timestamp).hour
+        except (TypeError, ValueError):
+            hour = self.folded  # fallback to record order
+        
+        record_hazards = {}
+        
+        for hazard_type, severity, description, measurement, risk_level in hazards:
+            self.hazard_summary[hazard_type] = self.hazard_summary.get(hazard_type, 0) + 1
+            self.total_hazards += 1
+            record_hazards[hazard_type] = True
+            self.hazard_hours.add(hour)
             
             # Track hazard timeline
-            hazard_timeline.append({
+            self.hazard_timeline.append({
                 'hour': hour,
                 'type': hazard_type,
-                'severity': hazard['severity'],
-                'description': hazard['description'],
-                'measurement': hazard.get('measurement'),
-                'risk_level': hazard.get('risk_level'),
+                'severity': severity,
+                'description': description,
+                'measurement': measurement,
+                'risk_level': risk_level,
                 'timestamp': timestamp
             })
         
         # Track continuous periods
         for hazard_type in record_hazards:
-            if hazard_type not in current_hazards:
+            periods = self.hazard_periods.setdefault(hazard_type, [])
+            if hazard_type not in self.current_hazards:
                 # New hazard period starting
-                hazard_periods[hazard_type].append({
+                periods.append({
                     'start_hour': hour,
                     'end_hour': hour,
                     'duration': 1
                 })
             else:
                 # Extend current period
-                if hazard_periods[hazard_type]:
-                    hazard_periods[hazard_type][-1]['end_hour'] = hour
-                    hazard_periods[hazard_type][-1]['duration'] = hour - hazard_periods[hazard_type][-1]['start_hour'] + 1
+                periods[-1]['end_hour'] = hour
+                periods[-1]['duration'] = hour - periods[-1]['start_hour'] + 1
         
-        # Check for hazards that ended
-        for hazard_type in current_hazards - record_hazards:
-            # Hazard ended, finalize the period
-            pass
+        self.current_hazards = list(record_hazards)
         
-        current_hazards = record_hazards
-    
-    # Calculate hazard statistics
-    unique_hazard_types = len(hazard_summary)
-    most_frequent_hazard = max(hazard_summary.items(), key=lambda x: x[1]) if hazard_summary else None
-    
-    # Get key measurements throughout day
-    measurements = {
-        'max_heat_index': None,
-        'min_heat_index': None,
-        'max_temperature': None,
-        'min_temperature': None,
-        'max_humidity': None,
-        'max_precipitation': None,
-        'alerts_detected': []
-    }
-    
-    for record in sorted_records:
-        raw = record.get('raw_measurements', {})
-        
-        # Track temperature and heat index ranges
-        if raw.get('heat_index_f'):
-            hi = raw['heat_index_f']
-            if measurements['max_heat_index'] is None or hi > measurements['max_heat_index']:
-                measurements['max_heat_index'] = hi
-            if measurements['min_heat_index'] is None or hi < measurements['min_heat_index']:
-                measurements['min_heat_index'] = hi
+        # Collect weather alerts
+        for alert_key, alert_text in alerts:
+            self.alerts_detected.setdefault(alert_key, alert_text)
         
-        if raw.get('temperature_f'):
-            temp = raw['temperature_f']
-            if measurements['max_temperature'] is None or temp > measurements['max_temperature']:
-                measurements['max_temperature'] = temp
-            if measurements['min_temperature'] is None or temp < measurements['min_temperature']:
-                measurements['min_temperature'] = temp
+        self.last_timestamp = timestamp
+        self.folded += 1
+    
+    def refold(self):
+        """Put the entries in time order and fold them again (after a late record)"""
+        # A stable sort, so records with the same timestamp keep their order
+        self.entries.sort(key=lambda entry: entry[0])
+        self._clear_folded()
+        for entry in self.entries:
+            self._fold(entry)
+        self.needs_refold = False
+    
+    def result(self):
+        """Hazard analysis of every record added so far"""
+        if self.needs_refold:
+            self.refold()
         
-        if raw.get('humidity_percent'):
-            humidity = raw['humidity_percent']
-            if measurements['max_humidity'] is None or humidity > measurements['max_humidity']:
-                measurements['max_humidity'] = humidity
+        # Calculate hazard statistics
+        most_frequent_hazard = max(self.hazard_summary.items(), key=lambda x: x[1]) if self.hazard_summary else None
         
-        if raw.get('precipitation_rate_in_hr'):
-            precip = raw['precipitation_rate_in_hr']
-            if measurements['max_precipitation'] is None or precip > measurements['max_precipitation']:
-                measurements['max_precipitation'] = precip
+        # Get key measurements throughout day
+        measurements = {key: self.extremes[key][0] if key in self.extremes else None
+                        for key, field, larger in self.EXTREMES}
+        measurements['alerts_detected'] = list(self.alerts_detected.values())
         
-        # Collect weather alerts
-        for hazard in record.get('hazard_analysis', []):
-            if hazard['type'] == 'weather_alert':
-                alert_text = hazard.get('measurement', '')
-                if alert_text and alert_text not in measurements['alerts_detected']:
-                    measurements['alerts_detected'].append(alert_text)
-    
-    return {
-        'total_records': len(sorted_records),
-        'total_hazards': total_hazards,
-        'unique_hazard_types': unique_hazard_types,
-        'hazard_summary': dict(hazard_summary),
-        'most_frequent_hazard': most_frequent_hazard,
-        'hazard_timeline': hazard_timeline,
-        'hazard_periods': dict(hazard_periods),
-        'measurements': measurements,
-        'hours_covered': len(set(h['hour'] for h in hazard_timeline)) if hazard_timeline else 0
-    }
+        return {
+            'total_records': len(self.entries),
+            'total_hazards': self.total_hazards,
+            'unique_hazard_types': len(self.hazard_summary),
+            'hazard_summary': dict(self.hazard_summary),
+            'most_frequent_hazard': most_frequent_hazard,
+            'hazard_timeline': list(self.hazard_timeline),
+            'hazard_periods': {hazard_type: [dict(period) for period in periods]
+                               for hazard_type, periods in self.hazard_periods.items()},
+            'measurements': measurements,
+            'hours_covered': len(self.hazard_hours)
+        }
+    
+    def to_state(self):
+        """JSON-serializable copy of the running state"""
+        return {
+            'entries': self.entries,
+            'extremes': self.extremes,
+            'needs_refold': self.needs_refold,
+            'hazard_timeline': self.hazard_timeline,
+            'hazard_summary': self.hazard_summary,
+            'total_hazards': self.total_hazards,
+            'hazard_periods': self.hazard_periods,
+            'hazard_hours': sorted(self.hazard_hours),
+            'current_hazards': self.current_hazards,
+            'alerts_detected': self.alerts_detected,
+            'last_timestamp': self.last_timestamp,
+            'folded': self.folded
+        }
+    
+    @classmethod
+    def from_state(cls, state):
+        """Accumulator restored from to_state() (after a JSON round trip)"""
+        accumulator = cls()
+        accumulator.entries = [(timestamp, tuple(tuple(hazard) for hazard in hazards),
+                                tuple(tuple(alert) for alert in alerts))
+                               for timestamp, hazards, alerts in state['entries']]
+        accumulator.extremes = {key: (value, tuple(order)) for key, (value, order) in state['extremes'].items()}
+        accumulator.needs_refold = state['needs_refold']
+        accumulator.hazard_timeline = state['hazard_timeline']
+        accumulator.hazard_summary = state['hazard_summary']
+        accumulator.total_hazards = state['total_hazards']
+        accumulator.hazard_periods = state['hazard_periods']
+        accumulator.hazard_hours = set(state['hazard_hours'])
+        accumulator.current_hazards = state['current_hazards']
+        accumulator.alerts_detected = state['alerts_detected']
+        accumulator.last_timestamp = state['last_timestamp']
+        accumulator.folded = state['folded']
+        return accumulator
+
+def analyze_center_hazards(center_records):
+    """Analyze hazards for a specific detention center throughout the day"""
+    accumulator = CenterAccumulator()
+    for record in center_records:
+        accumulator.add(record)
+    return accumulator.result()
 
 def create_center_focused_report(date_str, analysis_data):
     """Create a detention center-focused report"""
@@ -191,6 +373,29 @@ def create_center_focused_report(date_str, analysis_data):
     
     return report
 
+def create_center_focused_report_streaming(date_str, analysis_file):
+    """Create the same report while reading the analysis file one record at a time"""
+    
+    report = {
+        'date': date_str,
+        'analysis_timestamp': datetime.datetime.now().isoformat(),
+        'total_centers': 0,
+        'centers': {}
+    }
+    
+    accumulators = {}
+    for record in iter_detailed_analysis(analysis_file):
+        center_name = record['location']
+        if center_name not in accumulators:
+            accumulators[center_name] = CenterAccumulator()
+        accumulators[center_name].add(record)
+    
+    report['total_centers'] = len(accumulators)
+    for center_name, accumulator in accumulators.items():
+        report['centers'][center_name] = accumulator.result()
+    
+    return report
+
 def print_center_focused_summary(report):
     """Print a detention center-focused summary"""
     
@@ -279,13 +484,18 @@ def print_center_focused_summary(report):
                     if risk_level:
                         print(f"    Risk Level: {risk_level} | Severity: {severity}")
 
+def center_reports_dir():
+    """The center_reports folder next to Scripts (created if needed)"""
+    base_dir = os.path.dirname(os.getcwd()) if os.path.basename(os.getcwd()) == 'Scripts' else os.getcwd()
+    reports_dir = os.path.join(base_dir, "center_reports")
+    os.makedirs(reports_dir, exist_ok=True)
+    return reports_dir
+
 def save_center_focused_report(date_str, report):
     """Save the center-focused report"""
     
     # Create directory for center reports
-    base_dir = os.path.dirname(os.getcwd()) if os.path.basename(os.getcwd()) == 'Scripts' else os.getcwd()
-    reports_dir = os.path.join(base_dir, "center_reports")
-    os.makedirs(reports_dir, exist_ok=True)
+    reports_dir = center_reports_dir()
     
     # Save JSON version
     json_filename = f"center_analysis_{date_str}.json"
@@ -355,6 +565,200 @@ def save_center_focused_report(date_str, report):
     
     return json_path, txt_path
 
+def dates_between(start_str, end_str):
+    """YYYY-MM-DD strings from start to end, both included"""
+    day = datetime.date.fromisoformat(start_str)
+    end = datetime.date.fromisoformat(end_str)
+    dates = []
+    while day <= end:
+        dates.append(day.isoformat())
+        day += datetime.timedelta(days=1)
+    return dates
+
+def summarize_center_report(report):
+    """The parts of a day's report needed for a range summary"""
+    centers = {}
+    for center_name, center_data in report['centers'].items():
+        measurements = center_data['measurements']
+        centers[center_name] = {
+            'total_hazards': center_data['total_hazards'],
+            'hazard_summary': center_data['hazard_summary'],
+            'hours_covered': center_data['hours_covered'],
+            'max_heat_index': measurements['max_heat_index'],
+            'max_temperature': measurements['max_temperature'],
+            'min_temperature': measurements['min_temperature'],
+            'max_humidity': measurements['max_humidity'],
+            'max_precipitation': measurements['max_precipitation'],
+            'alerts_detected': measurements['alerts_detected']
+        }
+    return {'date': report['date'], 'centers': centers}
+
+def build_report(date_str, stream=False, from_analysis=False, engine='python'):
+    """Center-focused report for a date, or None if there is nothing to report
+    
+    The report is a snapshot of the day's running center aggregates (kept
+    by the collector as each report is saved) when the day has them, so it
+    costs the same whatever the data volume. Days without aggregates, or
+    every day with `from_analysis`, are analyzed from the enhanced
+    analysis file, record by record or (engine 'numpy') for all centers
+    at once.
+    """
+    if not from_analysis:
+        # Imported here: center_aggregator imports CenterAccumulator from this module
+        from center_aggregator import load_center_report
+        report = load_center_report(date_str)
+        if report is not None:
+            return report
+    
+    if stream:
+        analysis_file = find_analysis_file(date_str)
+        if not analysis_file:
+            print(f"Error: Could not find enhanced analysis file for {date_str}")
+            return None
+        if engine == 'numpy':
+            # Imported here so the default engine does not need NumPy
+            from vectorized_analyzer import create_center_focused_report_vectorized
+            return create_center_focused_report_vectorized(date_str, iter_detailed_analysis(analysis_file))
+        return create_center_focused_report_streaming(date_str, analysis_file)
+    
+    analysis_data = load_analysis_data(date_str)
+    if not analysis_data:
+        return None
+    if engine == 'numpy':
+        from vectorized_analyzer import create_center_focused_report_vectorized
+        return create_center_focused_report_vectorized(date_str, analysis_data['detailed_analysis'])
+    return create_center_focused_report(date_str, analysis_data)
+
+def analyze_day(date_str, stream=False, from_analysis=False, engine='python'):
+    """Create and save one day's center report; returns a summary of it
+    
+    Runs in a worker process for date ranges, so only the small summary
+    is sent back instead of the full report.
+    """
+    report = build_report(date_str, stream, from_analysis, engine)
+    if report is None:
+        return {'date': date_str, 'error': 'No center aggregates or enhanced analysis file'}
+    
+    json_path, txt_path = save_center_focused_report(date_str, report)
+    summary = summarize_center_report(report)
+    summary['files'] = [json_path, txt_path]
+    return summary
+
+def analyze_date_range(dates, workers=DEFAULT_WORKERS, stream=False, from_analysis=False, engine='python'):
+    """Analyze many days, several at a time in separate processes
+    
+    Returns the per-day summaries in date order.
+    """
+    results = {}
+    if workers <= 1 or len(dates) == 1:
+        for date_str in dates:
+            # One bad file must not stop the rest of the range
+            try:
+                results[date_str] = analyze_day(date_str, stream, from_analysis, engine)
+            except Exception as e:
+                results[date_str] = {'date': date_str, 'error': str(e)}
+            print(f"  {date_str}: {'done' if 'error' not in results[date_str] else results[date_str]['error']}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(analyze_day, date_str, stream, from_analysis, engine): date_str for date_str in dates}
+            for future in as_completed(futures):
+                date_str = futures[future]
+                try:
+                    results[date_str] = future.result()
+                except Exception as e:
+                    results[date_str] = {'date': date_str, 'error': str(e)}
+                print(f"  {date_str}: {'done' if 'error' not in results[date_str] else results[date_str]['error']}")
+    
+    return [results[date_str] for date_str in sorted(results)]
+
+def _keep_extreme(summary, key, value, date_str, larger=True):
+    if value is None:
+        return
+    if summary[key] is None or (value > summary[key] if larger else value < summary[key]):
+        summary[key] = value
+        summary[f'{key}_date'] = date_str
+
+def create_range_summary(day_summaries):
+    """Combine per-day summaries into one report per center for the whole range"""
+    analyzed = [day for day in day_summaries if 'error' not in day]
+    
+    range_report = {
+        'start_date': day_summaries[0]['date'] if day_summaries else None,
+        'end_date': day_summaries[-1]['date'] if day_summaries else None,
+        'analysis_timestamp': datetime.datetime.now().isoformat(),
+        'days_requested': len(day_summaries),
+        'days_analyzed': len(analyzed),
+        'missing_dates': [day['date'] for day in day_summaries if 'error' in day],
+        'centers': {}
+    }
+    
+    for day in analyzed:
+        for center_name, center_data in day['centers'].items():
+            summary = range_report['centers'].setdefault(center_name, {
+                'days_analyzed': 0,
+                'days_with_hazards': 0,
+                'total_hazards': 0,
+                'hazard_summary': defaultdict(int),
+                'max_heat_index': None, 'max_heat_index_date': None,
+                'max_temperature': None, 'max_temperature_date': None,
+                'min_temperature': None, 'min_temperature_date': None,
+                'max_humidity': None, 'max_humidity_date': None,
+                'max_precipitation': None, 'max_precipitation_date': None,
+                'alerts_detected': []
+            })
+            summary['days_analyzed'] += 1
+            summary['total_hazards'] += center_data['total_hazards']
+            if center_data['total_hazards']:
+                summary['days_with_hazards'] += 1
+            for hazard_type, count in center_data['hazard_summary'].items():
+                summary['hazard_summary'][hazard_type] += count
+            
+            _keep_extreme(summary, 'max_heat_index', center_data['max_heat_index'], day['date'])
+            _keep_extreme(summary, 'max_temperature', center_data['max_temperature'], day['date'])
+            _keep_extreme(summary, 'min_temperature', center_data['min_temperature'], day['date'], larger=False)
+            _keep_extreme(summary, 'max_humidity', center_data['max_humidity'], day['date'])
+            _keep_extreme(summary, 'max_precipitation', center_data['max_precipitation'], day['date'])
+            
+            seen = set(summary['alerts_detected'])
+            for alert in center_data['alerts_detected']:
+                if alert not in seen:
+                    seen.add(alert)
+                    summary['alerts_detected'].append(alert)
+    
+    for summary in range_report['centers'].values():
+        summary['hazard_summary'] = dict(summary['hazard_summary'])
+    range_report['total_centers'] = len(range_report['centers'])
+    return range_report
+
+def save_range_summary(range_report):
+    """Save the combined range summary next to the daily center reports"""
+    json_path = os.path.join(center_reports_dir(),
+                             f"center_range_{range_report['start_date']}_{range_report['end_date']}.json")
+    with open(json_path, 'w') as f:
+        json.dump(range_report, f, indent=2)
+    return json_path
+
+def print_range_summary(range_report):
+    """Print the combined summary, centers with the most hazards first"""
+    print(f"\nDETENTION CENTER WEATHER ANALYSIS - {range_report['start_date']} to {range_report['end_date']}")
+    print("=" * 80)
+    print(f"Days Analyzed: {range_report['days_analyzed']}/{range_report['days_requested']}")
+    if range_report['missing_dates']:
+        print(f"Days Without Data: {', '.join(range_report['missing_dates'])}")
+    
+    sorted_centers = sorted(range_report['centers'].items(),
+                            key=lambda x: x[1]['total_hazards'],
+                            reverse=True)
+    for center_name, summary in sorted_centers:
+        print(f"\n📍 {center_name.upper()}")
+        print(f"  Hazard Detections: {summary['total_hazards']} on {summary['days_with_hazards']} of {summary['days_analyzed']} days")
+        if summary['max_heat_index']:
+            print(f"  Highest Heat Index: {summary['max_heat_index']:.1f}°F on {summary['max_heat_index_date']}")
+        if summary['max_temperature']:
+            print(f"  Temperature Range: {summary['min_temperature']:.1f}°F - {summary['max_temperature']:.1f}°F")
+        if summary['alerts_detected']:
+            print(f"  Weather Alerts: {len(summary['alerts_detected'])}")
+
 def main():
     """Main function for center-focused analysis"""
     import argparse
@@ -362,20 +766,51 @@ def main():
     parser = argparse.ArgumentParser(description='Create detention center-focused weather analysis')
     parser.add_argument('--date', help='Date to analyze (YYYY-MM-DD)', 
                        default=(datetime.datetime.now() - datetime.timedelta(days=1)).strftime('%Y-%m-%d'))
+    parser.add_argument('--stream', action='store_true',
+                       help='Read the analysis file one record at a time (for very large files)')
+    parser.add_argument('--from-analysis', action='store_true',
+                       help='Analyze the enhanced analysis file even for days with running center aggregates')
+    parser.add_argument('--engine', choices=('python', 'numpy'), default='python',
+                       help='Analyze the analysis file record by record or for all centers at once (needs numpy)')
+    parser.add_argument('--start', help='First date of a range to analyze (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Last date of the range, included (default: yesterday)')
+    parser.add_argument('--dates', nargs='+', metavar='YYYY-MM-DD', help='Analyze these dates')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                       help=f'Days analyzed at the same time for a range (default: {DEFAULT_WORKERS})')
     
     args = parser.parse_args()
     
-    print(f"Loading analysis data for {args.date}...")
-    
-    # Load existing analysis
-    analysis_data = load_analysis_data(args.date)
-    if not analysis_data:
+    if args.start or args.dates:
+        try:
+            range_dates = dates_between(args.start, args.end or args.date) if args.start else []
+            for date_str in args.dates or []:
+                datetime.date.fromisoformat(date_str)
+        except ValueError as e:
+            print(f"Error: invalid date ({e})")
+            return
+        if args.start and not range_dates:
+            print(f"Error: --start {args.start} is after --end {args.end or args.date}")
+            return
+        dates = sorted(set(args.dates or []) | set(range_dates))
+        print(f"Analyzing {len(dates)} day(s) with {min(args.workers, len(dates))} worker(s)...")
+        
+        started = datetime.datetime.now()
+        day_summaries = analyze_date_range(dates, args.workers, args.stream, args.from_analysis, args.engine)
+        range_report = create_range_summary(day_summaries)
+        summary_path = save_range_summary(range_report)
+        
+        print_range_summary(range_report)
+        
+        print(f"\nFILES CREATED:")
+        print(f"Daily Reports: {range_report['days_analyzed']} day(s) in {center_reports_dir()}")
+        print(f"Range Summary: {summary_path}")
+        print(f"Finished in {(datetime.datetime.now() - started).total_seconds():.1f} seconds")
         return
     
-    print(f"Creating center-focused report...")
-    
-    # Create center-focused report
-    report = create_center_focused_report(args.date, analysis_data)
+    print(f"Creating center-focused report for {args.date}...")
+    report = build_report(args.date, args.stream, args.from_analysis, args.engine)
+    if report is None:
+        return
     
     # Save reports
     json_path, txt_path = save_center_focused_report(args.date, report)
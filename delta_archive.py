@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# delta_archive.py
+# Compact archive that stores each observation once and repeats as references
+#
+# Static facility fields (name, region, alert GPS point) live in one
+# dimension table instead of in every record. Observation values are only
+# stored when a location's station or nws_timestamp changes; an hourly run
+# that got the same observation again stores "since": <collection time of
+# the first copy>. Each day's file starts with full observations so a day
+# can be read on its own.
+
+import datetime
+import json
+import os
+import threading
+
+from nws_client import load_json_file, save_json_file
+from report_store import load_saved_reports
+
+DELTA_DIR = "../delta_archive"
+FACILITIES_FILE = "facilities.json"
+STATE_FILE = "state.json"
+DAY_PREFIX = "runs_"
+
+STATIC_FIELDS = ('location_name', 'region', 'alerts_gps')
+OBSERVATION_FIELDS = ('station_id', 'nws_timestamp', 'temperature_C', 'temperature_F', 'relative_humidity',
+                      'wind_speed_kph', 'wind_speed_mph', 'text_description', 'barometric_pressure', 'visibility')
+# Rebuilt from collection_timestamp when reading
+DERIVED_FIELDS = ('collection_timestamp', 'collection_date', 'collection_time')
+# Alert lists, stored only when they change (compact records have only alert_ids)
+ALERT_FIELDS = ('alerts', 'alert_ids')
+
+class DeltaArchive:
+    """Dimension table of facilities plus one file of delta-encoded runs per day
+
+    Each line of runs_<date>.jsonl is one collection run:
+      {"t": collection_timestamp, "records": [...]}
+    A record holds its per-run fields (status, station role, alert count)
+    plus:
+      missing: static fields or alert lists the original record did not have
+      obs:     the observation values, when they changed
+      since:   when a repeated observation was first collected
+      alerts, alert_ids: the alert headlines / registry IDs, when they changed
+      values:  the observation fields a failed record carried (placeholder
+               text and nulls), stored as they were and never referenced
+    """
+
+    def __init__(self, path=DELTA_DIR):
+        self.path = path
+        self._lock = threading.Lock()
+        self.facilities = load_json_file(os.path.join(path, FACILITIES_FILE), {}) or {}
+        self.state = load_json_file(os.path.join(path, STATE_FILE), {}) or {}
+        self.state.setdefault('last_run', None)
+        self.state.setdefault('locations', {})
+
+    def _day_path(self, day):
+        return os.path.join(self.path, f"{DAY_PREFIX}{day}.jsonl")
+
+    # Writing
+
+    def _update_facility(self, record, collected):
+        location_code = record['location_code']
+        static = {field: record[field] for field in STATIC_FIELDS if field in record}
+        if not static:
+            return False
+
+        current = self.facilities.get(location_code)
+        if current is None:
+            self.facilities[location_code] = dict(static, first_seen=collected, changes=[])
+            return True
+
+        changed = {field: current.get(field) for field, value in static.items() if current.get(field) != value}
+        if not changed:
+            return False
+        current['changes'].append(dict(changed, replaced_at=collected))
+        current.update(static)
+        return True
+
+    def _encode(self, record, day, collected):
+        """Delta-encode one location record against the location's previous run"""
+        location_code = record.get('location_code')
+        encoded = {key: value for key, value in record.items()
+                   if key not in STATIC_FIELDS and key not in OBSERVATION_FIELDS
+                   and key not in DERIVED_FIELDS and key not in ALERT_FIELDS}
+
+        # Static fields and alert lists this record did not have (error
+        # records and --compact-alerts records lack some)
+        missing = [field for field in STATIC_FIELDS + ALERT_FIELDS if field not in record]
+        if missing:
+            encoded['missing'] = missing
+
+        previous = self.state['locations'].get(location_code, {})
+        # Each day file must hold the full observation and alert lists the
+        # first time they are referenced, whatever records came before
+        observation_new_day = previous.get('obs_day') != day
+
+        if record.get('status') == 'SUCCESS':
+            observation = {field: record.get(field) for field in OBSERVATION_FIELDS}
+            observation_key = [observation['station_id'], observation['nws_timestamp']]
+            repeat = previous.get('observation_key') == observation_key
+
+            if repeat:
+                encoded['since'] = previous['observation_since']
+            if not repeat or observation_new_day:
+                encoded['obs'] = observation
+                previous['obs_day'] = day
+            if not repeat:
+                previous['observation_key'] = observation_key
+                previous['observation_since'] = collected
+        else:
+            values = {field: record[field] for field in OBSERVATION_FIELDS if field in record}
+            if values:
+                encoded['values'] = values
+
+        for field in ALERT_FIELDS:
+            value = record.get(field)
+            if value is not None and (previous.get(f'{field}_day') != day or value != previous.get(field)):
+                encoded[field] = value
+                previous[field] = value
+                previous[f'{field}_day'] = day
+        previous.pop('day', None)       # single marker used by older state files
+
+        self.state['locations'][location_code] = previous
+        return encoded
+
+    def append_report(self, report):
+        """Add one consolidated report; returns False if it is not newer than the last run"""
+        collected = report.get('report_metadata', {}).get('collection_timestamp')
+        if not collected:
+            return False
+
+        with self._lock:
+            if self.state['last_run'] and collected <= self.state['last_run']:
+                return False
+
+            day = collected[:10]
+            facilities_changed = False
+            records = []
+            for record in report.get('location_data', []):
+                if not record.get('location_code'):
+                    continue
+                facilities_changed |= self._update_facility(record, collected)
+                records.append(self._encode(record, day, collected))
+
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._day_path(day), 'a') as f:
+                f.write(json.dumps({"t": collected, "records": records}, separators=(',', ':')) + "\n")
+
+            self.state['last_run'] = collected
+            if facilities_changed:
+                save_json_file(os.path.join(self.path, FACILITIES_FILE), self.facilities)
+            save_json_file(os.path.join(self.path, STATE_FILE), self.state)
+        return True
+
+    # Reading
+
+    def days(self, start=None, end=None):
+        """Dates (YYYY-MM-DD) with archived runs in [start, end)"""
+        if not os.path.isdir(self.path):
+            return []
+        days = []
+        for filename in sorted(os.listdir(self.path)):
+            if not (filename.startswith(DAY_PREFIX) and filename.endswith(".jsonl")):
+                continue
+            day = filename[len(DAY_PREFIX):-len(".jsonl")]
+            if start is not None and day < start.date().isoformat():
+                continue
+            if end is not None and day > end.date().isoformat():
+                continue
+            days.append(day)
+        return days
+
+    def records(self, start=None, end=None, locations=None):
+        """Yield full location records for runs in [start, end)
+
+        Every SUCCESS record gains `repeated_observation` (True when the
+        station had not reported since an earlier run) and
+        `unchanged_since` (when that observation was first collected).
+        """
+        wanted = set(locations) if locations is not None else None
+        for day in self.days(start, end):
+            last_observation = {}
+            last_alerts = {field: {} for field in ALERT_FIELDS}
+            with open(self._day_path(day), 'r') as f:
+                for line in f:
+                    run = json.loads(line)
+                    collected_at = datetime.datetime.fromisoformat(run['t'])
+                    in_range = (start is None or collected_at >= start) and (end is None or collected_at < end)
+
+                    for encoded in run['records']:
+                        location_code = encoded.get('location_code')
+                        # Track state for every run so later references resolve
+                        if 'obs' in encoded:
+                            last_observation[location_code] = encoded['obs']
+                        for field in ALERT_FIELDS:
+                            if field in encoded:
+                                last_alerts[field][location_code] = encoded[field]
+                        if not in_range or (wanted is not None and location_code not in wanted):
+                            continue
+                        alerts = {field: last_alerts[field].get(location_code) for field in ALERT_FIELDS}
+                        yield self._decode(encoded, run['t'], collected_at, last_observation.get(location_code), alerts)
+
+    def facility_at(self, location_code, collected):
+        """Static fields of a facility as they were at collection time `collected`"""
+        current = self.facilities.get(location_code)
+        if current is None:
+            return {}
+        facility = {field: current[field] for field in STATIC_FIELDS if field in current}
+        for change in reversed(current.get('changes', [])):
+            if change['replaced_at'] <= collected:
+                break
+            facility.update({field: value for field, value in change.items() if field != 'replaced_at'})
+        return facility
+
+    def _decode(self, encoded, collected, collected_at, observation, alerts):
+        record = {"collection_timestamp": collected}
+        facility = self.facility_at(encoded.get('location_code'), collected)
+        for field in encoded.get('missing', ()):
+            facility.pop(field, None)
+        is_success = encoded.get('status') == 'SUCCESS'
+
+        if is_success:
+            record["collection_date"] = collected_at.strftime("%Y-%m-%d")
+            record["collection_time"] = collected_at.strftime("%H:%M:%S")
+        record["location_code"] = encoded.get('location_code')
+        for field in ('location_name', 'region'):
+            if field in facility:
+                record[field] = facility[field]
+
+        record.update({key: value for key, value in encoded.items()
+                       if key not in ('obs', 'since', 'missing', 'values', 'location_code') + ALERT_FIELDS})
+        record.update(encoded.get('values', {}))
+        if is_success and observation:
+            record.update(observation)
+            record["repeated_observation"] = 'since' in encoded
+            record["unchanged_since"] = encoded.get('since', collected)
+        for field in ALERT_FIELDS:
+            if alerts[field] is not None and field not in encoded.get('missing', ()):
+                record[field] = alerts[field]
+        if 'alerts_gps' in facility:
+            record["alerts_gps"] = facility['alerts_gps']
+        return record
+
+    def repeat_summary(self, start=None, end=None):
+        """{location_code: (runs, repeated observations)} for [start, end)"""
+        summary = {}
+        for record in self.records(start, end):
+            runs, repeats = summary.get(record['location_code'], (0, 0))
+            summary[record['location_code']] = (runs + 1, repeats + bool(record.get('repeated_observation')))
+        return summary
+
+_archive = None
+_archive_lock = threading.Lock()
+
+def get_delta_archive():
+    """Return the process-wide delta archive"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = DeltaArchive()
+        return _archive
+
+def main():
+    """Build the delta archive from saved reports or show what it holds"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Delta-encoded archive of collected observations')
+    parser.add_argument('--build', action='store_true',
+                        help='Add saved reports newer than the last archived run')
+    parser.add_argument('--start', help='Start date (YYYY-MM-DD, default: everything)')
+    parser.add_argument('--end', help='End date, exclusive (default: now)')
+    parser.add_argument('--stats', action='store_true', help='Show runs and repeated observations per location')
+
+    args = parser.parse_args()
+
+    archive = get_delta_archive()
+    start = datetime.datetime.fromisoformat(args.start) if args.start else datetime.datetime(2000, 1, 1)
+    end = datetime.datetime.fromisoformat(args.end) if args.end else datetime.datetime.now()
+
+    if args.build:
+        reports = sorted(load_saved_reports(start, end),
+                         key=lambda report: report.get('report_metadata', {}).get('collection_timestamp', ''))
+        added = sum(archive.append_report(report) for report in reports)
+        print(f" Added {added} run(s) to {archive.path}")
+
+    if args.stats:
+        for location_code, (runs, repeats) in sorted(archive.repeat_summary(start, end).items()):
+            print(f" {location_code:30s} {runs:6d} runs  {repeats:6d} repeated observations")
+
+    if not args.build and not args.stats:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,18 @@
 # bulk_drive_uploader.py
 # Upload all missing weather files to Google Drive
 
+import io
 import os
 import json
 import datetime
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 
+from report_bundler import ReportBundle, list_bundles
+
 # Same configuration as your main script
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 CREDENTIALS_FILE = 'credentials.json'
@@ -58,8 +61,12 @@ def get_existing_files_in_drive(service, folder_id):
         print(f" Could not check existing files: {e}")
         return set()
 
-def upload_file_to_drive(service, file_path, folder_id):
-    """Upload a single file to Google Drive"""
+def upload_file_to_drive(service, file_path, folder_id, bundle=None):
+    """Upload a single file to Google Drive
+    
+    With `bundle`, `file_path` is the name of a report inside that daily
+    bundle and is uploaded straight from it.
+    """
     try:
         filename = os.path.basename(file_path)
         
@@ -68,7 +75,10 @@ def upload_file_to_drive(service, file_path, folder_id):
             'parents': [folder_id]
         }
         
-        media = MediaFileUpload(file_path, mimetype='application/json')
+        if bundle is not None:
+            media = MediaIoBaseUpload(io.BytesIO(bundle.read_bytes(filename)), mimetype='application/json')
+        else:
+            media = MediaFileUpload(file_path, mimetype='application/json')
         
         file = service.files().create(
             body=file_metadata,
@@ -102,6 +112,25 @@ def find_local_weather_files():
             }
             local_files.append(file_info)
     
+    # Reports packed into daily bundles by report_bundler.py
+    loose_names = {file_info['name'] for file_info in local_files}
+    for bundle_path in list_bundles(bundle_dir=os.path.join(raw_dir, "bundles")):
+        try:
+            bundle = ReportBundle(bundle_path)
+        except (OSError, ValueError) as e:
+            print(f" Skipping unreadable bundle {os.path.basename(bundle_path)}: {e}")
+            continue
+        for frame in bundle.frames:
+            if frame['name'] in loose_names:
+                continue
+            local_files.append({
+                'path': frame['name'],
+                'name': frame['name'],
+                'size': frame['size'],
+                'modified': datetime.datetime.fromisoformat(frame['collection_time']),
+                'bundle': bundle
+            })
+    
     # Sort by modification time (oldest first)
     local_files.sort(key=lambda x: x['modified'])
     
@@ -166,7 +195,7 @@ def main():
     for i, file_info in enumerate(files_to_upload, 1):
         print(f"[{i}/{len(files_to_upload)}] {file_info['name']} ", end="")
         
-        file_id = upload_file_to_drive(service, file_info['path'], DRIVE_FOLDER_ID)
+        file_id = upload_file_to_drive(service, file_info['path'], DRIVE_FOLDER_ID, file_info.get('bundle'))
         
         if file_id:
             print("✅")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# facility_config.py
+# Station configuration loaded from the JSON file written by station_finder.py --bulk
+#
+# Provides the same functions as configuration.py and is the one place the
+# scripts get their configuration from: configuration.py is used when it
+# exists, unless a JSON file was loaded with use_facility_config() (--config).
+
+import datetime
+import json
+import os
+
+from nws_client import NWS_API_BASE, nws_get_json
+
+try:
+    import configuration
+except ImportError:
+    configuration = None
+
+FACILITY_CONFIG_FILE = "facility_config.json"
+
+_config_path = FACILITY_CONFIG_FILE
+_locations = None
+
+def save_facility_config(locations, path=FACILITY_CONFIG_FILE, source=None):
+    """Write {location_code: config} to a JSON configuration file"""
+    data = {
+        "generated": datetime.datetime.now().isoformat(),
+        "source": source,
+        "location_count": len(locations),
+        "locations": locations
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def load_facility_config(path=FACILITY_CONFIG_FILE):
+    """Load a JSON configuration file and make it the active configuration"""
+    global _config_path, _locations
+    with open(path, 'r') as f:
+        data = json.load(f)
+    _config_path = path
+    _locations = data.get('locations', {})
+    return _locations
+
+def use_facility_config(path):
+    """Use a JSON configuration file instead of configuration.py from now on"""
+    return load_facility_config(path)
+
+def _configuration():
+    """configuration.py, unless a JSON configuration file has been loaded"""
+    return configuration if _locations is None else None
+
+def _get_locations():
+    if _locations is None:
+        load_facility_config(_config_path)
+    return _locations
+
+def get_station_config(location_code):
+    """Configuration for one location, or None if it is not configured"""
+    if _configuration():
+        return configuration.get_station_config(location_code)
+    return _get_locations().get(location_code)
+
+def get_all_locations():
+    """All configured location codes, in file order"""
+    if _configuration():
+        return configuration.get_all_locations()
+    return list(_get_locations())
+
+def get_alerts_url(location_code):
+    """Point alert query URL for a location"""
+    if _configuration():
+        return configuration.get_alerts_url(location_code)
+    gps = _get_locations()[location_code]['alerts_gps']
+    return f"{NWS_API_BASE}/alerts/active?point={gps['lat']},{gps['lon']}"
+
+def get_working_station(location_code):
+    """Return (station_id, is_backup, status_message) for the first station with data"""
+    if _configuration():
+        return configuration.get_working_station(location_code)
+    config = _get_locations()[location_code]
+    station_ids = [config.get('primary_station')] + config.get('backup_stations', [])
+    station_ids = [station_id for station_id in station_ids if station_id]
+
+    for i, station_id in enumerate(station_ids):
+        try:
+            data = nws_get_json(f"{NWS_API_BASE}/stations/{station_id}/observations/latest", timeout=10)
+        except Exception:
+            continue
+        if data.get('properties', {}).get('timestamp'):
+            if i == 0:
+                return station_id, False, "Primary station OK"
+            return station_id, True, f"Using backup station {station_id}"
+
+    return config.get('primary_station'), False, "No station returned data, using primary"
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# hazard_intervals.py
+# Continuous hazard periods per center across days, with fast range queries
+#
+# The daily center report tracks hazard periods by hour number within one
+# day. Here each center's hazard presence is run-length encoded into
+# [start, end) intervals over any span of time: a period that runs past
+# midnight stays one interval, and a period ends at the first reading
+# without the hazard or when readings stop for longer than MAX_GAP_HOURS.
+# Intervals are built once from the daily analysis files and then queried
+# by center, hazard type, time window and length without reading records.
+
+import datetime
+import os
+import threading
+from bisect import bisect_left, bisect_right
+
+from daily_weather_analyzer import dates_between, find_analysis_file, iter_detailed_analysis
+from nws_client import load_json_file, save_json_file
+
+INTERVAL_DIR = "../hazard_intervals"
+INTERVAL_FILE = "hazard_intervals.json"
+
+# Time one reading stands for (the collector runs hourly)
+READING_HOURS = 1
+# A longer silence between readings ends every open period (one missed
+# hourly run does not)
+MAX_GAP_HOURS = 2
+
+def _parse(timestamp):
+    try:
+        return datetime.datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+
+class HazardIntervals:
+    """Hazard intervals per center and type, extended a day at a time
+
+    State saved in INTERVAL_FILE:
+      intervals: {center: {hazard type: [[start, end, readings], ...]}}
+      open:      {center: {hazard type: [start, last reading, readings]}}
+      last_reading: {center: time of the center's last reading}
+      days: the days folded in, oldest first
+    Open periods carry over to the next day, so a period is only split
+    where the hazard actually stopped or the data did.
+    """
+
+    def __init__(self, path=INTERVAL_DIR):
+        self.file_path = os.path.join(path, INTERVAL_FILE)
+        self.state = load_json_file(self.file_path, None) or self._empty()
+        self.state.setdefault('days', [])
+        self._index = None
+
+    @staticmethod
+    def _empty():
+        return {'days': [], 'intervals': {}, 'open': {}, 'last_reading': {}}
+
+    def clear(self):
+        self.state = self._empty()
+        self._index = None
+
+    # Building
+
+    def _close(self, center, hazard_type, end):
+        start, last, readings = self.state['open'][center].pop(hazard_type)
+        period_end = datetime.datetime.fromisoformat(last) + datetime.timedelta(hours=READING_HOURS)
+        if end is not None:
+            period_end = min(period_end, end)
+        self.state['intervals'].setdefault(center, {}).setdefault(hazard_type, []).append(
+            [start, period_end.isoformat(), readings])
+
+    def add_reading(self, center, timestamp, hazard_types):
+        """Fold one reading of a center in; readings must arrive in time order"""
+        when = _parse(timestamp)
+        last_reading = self.state['last_reading'].get(center)
+        if when is None or (last_reading and timestamp <= last_reading):
+            return False
+
+        open_periods = self.state['open'].setdefault(center, {})
+        gap = (last_reading is not None and
+               when - datetime.datetime.fromisoformat(last_reading) > datetime.timedelta(hours=MAX_GAP_HOURS))
+        for hazard_type in list(open_periods):
+            if gap:
+                self._close(center, hazard_type, None)
+            elif hazard_type not in hazard_types:
+                self._close(center, hazard_type, when)
+
+        for hazard_type in hazard_types:
+            if hazard_type in open_periods:
+                open_periods[hazard_type][1] = timestamp
+                open_periods[hazard_type][2] += 1
+            else:
+                open_periods[hazard_type] = [timestamp, timestamp, 1]
+        self.state['last_reading'][center] = timestamp
+        self._index = None
+        return True
+
+    def add_day(self, date_str, records):
+        """Fold in one day's detailed_analysis records; returns the readings added"""
+        readings = {}
+        for record in records:
+            hazard_types = []
+            for hazard in record.get('hazard_analysis', []):
+                if hazard['type'] not in hazard_types:
+                    hazard_types.append(hazard['type'])
+            readings.setdefault(record['location'], []).append((record.get('analysis_timestamp', ''), hazard_types))
+
+        added = 0
+        for center, center_readings in readings.items():
+            center_readings.sort(key=lambda reading: reading[0])
+            for timestamp, hazard_types in center_readings:
+                added += self.add_reading(center, timestamp, hazard_types)
+        self.state['days'] = sorted(set(self.state['days']) | {date_str})
+        return added
+
+    def last_day(self):
+        return self.state['days'][-1] if self.state['days'] else None
+
+    def build(self, dates):
+        """Fold in the analysis files for dates not added yet
+
+        Days are folded in time order, so a day that turns up before days
+        already added (its file was missing at the last build) makes the
+        store start over from all of its days. Returns (days added, dates
+        without an analysis file).
+        """
+        built = set(self.state['days'])
+        new_days, missing = {}, []
+        for date_str in sorted(set(dates) - built):
+            analysis_file = find_analysis_file(date_str)
+            if analysis_file:
+                new_days[date_str] = analysis_file
+            else:
+                missing.append(date_str)
+
+        if new_days and built and min(new_days) < max(built):
+            print(f" {min(new_days)} is earlier than days already added - rebuilding {len(built)} day(s)")
+            files = {date_str: find_analysis_file(date_str) for date_str in built}
+            files.update(new_days)
+            self.clear()
+        else:
+            files = new_days
+
+        for date_str in sorted(files):
+            if files[date_str]:
+                self.add_day(date_str, iter_detailed_analysis(files[date_str]))
+            else:
+                missing.append(date_str)
+        return sorted(new_days), sorted(missing)
+
+    def save(self):
+        save_json_file(self.file_path, self.state)
+
+    # Queries
+
+    def _build_index(self):
+        """{(center, type): (starts, ends, periods)}, each sorted by start
+
+        A center's periods of one type never overlap, so their ends are
+        sorted too and a time window is found with two bisections.
+        """
+        index = {}
+        for center, types in self.state['intervals'].items():
+            for hazard_type, intervals in types.items():
+                index[(center, hazard_type)] = [
+                    (datetime.datetime.fromisoformat(start), datetime.datetime.fromisoformat(end), readings, False)
+                    for start, end, readings in intervals]
+        for center, types in self.state['open'].items():
+            for hazard_type, (start, last, readings) in types.items():
+                end = datetime.datetime.fromisoformat(last) + datetime.timedelta(hours=READING_HOURS)
+                index.setdefault((center, hazard_type), []).append(
+                    (datetime.datetime.fromisoformat(start), end, readings, True))
+
+        self._index = {}
+        for key, periods in index.items():
+            periods.sort(key=lambda period: period[0])
+            self._index[key] = ([period[0] for period in periods], [period[1] for period in periods], periods)
+        return self._index
+
+    def query(self, center=None, hazard_type=None, start=None, end=None, min_hours=0):
+        """Periods overlapping [start, end) lasting more than min_hours, by start time
+
+        `center` matches any center whose name contains it (case does not
+        matter). Periods still open at the last reading are included with
+        `ongoing` set.
+        """
+        index = self._index if self._index is not None else self._build_index()
+        min_duration = datetime.timedelta(hours=min_hours)
+        results = []
+        for (center_name, period_type), (starts, ends, periods) in index.items():
+            if center and center.lower() not in center_name.lower():
+                continue
+            if hazard_type and period_type != hazard_type:
+                continue
+            low = bisect_right(ends, start) if start is not None else 0
+            high = bisect_left(starts, end) if end is not None else len(periods)
+            for period_start, period_end, readings, ongoing in periods[low:high]:
+                duration = period_end - period_start
+                if duration <= min_duration:
+                    continue
+                results.append({
+                    'center': center_name,
+                    'type': period_type,
+                    'start': period_start.isoformat(),
+                    'end': period_end.isoformat(),
+                    'hours': round(duration.total_seconds() / 3600, 2),
+                    'readings': readings,
+                    'ongoing': ongoing
+                })
+        results.sort(key=lambda period: (period['start'], period['center'], period['type']))
+        return results
+
+_intervals = None
+_intervals_lock = threading.Lock()
+
+def get_hazard_intervals():
+    """Return the process-wide hazard interval store"""
+    global _intervals
+    with _intervals_lock:
+        if _intervals is None:
+            _intervals = HazardIntervals()
+        return _intervals
+
+def main():
+    """Build the hazard interval store or query it"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Continuous hazard periods per detention center, across days')
+    parser.add_argument('--build', action='store_true',
+                        help='Add the analysis files from --start to --end (days already added are skipped)')
+    parser.add_argument('--rebuild', action='store_true', help='Start the store over before building')
+    parser.add_argument('--start', help='First day (YYYY-MM-DD) to build or to search')
+    parser.add_argument('--end', help='Last day, included (default: yesterday)')
+    parser.add_argument('--center', help='Only centers whose name contains this (e.g. "Krome")')
+    parser.add_argument('--type', help='Only this hazard type (e.g. heat_index_risk)')
+    parser.add_argument('--min-hours', type=float, default=0, help='Only periods longer than this many hours')
+
+    args = parser.parse_args()
+
+    store = get_hazard_intervals()
+    yesterday = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+
+    if args.build or args.rebuild:
+        if args.rebuild:
+            store.clear()
+        # Days already added are skipped, so this also retries earlier gaps
+        start = args.start or (store.state['days'][0] if store.state['days'] else None)
+        if not start:
+            print("Error: give --start for the first build")
+            return
+        added, missing = store.build(dates_between(start, args.end or yesterday))
+        store.save()
+        print(f" Added {len(added)} day(s); {len(store.state['days'])} day(s) in the store, last {store.last_day()}")
+        if missing:
+            print(f" No analysis file for {len(missing)} day(s): {', '.join(missing)}")
+        return
+
+    if not store.state['days']:
+        print("No hazard intervals yet; build them with --build --start YYYY-MM-DD")
+        return
+
+    window_start = datetime.datetime.fromisoformat(args.start) if args.start else None
+    window_end = (datetime.datetime.fromisoformat(args.end) + datetime.timedelta(days=1)) if args.end else None
+    periods = store.query(args.center, args.type, window_start, window_end, args.min_hours)
+
+    for period in periods:
+        ongoing = "  (ongoing)" if period['ongoing'] else ""
+        print(f"{period['center'][:40]:40s} {period['type']:22s} {period['start']} -> {period['end']} "
+              f"{period['hours']:7.1f} h{ongoing}")
+    print(f"\n {len(periods)} period(s); data through {store.last_day()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# hazard_rules.py
+# The hazard thresholds applied to collected observations, in one place
+#
+# The running center aggregates and the daily center report both classify
+# location records with detect_hazards(), so a hazard means the same thing
+# live and at midnight. Plain Python only: the collector imports this
+# module on every run, and NumPy is only needed for the columnar archive.
+
+import math
+
+from alert_registry import record_alerts
+
+# Hazard Detection Thresholds (see README, Part 7)
+EXTREME_HEAT_F = 95
+EXTREME_COLD_F = 32
+HIGH_HUMIDITY_PERCENT = 85
+DANGEROUS_WIND_MPH = 39
+LOW_VISIBILITY_METERS = 1609.344        # 1 mile
+LOW_PRESSURE_INHG = 29.00
+HIGH_PRESSURE_INHG = 31.00
+PASCALS_PER_INHG = 3386.389
+ALERT_KEYWORDS = ('tornado', 'hurricane', 'flood', 'severe thunderstorm')
+
+def heat_index_f(temperature_f, humidity):
+    """NWS heat index (°F) for one temperature (°F) and relative humidity (%)
+
+    Same formula as weather_archive.heat_index_f, which works on arrays.
+    """
+    t = float(temperature_f)
+    rh = float(humidity)
+
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+    if (simple + t) / 2 < 80:
+        return simple
+
+    full = (-42.379 + 2.04901523 * t + 10.14333127 * rh - 0.22475541 * t * rh
+            - 0.00683783 * t * t - 0.05481717 * rh * rh + 0.00122874 * t * t * rh
+            + 0.00085282 * t * rh * rh - 0.00000199 * t * t * rh * rh)
+
+    # Rothfusz adjustments for very dry and very humid air
+    if rh < 13 and 80 <= t <= 112:
+        full -= ((13 - rh) / 4) * math.sqrt(max((17 - abs(t - 95)) / 17, 0))
+    if rh > 85 and 80 <= t <= 87:
+        full += ((rh - 85) / 10) * ((87 - t) / 5)
+    return full
+
+def record_heat_index(record):
+    """Heat index (°F) of a location record, or None"""
+    if record.get('temperature_F') is None or record.get('relative_humidity') is None:
+        return None
+    return round(heat_index_f(record['temperature_F'], record['relative_humidity']), 1)
+
+def record_precipitation(record):
+    """Largest hourly precipitation (in/hr) in a record's sub-hourly series, or None"""
+    series = record.get('observation_series') or {}
+    fields = series.get('fields', [])
+    if 'precipitation_last_hour_mm' not in fields:
+        return None
+    column = fields.index('precipitation_last_hour_mm')
+    values = [row[column] for row in series.get('rows', []) if row[column] is not None]
+    return round(max(values) / 25.4, 2) if values else None
+
+def detect_hazards(record):
+    """Hazards in one successful location record, as hazard_analysis entries"""
+    hazards = []
+    temperature = record.get('temperature_F')
+    humidity = record.get('relative_humidity')
+    wind = record.get('wind_speed_mph')
+    visibility = record.get('visibility')
+    pressure = record.get('barometric_pressure')
+
+    if temperature is not None and temperature >= EXTREME_HEAT_F:
+        hazards.append(('extreme_heat', 'HIGH', f"Temperature {temperature:.1f}°F (threshold {EXTREME_HEAT_F}°F)",
+                        temperature))
+    if temperature is not None and temperature <= EXTREME_COLD_F:
+        hazards.append(('extreme_cold', 'HIGH', f"Freezing temperature {temperature:.1f}°F", temperature))
+    if humidity is not None and humidity >= HIGH_HUMIDITY_PERCENT:
+        hazards.append(('high_humidity', 'MODERATE', f"Relative humidity {humidity:.0f}% (threshold {HIGH_HUMIDITY_PERCENT}%)",
+                        humidity))
+    if wind is not None and wind >= DANGEROUS_WIND_MPH:
+        hazards.append(('dangerous_wind', 'HIGH', f"Wind {wind:.1f} mph (tropical storm force)", wind))
+    if visibility is not None and visibility < LOW_VISIBILITY_METERS:
+        miles = visibility / LOW_VISIBILITY_METERS
+        hazards.append(('low_visibility', 'MODERATE', f"Visibility {miles:.2f} miles", round(miles, 2)))
+    if pressure is not None:
+        inches = pressure / PASCALS_PER_INHG
+        if inches < LOW_PRESSURE_INHG or inches > HIGH_PRESSURE_INHG:
+            hazards.append(('extreme_pressure', 'MODERATE', f"Barometric pressure {inches:.2f} inHg", round(inches, 2)))
+
+    detected = [{'type': hazard_type, 'severity': severity, 'description': description,
+                 'measurement': measurement, 'risk_level': None}
+                for hazard_type, severity, description, measurement in hazards]
+
+    for alert_key, headline, event in record_alerts(record):
+        if any(keyword in (event or '').lower() for keyword in ALERT_KEYWORDS):
+            hazard = {'type': 'weather_alert', 'severity': 'HIGH', 'description': event,
+                      'measurement': headline, 'risk_level': None}
+            if 'alert_ids' in record:
+                hazard['alert_id'] = alert_key
+            detected.append(hazard)
+    return detected
+
+def analysis_record(record):
+    """A location record in the detailed_analysis form the center report reads
+
+    {'location', 'analysis_timestamp', 'raw_measurements', 'hazard_analysis'}
+    with the measurements under the names the enhanced analysis uses.
+    """
+    return {
+        'location': record.get('location_name') or record.get('location_code'),
+        'analysis_timestamp': record.get('collection_timestamp', ''),
+        'raw_measurements': {
+            'heat_index_f': record_heat_index(record),
+            'temperature_f': record.get('temperature_F'),
+            'humidity_percent': record.get('relative_humidity'),
+            'precipitation_rate_in_hr': record_precipitation(record)
+        },
+        'hazard_analysis': detect_hazards(record)
+    }
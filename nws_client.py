@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# nws_client.py
+# Shared, rate-limited access to the National Weather Service API
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+NWS_API_BASE = "https://api.weather.gov"
+
+# Folder (next to raw_weather_json) for caches that persist between runs
+CACHE_DIR = "../nws_cache"
+
+# One budget for api.weather.gov shared by every worker thread in the process.
+# These defaults keep the overall request rate modest while letting locations
+# be collected concurrently instead of behind fixed sleeps.
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_BURST = 4
+
+# Keep-alive connection pool shared by all threads. The pool should be at
+# least as large as the number of collection workers.
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 2
+
+# The NWS asks API clients to identify themselves
+USER_AGENT = "(Detention Hazardous Weather Tracker, github.com/julianamariac/Detention-Hazardous-Weather-Tracker)"
+
+# ETag / Last-Modified validators and bodies for conditional requests
+HTTP_CACHE_DIR = os.path.join(CACHE_DIR, "http")
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` saved"""
+
+    def __init__(self, rate, burst):
+        if rate <= 0:
+            raise ValueError("rate must be greater than zero")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and return the seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+
+            # Reserve a token even if we have to wait for it, so waiting
+            # threads are served in the order they arrived
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+_rate_limiter = TokenBucket(DEFAULT_REQUESTS_PER_SECOND, DEFAULT_BURST)
+
+def configure_rate_limit(requests_per_second=DEFAULT_REQUESTS_PER_SECOND, burst=DEFAULT_BURST):
+    """Replace the shared api.weather.gov rate limiter"""
+    global _rate_limiter
+    _rate_limiter = TokenBucket(requests_per_second, burst)
+    return _rate_limiter
+
+def get_rate_limiter():
+    """Return the shared api.weather.gov rate limiter"""
+    return _rate_limiter
+
+def build_session(pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES):
+    """Create a keep-alive session that retries transient NWS failures"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET'])
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept': 'application/geo+json'})
+    return session
+
+_session = None
+_session_lock = threading.Lock()
+
+def configure_session(pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES):
+    """Replace the shared HTTP session with one using the given pool settings"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = build_session(pool_size, retries)
+        return _session
+
+def get_session():
+    """Return the shared HTTP session, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+def nws_get(url, timeout=15, **kwargs):
+    """GET a weather.gov URL through the shared session and rate limiter"""
+    _rate_limiter.acquire()
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+def _http_cache_path(url):
+    return os.path.join(HTTP_CACHE_DIR, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+def nws_get_json(url, timeout=15, conditional=True):
+    """GET a weather.gov URL and return its JSON body
+
+    With `conditional`, the last ETag / Last-Modified seen for the URL is
+    sent back and a 304 Not Modified reuses the body cached on disk.
+    Raises for HTTP errors.
+    """
+    cache_path = _http_cache_path(url)
+    cached = load_json_file(cache_path) if conditional else None
+
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    response = nws_get(url, timeout=timeout, headers=headers)
+
+    if response.status_code == 304 and cached:
+        return json.loads(cached['body'])
+
+    response.raise_for_status()
+
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if conditional and (etag or last_modified):
+        try:
+            save_json_file(cache_path, {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'body': response.text
+            })
+        except OSError:
+            pass
+
+    return response.json()
+
+class RunCache:
+    """Single-flight memo of `fetch(key)` for the lifetime of one collection run
+    
+    The first caller for a key runs the fetch; concurrent and later callers
+    for the same key get that result (or exception) instead of refetching.
+    With `ttl` (seconds), a finished result is fetched again once it is older.
+    """
+    
+    def __init__(self, fetch, ttl=None):
+        self._fetch = fetch
+        self._ttl = ttl
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """Return the cached value for `key`, fetching it only on first request"""
+        with self._lock:
+            entry = self._futures.get(key)
+            if entry is not None and self._ttl is not None:
+                future, fetched_at = entry
+                if future.done() and time.monotonic() - fetched_at > self._ttl:
+                    entry = None
+            
+            is_owner = entry is None
+            if is_owner:
+                future = Future()
+                self._futures[key] = (future, time.monotonic())
+                self.misses += 1
+            else:
+                future = entry[0]
+                self.hits += 1
+        
+        if is_owner:
+            try:
+                future.set_result(self._fetch(key))
+            except Exception as e:
+                future.set_exception(e)
+            with self._lock:
+                if self._futures.get(key, (None,))[0] is future:
+                    self._futures[key] = (future, time.monotonic())
+        
+        return future.result()
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._futures)
+
+def load_json_file(path, default=None):
+    """Load a JSON cache file, returning `default` if it is missing or unreadable"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json_file(path, data):
+    """Write a JSON cache file atomically so readers never see half a file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# observation_backfill.py
+# Recover hours missed by the hourly collector from the NWS observation history
+
+import datetime
+from collections import defaultdict
+
+from facility_config import get_station_config, get_all_locations, use_facility_config
+from nws_client import NWS_API_BASE, nws_get_json
+from report_store import RAW_DIR, load_saved_reports
+from weather_tracker_gdrive import (build_observation_record, create_consolidated_report, save_consolidated_report,
+                                   upload_consolidated_reports)
+
+# The NWS keeps roughly a week of observations per station
+MAX_BACKFILL_DAYS = 7
+
+def hour_slot(timestamp):
+    """Truncate an ISO timestamp to the start of its hour"""
+    return datetime.datetime.fromisoformat(timestamp).replace(minute=0, second=0, microsecond=0)
+
+def find_missing_hours(locations, start, end, raw_dir=RAW_DIR):
+    """Return ({location: [missing hour slots]}, {location: last station used})"""
+    collected = defaultdict(set)
+    last_station = {}
+
+    for report in load_saved_reports(start, end, raw_dir):
+        for record in report.get('location_data', []):
+            if record.get('status') != 'SUCCESS':
+                continue
+            try:
+                slot = hour_slot(record['collection_timestamp'])
+            except (KeyError, ValueError):
+                continue
+            collected[record['location_code']].add(slot)
+            if record.get('station_id'):
+                last_station[record['location_code']] = record['station_id']
+
+    expected = []
+    slot = start.replace(minute=0, second=0, microsecond=0)
+    while slot < end:
+        expected.append(slot)
+        slot += datetime.timedelta(hours=1)
+
+    missing = {}
+    for location_code in locations:
+        gaps = [slot for slot in expected if slot not in collected[location_code]]
+        if gaps:
+            missing[location_code] = gaps
+    return missing, last_station
+
+def merge_into_gaps(slots):
+    """Merge sorted hour slots into (gap_start, gap_end) ranges, end exclusive"""
+    gaps = []
+    for slot in sorted(set(slots)):
+        if gaps and gaps[-1][1] == slot:
+            gaps[-1][1] = slot + datetime.timedelta(hours=1)
+        else:
+            gaps.append([slot, slot + datetime.timedelta(hours=1)])
+    return [tuple(gap) for gap in gaps]
+
+def fetch_observation_range(station_id, start, end):
+    """Fetch every observation for a station between two local times
+
+    One request per gap; only follows pagination if the NWS splits a very
+    long range across pages.
+    """
+    start_utc = start.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    end_utc = end.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    url = f"{NWS_API_BASE}/stations/{station_id}/observations?start={start_utc}&end={end_utc}&limit=500"
+
+    observations = []
+    while url:
+        data = nws_get_json(url, timeout=30, conditional=False)
+        features = data.get('features', [])
+        observations.extend(feature.get('properties', {}) for feature in features)
+        url = data.get('pagination', {}).get('next') if features else None
+    return observations
+
+def pick_observation_for_hour(observations, slot):
+    """Latest observation taken during the hour, else in the hour before it"""
+    def observed_at(props):
+        try:
+            return datetime.datetime.fromisoformat(props['timestamp']).astimezone().replace(tzinfo=None)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    hour = datetime.timedelta(hours=1)
+    for window_start, window_end in ((slot, slot + hour), (slot - hour, slot)):
+        in_window = [(observed_at(p), p) for p in observations]
+        in_window = [(t, p) for t, p in in_window if t and window_start <= t < window_end]
+        if in_window:
+            return max(in_window, key=lambda item: item[0])[1]
+    return None
+
+def backfill(start, end, dry_run=False, raw_dir=RAW_DIR):
+    """Find missing hours between start and end and write backfilled reports"""
+    locations = get_all_locations()
+    missing, last_station = find_missing_hours(locations, start, end, raw_dir)
+
+    if not missing:
+        print(" No missing hours found")
+        return []
+
+    # Group locations by station so each gap costs one request per station
+    station_slots = defaultdict(set)
+    location_station = {}
+    for location_code, slots in missing.items():
+        config = get_station_config(location_code)
+        if not config:
+            continue
+        station_id = last_station.get(location_code) or config.get('primary_station')
+        if not station_id:
+            continue
+        location_station[location_code] = station_id
+        station_slots[station_id].update(slots)
+
+    print(f" Missing hours: {sum(len(s) for s in missing.values())} across {len(missing)} locations")
+    for station_id, slots in sorted(station_slots.items()):
+        gaps = merge_into_gaps(slots)
+        print(f"   {station_id}: {len(slots)} hour(s) in {len(gaps)} gap(s)")
+
+    if dry_run:
+        return []
+
+    station_observations = {}
+    for station_id, slots in station_slots.items():
+        station_observations[station_id] = []
+        for gap_start, gap_end in merge_into_gaps(slots):
+            # Include the hour before the gap so its first hour has a fallback
+            try:
+                station_observations[station_id].extend(
+                    fetch_observation_range(station_id, gap_start - datetime.timedelta(hours=1), gap_end))
+            except Exception as e:
+                print(f" ❌ {station_id} {gap_start:%Y-%m-%d %H:%M} - {gap_end:%H:%M}: {e}")
+
+    # Build one backfilled report per missing hour
+    records_by_slot = defaultdict(list)
+    backfill_time = datetime.datetime.now().isoformat()
+    for location_code, slots in missing.items():
+        station_id = location_station.get(location_code)
+        if not station_id:
+            continue
+        config = get_station_config(location_code)
+        for slot in slots:
+            props = pick_observation_for_hour(station_observations.get(station_id, []), slot)
+            if not props:
+                continue
+            record = build_observation_record(location_code, config, station_id,
+                                              station_id != config.get('primary_station'), props, slot)
+            record.update({
+                "backfilled": True,
+                "backfill_timestamp": backfill_time,
+                "alerts": [],
+                "alert_count": 0,
+                "alerts_note": "Historical alerts are not available for backfilled hours",
+                "alerts_gps": config['alerts_gps']
+            })
+            records_by_slot[slot].append(record)
+
+    saved = []
+    reports = []
+    for slot, records in sorted(records_by_slot.items()):
+        report = create_consolidated_report(records, slot)
+        report['report_metadata']['backfilled'] = True
+        report['report_metadata']['backfill_timestamp'] = backfill_time
+        report['report_metadata']['collection_summary'] = "Backfilled weather report recovered from NWS observation history"
+        saved.append(save_consolidated_report(report, upload=False))
+        reports.append(report)
+
+    # One Drive sign-in for the whole backfill rather than one per hour
+    if reports:
+        upload_consolidated_reports(reports)
+
+    print(f"\n Backfilled {sum(len(r) for r in records_by_slot.values())} location-hours into {len(saved)} report(s)")
+    return saved
+
+def main():
+    """Backfill missed collection hours"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Recover missed hourly collections from NWS observation history')
+    parser.add_argument('--days', type=int, default=2,
+                        help=f'Look back this many days (default: 2, NWS keeps about {MAX_BACKFILL_DAYS})')
+    parser.add_argument('--start', help='Start date/time (YYYY-MM-DD or YYYY-MM-DDTHH:MM), overrides --days')
+    parser.add_argument('--end', help='End date/time, exclusive (default: start of the current hour)')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the missing hours')
+    parser.add_argument('--config', help='JSON configuration file from station_finder.py --bulk (default: configuration.py)')
+
+    args = parser.parse_args()
+
+    if args.config:
+        use_facility_config(args.config)
+
+    now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+    end = datetime.datetime.fromisoformat(args.end) if args.end else now
+    start = datetime.datetime.fromisoformat(args.start) if args.start else end - datetime.timedelta(days=args.days)
+
+    if end - start > datetime.timedelta(days=MAX_BACKFILL_DAYS):
+        print(f" Note: the NWS usually keeps only about {MAX_BACKFILL_DAYS} days of observations")
+
+    print(f" Checking {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M} for missing hours...")
+    backfill(start, end, dry_run=args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# observation_hedger.py
+# Hedged observation fetches: ask a backup station when the primary is slow
+
+import collections
+import datetime
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Observations older than this are not accepted from a hedged fetch
+MAX_OBSERVATION_AGE_HOURS = 2
+
+# Latency budget used until enough fetches have been timed this run
+DEFAULT_HEDGE_DELAY = 5.0
+DEFAULT_HEDGE_PERCENTILE = 95
+MIN_LATENCY_SAMPLES = 20
+
+class LatencyTracker:
+    """Rolling window of observation fetch latencies (seconds)"""
+
+    def __init__(self, window=200):
+        self._samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct, default=None):
+        """Return the pct-th percentile latency, or `default` with too few samples"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return default
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+def observation_age_hours(props, now=None):
+    """Age of an observation in hours, or None if it has no usable timestamp"""
+    try:
+        observed = datetime.datetime.fromisoformat(props['timestamp'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if observed.tzinfo is None:
+        observed = observed.replace(tzinfo=datetime.timezone.utc)
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return (now - observed).total_seconds() / 3600
+
+def is_fresh_observation(props, max_age_hours=MAX_OBSERVATION_AGE_HOURS):
+    """True if an observation has a timestamp no older than max_age_hours"""
+    age = observation_age_hours(props)
+    return age is not None and age <= max_age_hours
+
+class ObservationHedger:
+    """Fetch a station's observation, hedging to a backup past a latency budget
+
+    The primary request starts right away. If it has not produced a fresh
+    observation within the budget (a fixed delay, or the chosen percentile
+    of latencies seen so far), one request to the first backup starts and
+    the first fresh observation wins. Fetches go through the run's shared
+    StationObservationCache, so hedging never refetches a station; that
+    cache should record its network latencies into the same LatencyTracker.
+    """
+
+    def __init__(self, observations, latency, hedge_delay=None, percentile=DEFAULT_HEDGE_PERCENTILE,
+                 max_workers=16):
+        self.observations = observations
+        self.latency = latency
+        self.hedge_delay = hedge_delay
+        self.percentile = percentile
+        self.hedges_started = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def budget(self):
+        """Seconds to wait on the primary before starting the backup"""
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        return self.latency.percentile(self.percentile, DEFAULT_HEDGE_DELAY)
+
+    def fetch(self, station_id, backup_station_ids, failed_stations=None):
+        """Return (winning_station_id, props, hedged)
+
+        Stations whose fetch raised before the result was settled are
+        appended to `failed_stations`, as the collector's sequential
+        failover does. Raises the primary's error if no station returned an
+        observation.
+        """
+        primary = self._executor.submit(self.observations.get, station_id)
+        pending = {primary: station_id}
+        done, _ = wait([primary], timeout=self.budget())
+
+        # The primary answered in time with something usable
+        if done and not primary.exception() and is_fresh_observation(primary.result()):
+            return station_id, primary.result(), False
+
+        backups = [s for s in backup_station_ids if s and s != station_id]
+        if not backups:
+            wait([primary])
+            self._note_failures(pending, failed_stations)
+            return station_id, primary.result(), False
+
+        with self._lock:
+            self.hedges_started += 1
+        backup = self._executor.submit(self.observations.get, backups[0])
+        pending[backup] = backups[0]
+
+        # First fresh observation wins; otherwise fall back to whatever the
+        # primary produced (stale data or its error)
+        waiting = set(pending)
+        while waiting:
+            done, waiting = wait(waiting, return_when=FIRST_COMPLETED)
+            for future in done:
+                if not future.exception() and is_fresh_observation(future.result()):
+                    self._note_failures(pending, failed_stations)
+                    return pending[future], future.result(), True
+
+        self._note_failures(pending, failed_stations)
+        if not backup.exception() and primary.exception():
+            return backups[0], backup.result(), True
+        return station_id, primary.result(), True
+
+    @staticmethod
+    def _note_failures(pending, failed_stations):
+        if failed_stations is None:
+            return
+        for future, station_id in pending.items():
+            if future.done() and future.exception() is not None:
+                failed_stations.append(station_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# report_bundler.py
+# Pack each finished day's reports into one compressed bundle
+#
+# A day's reports come from its report store segments (sealed into the
+# bundle once the day is over) and any per-run files left by failed
+# Drive uploads.
+#
+# A bundle is a series of gzip frames, one per report, so `gzip -dc` on
+# the file still prints every report. A sidecar index records each
+# frame's original file name, collection time, offset, length and the
+# SHA-256 of the uncompressed report, so one hour can be read without
+# decompressing the rest and is checked every time it is read.
+
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import zlib
+
+from report_store import RAW_DIR, ReportStore, report_filename, report_time_from_filename
+
+BUNDLE_DIR = os.path.join(RAW_DIR, "bundles")
+BUNDLE_PREFIX = "reports_"
+BUNDLE_SUFFIX = ".bundle"
+INDEX_SUFFIX = ".idx.json"
+
+class BundleChecksumError(ValueError):
+    """A bundled report did not match the checksum recorded when it was packed"""
+
+def bundle_path(day, bundle_dir=BUNDLE_DIR):
+    return os.path.join(bundle_dir, f"{BUNDLE_PREFIX}{day.isoformat()}{BUNDLE_SUFFIX}")
+
+class ReportBundle:
+    """Read access to one day's bundle"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path + INDEX_SUFFIX, 'r') as f:
+            self.index = json.load(f)
+        self.frames = self.index.get('frames', [])
+        self._by_name = {frame['name']: frame for frame in self.frames}
+
+    @property
+    def day(self):
+        return datetime.date.fromisoformat(self.index['day'])
+
+    def names(self):
+        """Original report file names, in collection order"""
+        return [frame['name'] for frame in self.frames]
+
+    def read_bytes(self, name):
+        """Uncompressed bytes of one bundled report file, checked against its SHA-256"""
+        frame = self._by_name[name]
+        with open(self.path, 'rb') as f:
+            f.seek(frame['offset'])
+            raw = f.read(frame['length'])
+        try:
+            data = gzip.decompress(raw)
+        except (OSError, EOFError, zlib.error) as e:
+            raise BundleChecksumError(f"{name} in {os.path.basename(self.path)} is corrupted: {e}")
+        if hashlib.sha256(data).hexdigest() != frame['sha256']:
+            raise BundleChecksumError(f"{name} in {os.path.basename(self.path)} is corrupted")
+        return data
+
+    def read(self, name):
+        """One bundled report, parsed"""
+        return json.loads(self.read_bytes(name))
+
+    def read_hour(self, hour):
+        """Reports collected during the given hour (0-23)"""
+        return [self.read(frame['name']) for frame in self.frames
+                if datetime.datetime.fromisoformat(frame['collection_time']).hour == hour]
+
+    def reports(self, start=None, end=None):
+        """Yield (name, report) for reports collected in [start, end)"""
+        for frame in self.frames:
+            collected = datetime.datetime.fromisoformat(frame['collection_time'])
+            if (start is None or collected >= start) and (end is None or collected < end):
+                yield frame['name'], self.read(frame['name'])
+
+    def verify(self):
+        """Return the names of frames that fail their checksum"""
+        bad = []
+        for name in self.names():
+            try:
+                self.read_bytes(name)
+            except (BundleChecksumError, OSError):
+                bad.append(name)
+        return bad
+
+def list_bundles(start=None, end=None, bundle_dir=BUNDLE_DIR):
+    """Paths of bundles for days overlapping [start, end), oldest first"""
+    if not os.path.isdir(bundle_dir):
+        return []
+    paths = []
+    for filename in sorted(os.listdir(bundle_dir)):
+        if not (filename.startswith(BUNDLE_PREFIX) and filename.endswith(BUNDLE_SUFFIX)):
+            continue
+        try:
+            day = datetime.date.fromisoformat(filename[len(BUNDLE_PREFIX):-len(BUNDLE_SUFFIX)])
+        except ValueError:
+            continue
+        if (start is not None and day < start.date()) or (end is not None and day > end.date()):
+            continue
+        paths.append(os.path.join(bundle_dir, filename))
+    return paths
+
+def load_bundled_reports(start=None, end=None, bundle_dir=BUNDLE_DIR, skip=()):
+    """Yield (name, report) for every bundled report collected in [start, end)
+
+    Reports whose names are in `skip` (already read from elsewhere) are
+    never decompressed.
+    """
+    for path in list_bundles(start, end, bundle_dir):
+        try:
+            bundle = ReportBundle(path)
+        except (OSError, ValueError) as e:
+            print(f" Skipping unreadable bundle {os.path.basename(path)}: {e}")
+            continue
+        for name in bundle.names():
+            try:
+                collected = report_time_from_filename(name)
+                if collected is None or (start is not None and collected < start) or (end is not None and collected >= end):
+                    continue
+                if name in skip:
+                    continue
+                yield name, bundle.read(name)
+            except (BundleChecksumError, OSError, ValueError) as e:
+                print(f" Skipping bundled report {name}: {e}")
+
+def loose_report_files(raw_dir=RAW_DIR):
+    """{day: [file names]} of per-run report files still in raw_dir"""
+    days = {}
+    if not os.path.exists(raw_dir):
+        return days
+    for filename in sorted(os.listdir(raw_dir)):
+        collected = report_time_from_filename(filename)
+        if collected is not None:
+            days.setdefault(collected.date(), []).append(filename)
+    return days
+
+def store_report_files(store, day):
+    """({file name: bytes}, reports read) for the reports in a day's store segments
+
+    Each report is named and serialized as its per-run file would be, so
+    a bundle reads the same whichever way a report reached it. Reports
+    without a usable collection time are counted but left out.
+    """
+    files = {}
+    count = 0
+    for name in store.day_segments(day):
+        for report in store.segment_reports(name):
+            count += 1
+            filename = report_filename(report.get('report_metadata', {}).get('collection_timestamp', ''))
+            if report_time_from_filename(filename) is not None:
+                files[filename] = json.dumps(report, separators=(',', ':')).encode('utf-8')
+    return files, count
+
+def bundle_day(day, raw_dir=RAW_DIR, bundle_dir=BUNDLE_DIR, keep_originals=False, store=None, today=None):
+    """Pack one day's per-run files and report store segments into its bundle
+
+    The day's store segments are only sealed into the bundle once the day
+    is over (the collector may still be appending to them). Returns
+    (reports packed, bytes before, bytes after). Original files and
+    segments are only removed after every new frame has been read back
+    and verified.
+    """
+    today = today or datetime.date.today()
+    if store is None:
+        store = ReportStore(os.path.join(raw_dir, "report_store"))
+    segments = store.day_segments(day) if day < today else []
+
+    filenames = loose_report_files(raw_dir).get(day, [])
+    pending = {}
+    bytes_before = 0
+    for filename in filenames:
+        with open(os.path.join(raw_dir, filename), 'rb') as f:
+            pending[filename] = f.read()
+        bytes_before += len(pending[filename])
+    if segments:
+        store_files, stored = store_report_files(store, day)
+        for name, data in store_files.items():
+            # A per-run file of the same report (a failed upload) is identical
+            pending.setdefault(name, data)
+        bytes_before += sum(store.segment_bytes(name) for name in segments)
+        if len(store_files) != stored:
+            print(f" {day}: {stored - len(store_files)} stored report(s) have no usable time - keeping the segments")
+            segments = []
+    if not pending:
+        return 0, 0, 0
+
+    path = bundle_path(day, bundle_dir)
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    existing = ReportBundle(path) if os.path.exists(path) else None
+    already_bundled = set(existing.names()) if existing else set()
+    if keep_originals and already_bundled.issuperset(pending):
+        return 0, 0, 0
+    frames = []
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, 'wb') as out:
+        # Frames already in the bundle are copied first, unchanged, so
+        # they keep their offsets
+        if existing:
+            with open(existing.path, 'rb') as f:
+                out.write(f.read())
+            frames.extend(existing.frames)
+
+        for name, data in sorted(pending.items()):
+            if name in already_bundled:
+                continue
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            frames.append({
+                "name": name,
+                "collection_time": report_time_from_filename(name).isoformat(),
+                "offset": out.tell(),
+                "length": len(compressed),
+                "size": len(data),
+                "sha256": hashlib.sha256(data).hexdigest()
+            })
+            out.write(compressed)
+        out.flush()
+        os.fsync(out.fileno())
+
+    frames.sort(key=lambda frame: frame['collection_time'])
+    index = {"day": day.isoformat(), "created": datetime.datetime.now().isoformat(), "frames": frames}
+    with open(f"{path}{INDEX_SUFFIX}.tmp", 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+    # The old index stays valid for the new bundle until it is replaced
+    os.replace(tmp_path, path)
+    os.replace(f"{path}{INDEX_SUFFIX}.tmp", path + INDEX_SUFFIX)
+
+    bundle = ReportBundle(path)
+    bad = [name for name in bundle.verify() if name in pending]
+    if bad:
+        raise BundleChecksumError(f"Verification failed for {len(bad)} report(s) in {os.path.basename(path)}")
+
+    if not keep_originals:
+        for filename in filenames:
+            os.remove(os.path.join(raw_dir, filename))
+        for name in segments:
+            store.remove_segment(name)
+
+    bytes_after = os.path.getsize(path) + os.path.getsize(path + INDEX_SUFFIX)
+    return len(pending), bytes_before, bytes_after
+
+def bundle_complete_days(raw_dir=RAW_DIR, bundle_dir=BUNDLE_DIR, keep_originals=False, today=None):
+    """Bundle every day before today that still has per-run files or store segments"""
+    today = today or datetime.date.today()
+    store = ReportStore(os.path.join(raw_dir, "report_store"))
+    results = {}
+    for day in sorted(set(loose_report_files(raw_dir)) | set(store.days())):
+        if day >= today:
+            continue
+        results[day] = bundle_day(day, raw_dir, bundle_dir, keep_originals, store, today)
+    return results
+
+def latest_bundled_report(bundle_dir=BUNDLE_DIR):
+    """The most recently collected bundled report, or None"""
+    for path in reversed(list_bundles(bundle_dir=bundle_dir)):
+        try:
+            bundle = ReportBundle(path)
+            if bundle.frames:
+                return bundle.read(bundle.frames[-1]['name'])
+        except (BundleChecksumError, OSError, ValueError) as e:
+            print(f" Skipping unreadable bundle {os.path.basename(path)}: {e}")
+    return None
+
+def main():
+    """Bundle finished days of hourly reports"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pack finished days of reports into compressed bundles')
+    parser.add_argument('--day', action='append', help='Bundle only this day (YYYY-MM-DD, can be repeated)')
+    parser.add_argument('--keep', action='store_true', help='Keep the report files and store segments after bundling')
+    parser.add_argument('--verify', action='store_true', help='Check every bundled report against its checksum')
+
+    args = parser.parse_args()
+
+    if args.verify:
+        total = 0
+        for path in list_bundles():
+            bundle = ReportBundle(path)
+            bad = bundle.verify()
+            total += len(bad)
+            status = "OK" if not bad else f"{len(bad)} corrupted: {', '.join(bad)}"
+            print(f" {os.path.basename(path)}: {len(bundle.frames)} reports - {status}")
+        print(f"\n {'All bundles verified' if not total else f'{total} corrupted report(s) found'}")
+        return
+
+    if args.day:
+        days = [datetime.date.fromisoformat(day) for day in args.day]
+        results = {day: bundle_day(day, keep_originals=args.keep) for day in days}
+    else:
+        results = bundle_complete_days(keep_originals=args.keep)
+
+    if not any(count for count, _, _ in results.values()):
+        print(" No reports to bundle")
+        return
+
+    total_before = total_after = total_files = 0
+    for day, (count, before, after) in sorted(results.items()):
+        if not count:
+            continue
+        print(f" {day}: {count} reports, {before / 1024:.0f} KB -> bundle of {after / 1024:.0f} KB")
+        total_files += count
+        total_before += before
+        total_after += after
+    print(f"\n Bundled {total_files} reports: {total_before / 1024:.0f} KB -> {total_after / 1024:.0f} KB")
+
+if __name__ == "__main__":
+    main()
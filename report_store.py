@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# report_store.py
+# Append-only, indexed storage for consolidated weather reports
+#
+# Replaces the ever-growing consolidated_weather_log.json. Reports are
+# appended to one segment file per day (rolling over to a new segment when
+# one gets too large). Each report is written as a header line followed by
+# one line per location, and a sidecar index records where every line
+# starts, so a day, a time range or one location can be read without
+# parsing the rest of the history.
+
+import datetime
+import json
+import os
+import threading
+
+RAW_DIR = "../raw_weather_json"
+STORE_DIR = os.path.join(RAW_DIR, "report_store")
+LEGACY_LOG_FILE = os.path.join(RAW_DIR, "consolidated_weather_log.json")
+REPORT_PREFIX = "consolidated_weather_report_"
+
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+
+# Start a new segment for the same day once the current one is this large
+MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+
+def report_time_from_filename(filename):
+    """Collection time encoded in a consolidated report filename, or None"""
+    if not (filename.startswith(REPORT_PREFIX) and filename.endswith(".json")):
+        return None
+    stamp = filename[len(REPORT_PREFIX):-len(".json")]
+    try:
+        date_part, time_part = stamp.split('T')
+        return datetime.datetime.strptime(f"{date_part}T{time_part[:8]}", "%Y-%m-%dT%H-%M-%S")
+    except ValueError:
+        return None
+
+def report_filename(collection_timestamp):
+    """Per-run report filename for a collection timestamp"""
+    return f"{REPORT_PREFIX}{collection_timestamp.replace(':', '-').replace('.', '-')}.json"
+
+def _parse_time(timestamp):
+    try:
+        return datetime.datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+
+def _in_range(collected, start, end):
+    if collected is None:
+        return False
+    return (start is None or collected >= start) and (end is None or collected < end)
+
+class ReportStore:
+    """Daily segment files of reports with a byte-offset index per segment
+
+    Segment `segment_<date>[_<n>].jsonl` holds the reports collected on
+    that date. Its sidecar `.idx` file has one JSON line per stored line:
+    [collection_timestamp, location_code, offset, length], where the
+    location code is null for a report's header line.
+    """
+
+    def __init__(self, path=STORE_DIR, max_segment_bytes=MAX_SEGMENT_BYTES):
+        self.path = path
+        self.max_segment_bytes = max_segment_bytes
+        self._lock = threading.Lock()
+
+    # Segments
+
+    def _segment_date(self, name):
+        stem = name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+        try:
+            return datetime.date.fromisoformat(stem[:10])
+        except ValueError:
+            return None
+
+    def segments(self, start=None, end=None):
+        """Segment names whose day overlaps [start, end), oldest first"""
+        if not os.path.isdir(self.path):
+            return []
+
+        names = []
+        for name in os.listdir(self.path):
+            if not (name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)):
+                continue
+            day = self._segment_date(name)
+            if day is None:
+                continue
+            if start is not None and day < start.date():
+                continue
+            if end is not None and day > end.date():
+                continue
+            names.append(name)
+
+        # segment_2025-01-01.jsonl sorts before segment_2025-01-01_001.jsonl
+        return sorted(names, key=lambda name: (name[:len(SEGMENT_PREFIX) + 10], len(name), name))
+
+    def days(self):
+        """Dates with at least one segment, oldest first"""
+        return sorted({self._segment_date(name) for name in self.segments()})
+
+    def day_segments(self, day):
+        """Segment names holding the reports collected on `day`"""
+        return [name for name in self.segments() if self._segment_date(name) == day]
+
+    def segment_bytes(self, name):
+        """Size of a segment plus its index"""
+        segment_path = os.path.join(self.path, name)
+        return sum(os.path.getsize(path) for path in (segment_path, segment_path + INDEX_SUFFIX)
+                   if os.path.exists(path))
+
+    def remove_segment(self, name):
+        """Delete a segment and its index (after its reports were bundled)"""
+        with self._lock:
+            for path in (os.path.join(self.path, name + INDEX_SUFFIX), os.path.join(self.path, name)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _current_segment(self, day):
+        """Segment to append to for a day, rolling over when it is full"""
+        base = f"{SEGMENT_PREFIX}{day.isoformat()}"
+        name = f"{base}{SEGMENT_SUFFIX}"
+        number = 0
+        while True:
+            segment_path = os.path.join(self.path, name)
+            if not os.path.exists(segment_path) or os.path.getsize(segment_path) < self.max_segment_bytes:
+                return name
+            number += 1
+            name = f"{base}_{number:03d}{SEGMENT_SUFFIX}"
+
+    def _read_index(self, name):
+        entries = []
+        try:
+            with open(os.path.join(self.path, name + INDEX_SUFFIX), 'r') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return entries
+
+    # Writing
+
+    def append(self, report):
+        """Append one consolidated report and index its lines; returns the segment name"""
+        metadata = report.get('report_metadata', {})
+        collection_timestamp = metadata.get('collection_timestamp') or datetime.datetime.now().isoformat()
+        day = (_parse_time(collection_timestamp) or datetime.datetime.now()).date()
+
+        header = {key: value for key, value in report.items() if key != 'location_data'}
+        lines = [(None, header)]
+        lines.extend((record.get('location_code'), record) for record in report.get('location_data', []))
+
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            name = self._current_segment(day)
+            entries = []
+            with open(os.path.join(self.path, name), 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                for location_code, data in lines:
+                    encoded = (json.dumps(data, separators=(',', ':')) + "\n").encode('utf-8')
+                    f.write(encoded)
+                    entries.append([collection_timestamp, location_code, offset, len(encoded)])
+                    offset += len(encoded)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # The index is written after the data, so it never points past
+            # the end of a segment
+            with open(os.path.join(self.path, name + INDEX_SUFFIX), 'a') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, separators=(',', ':')) + "\n")
+        return name
+
+    # Reading
+
+    def index_entries(self, start=None, end=None, locations=None):
+        """Yield (segment, entry) for indexed lines in [start, end), optionally for some locations
+
+        Report header entries (location None) are only included when
+        `locations` is not given.
+        """
+        wanted = set(locations) if locations is not None else None
+        for name in self.segments(start, end):
+            for entry in self._read_index(name):
+                if not _in_range(_parse_time(entry[0]), start, end):
+                    continue
+                if wanted is not None and entry[1] not in wanted:
+                    continue
+                yield name, entry
+
+    def _read_entries(self, name, entries):
+        with open(os.path.join(self.path, name), 'rb') as f:
+            for entry in entries:
+                f.seek(entry[2])
+                yield entry, json.loads(f.read(entry[3]))
+
+    def _grouped(self, selected):
+        """Read selected index entries segment by segment, in order"""
+        current, batch = None, []
+        for name, entry in selected:
+            if name != current and batch:
+                yield from self._read_entries(current, batch)
+                batch = []
+            current = name
+            batch.append(entry)
+        if batch:
+            yield from self._read_entries(current, batch)
+
+    def records(self, start=None, end=None, locations=None):
+        """Yield location records collected in [start, end), optionally only some locations"""
+        selected = ((name, entry) for name, entry in self.index_entries(start, end, locations)
+                    if entry[1] is not None)
+        for entry, record in self._grouped(selected):
+            yield record
+
+    def reports(self, start=None, end=None):
+        """Yield whole consolidated reports collected in [start, end)"""
+        return self._assemble(self._grouped(self.index_entries(start, end)))
+
+    def segment_reports(self, name):
+        """Yield every report in one segment, in the order they were appended"""
+        return self._assemble(self._read_entries(name, self._read_index(name)))
+
+    @staticmethod
+    def _assemble(lines):
+        """Put (entry, data) lines back together into reports"""
+        report = None
+        report_timestamp = None
+        for entry, data in lines:
+            if entry[1] is None:
+                if report is not None:
+                    yield report
+                report = dict(data, location_data=[])
+                report_timestamp = entry[0]
+            elif report is not None and entry[0] == report_timestamp:
+                report['location_data'].append(data)
+        if report is not None:
+            yield report
+
+    def latest_report(self):
+        """The most recently collected report in the store, or None"""
+        for name in reversed(self.segments()):
+            entries = self._read_index(name)
+            headers = [entry[0] for entry in entries if entry[1] is None]
+            if not headers:
+                continue
+            newest = max(headers)
+            report = None
+            for entry, data in self._read_entries(name, [entry for entry in entries if entry[0] == newest]):
+                if entry[1] is None:
+                    report = dict(data, location_data=[])
+                elif report is not None:
+                    report['location_data'].append(data)
+            return report
+        return None
+
+    def report_timestamps(self, start=None, end=None):
+        """Collection timestamps of the stored reports in [start, end)"""
+        return {entry[0] for name, entry in self.index_entries(start, end) if entry[1] is None}
+
+    # Legacy log
+
+    def import_legacy_log(self, log_path=LEGACY_LOG_FILE):
+        """Copy reports from the old consolidated_weather_log.json; returns the number added"""
+        if not os.path.exists(log_path):
+            return 0
+
+        stored = self.report_timestamps()
+        added = 0
+        with open(log_path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    report = json.loads(line)
+                except ValueError:
+                    print(f" Skipping unreadable log line {line_number}")
+                    continue
+                timestamp = report.get('report_metadata', {}).get('collection_timestamp')
+                if timestamp in stored:
+                    continue
+                self.append(report)
+                stored.add(timestamp)
+                added += 1
+        return added
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_report_store():
+    """Return the process-wide report store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ReportStore()
+        return _store
+
+def load_saved_reports(start, end, raw_dir=RAW_DIR):
+    """Yield saved consolidated reports collected between start and end
+
+    Reads the report store (the days not bundled yet), then daily bundles
+    and per-run report files in `raw_dir` for any reports the store does
+    not have.
+    """
+    # Imported here because report_bundler builds on this module
+    from report_bundler import load_bundled_reports
+
+    if raw_dir == RAW_DIR:
+        store = get_report_store()
+    else:
+        store = ReportStore(os.path.join(raw_dir, "report_store"))
+
+    seen_files = set()
+    for report in store.reports(start, end):
+        seen_files.add(report_filename(report.get('report_metadata', {}).get('collection_timestamp', '')))
+        yield report
+
+    # Names read so far are skipped before their frames are decompressed
+    for name, report in load_bundled_reports(start, end, os.path.join(raw_dir, "bundles"), skip=seen_files):
+        seen_files.add(name)
+        yield report
+
+    if not os.path.exists(raw_dir):
+        return
+
+    for filename in sorted(os.listdir(raw_dir)):
+        collected = report_time_from_filename(filename)
+        if collected is None or not (start <= collected < end) or filename in seen_files:
+            continue
+        try:
+            with open(os.path.join(raw_dir, filename), 'r') as f:
+                yield json.load(f)
+        except (OSError, ValueError) as e:
+            print(f" Skipping unreadable report {filename}: {e}")
+
+def main():
+    """Import the legacy log or query the report store"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Manage the consolidated weather report store')
+    parser.add_argument('--import-log', nargs='?', const=LEGACY_LOG_FILE, metavar='PATH',
+                        help=f'Copy reports from the old log file into the store (default: {LEGACY_LOG_FILE})')
+    parser.add_argument('--start', help='Query start date/time (YYYY-MM-DD or YYYY-MM-DDTHH:MM)')
+    parser.add_argument('--end', help='Query end date/time, exclusive')
+    parser.add_argument('--location', action='append', help='Only this location code (can be repeated)')
+
+    args = parser.parse_args()
+
+    store = get_report_store()
+
+    if args.import_log:
+        print(f" Importing {args.import_log}...")
+        print(f" Added {store.import_legacy_log(args.import_log)} report(s) to {store.path}")
+        return
+
+    start = datetime.datetime.fromisoformat(args.start) if args.start else None
+    end = datetime.datetime.fromisoformat(args.end) if args.end else None
+    if start and not end and len(args.start) == 10:
+        end = start + datetime.timedelta(days=1)
+
+    count = 0
+    for record in store.records(start, end, args.location):
+        count += 1
+        print(f"{record.get('collection_timestamp')}  {record.get('location_code')}  {record.get('status')}  "
+              f"{record.get('station_id')}  {record.get('temperature_F')}F  alerts: {record.get('alert_count', 0)}")
+    print(f"\n {count} record(s) in {len(store.segments(start, end))} segment(s)")
+
+if __name__ == "__main__":
+    main()
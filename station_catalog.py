@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# station_catalog.py
+# Local copy of the complete NWS observation station list
+
+import datetime
+import gzip
+import json
+import os
+import threading
+
+from alert_matcher import STATE_CODES
+from nws_client import CACHE_DIR, NWS_API_BASE, nws_get_json
+
+CATALOG_FILE = os.path.join(CACHE_DIR, "station_catalog.json.gz")
+
+# Stations are added or retired rarely; refresh each state monthly
+CATALOG_TTL_DAYS = 30
+
+# Safety stop for the cursor pagination of /stations
+MAX_PAGES = 200
+
+COLUMNS = ('ids', 'names', 'lats', 'lons', 'elevations')
+
+# Codes /stations?state= accepts: the states plus the territories with
+# NWS stations. Marine zone prefixes (AM, GM, PZ...) are not among them.
+CATALOG_STATES = set(STATE_CODES.values()) | {'AS', 'GU', 'MP', 'VI'}
+# Partition for stations without a usable state (buoys, offshore platforms)
+NO_STATE = 'XX'
+
+def _empty_partition():
+    return {column: [] for column in COLUMNS}
+
+def state_from_station(props):
+    """Two-letter state of a station, or None if it has no usable one
+
+    Uses the station's `state` property when present, otherwise the first
+    county or zone ID that starts with a state code.
+    """
+    state = (props.get('state') or '').upper()
+    if state in CATALOG_STATES:
+        return state
+    for field in ('county', 'forecast', 'fireWeatherZone'):
+        zone_url = props.get(field)
+        if zone_url:
+            state = zone_url.rstrip('/').rsplit('/', 1)[-1][:2].upper()
+            if state in CATALOG_STATES:
+                return state
+    return None
+
+def fetch_station_pages(state=None):
+    """Page through /stations (optionally one state) and yield station features"""
+    url = f"{NWS_API_BASE}/stations?limit=500"
+    if state:
+        url += f"&state={state}"
+
+    seen_urls = set()
+    for _ in range(MAX_PAGES):
+        if not url or url in seen_urls:
+            break
+        seen_urls.add(url)
+
+        data = nws_get_json(url, timeout=30, conditional=False)
+        features = data.get('features', [])
+        if not features:
+            break
+        yield from features
+        url = data.get('pagination', {}).get('next')
+
+def _add_station(partition, feature):
+    geometry = feature.get('geometry') or {}
+    if geometry.get('type') != 'Point':
+        return
+    props = feature.get('properties', {})
+    station_lon, station_lat = geometry['coordinates'][:2]
+
+    partition['ids'].append(props.get('stationIdentifier', '').replace('https://api.weather.gov/stations/', ''))
+    partition['names'].append(props.get('name', 'Unknown'))
+    partition['lats'].append(station_lat)
+    partition['lons'].append(station_lon)
+    partition['elevations'].append((props.get('elevation') or {}).get('value'))
+
+class StationCatalog:
+    """All NWS stations (ID, name, lat, lon, elevation) stored per state
+
+    Stored as gzip-compressed column lists, one partition per state with
+    its own fetch time, so stale states can be refreshed on their own.
+    """
+
+    def __init__(self, path=CATALOG_FILE, ttl_days=CATALOG_TTL_DAYS):
+        self.path = path
+        self.ttl = datetime.timedelta(days=ttl_days)
+        self.states = {}
+        self._columns = None
+        self._lock = threading.Lock()
+        # Bumped whenever the stations change, so indexes know to rebuild
+        self.version = 0
+        self.load()
+
+    def load(self):
+        """Load the catalog from disk (empty if it does not exist yet)"""
+        try:
+            with gzip.open(self.path, 'rt') as f:
+                self.states = json.load(f).get('states', {})
+        except (OSError, ValueError):
+            self.states = {}
+        self._columns = None
+        self.version += 1
+
+    def save(self):
+        """Write the catalog to disk atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, 'wt') as f:
+            json.dump({'states': self.states}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def is_stale(self, state):
+        partition = self.states.get(state)
+        if not partition:
+            return True
+        try:
+            fetched_at = datetime.datetime.fromisoformat(partition['fetched_at'])
+        except (KeyError, ValueError):
+            return True
+        return datetime.datetime.now() - fetched_at > self.ttl
+
+    def refresh_all(self):
+        """Page through the whole /stations collection once and rebuild every state"""
+        fetched_at = datetime.datetime.now().isoformat()
+        states = {}
+        for feature in fetch_station_pages():
+            state = state_from_station(feature.get('properties', {})) or NO_STATE
+            partition = states.setdefault(state, dict(_empty_partition(), fetched_at=fetched_at))
+            _add_station(partition, feature)
+
+        if states:
+            with self._lock:
+                self.states = states
+                self._columns = None
+                self.version += 1
+        return sum(len(p['ids']) for p in states.values())
+
+    def refresh_state(self, state):
+        """Re-page one state's stations"""
+        partition = dict(_empty_partition(), fetched_at=datetime.datetime.now().isoformat())
+        for feature in fetch_station_pages(state):
+            _add_station(partition, feature)
+
+        with self._lock:
+            self.states[state] = partition
+            self._columns = None
+            self.version += 1
+        return len(partition['ids'])
+
+    def ensure_fresh(self, verbose=True):
+        """Build the catalog if it is empty, otherwise refresh only stale states
+
+        Returns True if anything was downloaded.
+        """
+        if not self.states:
+            if verbose:
+                print("Downloading the full NWS station catalog (first run only)...")
+            count = self.refresh_all()
+            self.save()
+            if verbose:
+                print(f"Cached {count} stations in {len(self.states)} states")
+            return True
+
+        # Stations without a state (and partitions under bogus marine codes
+        # from older catalogs) are only refreshed by a full rebuild
+        stale = [state for state in self.states if state in CATALOG_STATES and self.is_stale(state)]
+        for state in stale:
+            if verbose:
+                print(f"Refreshing station catalog for {state}...")
+            self.refresh_state(state)
+        if stale:
+            self.save()
+        return bool(stale)
+
+    def columns(self):
+        """Return the whole catalog as parallel lists: ids, names, lats, lons, elevations"""
+        with self._lock:
+            if self._columns is None:
+                columns = _empty_partition()
+                for state in sorted(self.states):
+                    for column in COLUMNS:
+                        columns[column].extend(self.states[state][column])
+                self._columns = columns
+            return self._columns
+
+    def __len__(self):
+        return len(self.columns()['ids'])
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_station_catalog(refresh=True):
+    """Return the process-wide station catalog, downloading or refreshing if needed"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = StationCatalog()
+        if refresh:
+            try:
+                _catalog.ensure_fresh()
+            except Exception as e:
+                if not _catalog.states:
+                    raise
+                print(f"Could not refresh station catalog, using cached copy: {e}")
+        return _catalog
+
+def main():
+    """Build or refresh the local station catalog"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Download and cache the NWS observation station list')
+    parser.add_argument('--full', action='store_true', help='Re-download every station, ignoring the TTL')
+    parser.add_argument('--state', action='append', help='Refresh only this state (can be repeated)')
+
+    args = parser.parse_args()
+
+    catalog = StationCatalog()
+    if args.full:
+        print(f"Cached {catalog.refresh_all()} stations")
+    elif args.state:
+        for state in args.state:
+            print(f"{state.upper()}: {catalog.refresh_state(state.upper())} stations")
+    else:
+        catalog.ensure_fresh()
+    catalog.save()
+
+    print(f"Station catalog: {len(catalog)} stations in {len(catalog.states)} states ({catalog.path})")
+
+if __name__ == "__main__":
+    main()
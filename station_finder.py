@@ -2,10 +2,34 @@
 # station_finder.py
 # Tool to find nearest weather stations for given GPS coordinates
 
-import requests
+import csv
+import datetime
 import json
 import math
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from facility_config import FACILITY_CONFIG_FILE, save_facility_config
+from nws_client import (DEFAULT_BURST, DEFAULT_POOL_SIZE, DEFAULT_REQUESTS_PER_SECOND, RunCache,
+                        configure_rate_limit, configure_session, nws_get)
+from station_index import get_station_index
+from station_health import OPEN, STALE_DATA_HOURS, get_health_store
+from observation_hedger import observation_age_hours
+
+# Stations probed at the same time in bulk mode. All probes share the
+# api.weather.gov rate limiter.
+DEFAULT_PROBE_WORKERS = 8
+
+# A station's probe result is reused for every facility that lists it
+# until it is this old
+PROBE_CACHE_TTL_MINUTES = 15
+
+# Column names accepted in bulk facility files (case-insensitive)
+NAME_FIELDS = ('name', 'facility_name', 'facility', 'location_name')
+LAT_FIELDS = ('lat', 'latitude')
+LON_FIELDS = ('lon', 'lng', 'long', 'longitude')
+REGION_FIELDS = ('region', 'state')
 
 def get_distance(lat1, lon1, lat2, lon2):
     """Calculate distance between two GPS points in miles"""
@@ -24,74 +48,109 @@ def find_nearest_stations(lat, lon, max_search_radius=200):
     """Find the 3 closest weather stations to given coordinates"""
     print(f"Finding stations near {lat}, {lon}")
     
-    # Get stations from NWS API - use larger search area to ensure we find enough stations
-    stations_url = f"https://api.weather.gov/stations?limit=500"
-    
+    # Stations come from a spatial index over the local station catalog,
+    # which only goes to the network when it is missing or out of date
     try:
-        response = requests.get(stations_url, timeout=15)
-        if response.status_code != 200:
-            print(f"Error getting stations: {response.status_code}")
-            return []
-        
-        stations_data = response.json()
-        stations = stations_data.get('features', [])
-        
-        # Calculate distances for all stations
-        all_stations_with_distance = []
-        
-        for station in stations:
-            try:
-                props = station['properties']
-                geometry = station['geometry']
-                
-                if geometry['type'] != 'Point':
-                    continue
-                
-                station_lon, station_lat = geometry['coordinates']
-                distance = get_distance(lat, lon, station_lat, station_lon)
-                
-                # Only consider stations within reasonable range
-                if distance <= max_search_radius:
-                    station_id = props.get('stationIdentifier', '').replace('https://api.weather.gov/stations/', '')
-                    
-                    station_info = {
-                        'id': station_id,
-                        'name': props.get('name', 'Unknown'),
-                        'distance': round(distance, 1),
-                        'lat': station_lat,
-                        'lon': station_lon,
-                        'elevation': props.get('elevation', {}).get('value')
-                    }
-                    
-                    all_stations_with_distance.append(station_info)
-                    
-            except Exception as e:
-                continue
-        
-        # Sort by distance and return the closest 3
-        all_stations_with_distance.sort(key=lambda x: x['distance'])
-        return all_stations_with_distance[:3]
-        
+        index = get_station_index()
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error loading station catalog: {e}")
         return []
+    
+    return index.nearest_stations(lat, lon, k=3, max_radius_miles=max_search_radius)
 
-def test_station_data(station_id):
-    """Test if a station has recent data"""
+def probe_station(station_id):
+    """Check a station's latest observation and return a probe result dict
+    
+    The result has 'has_data', 'status', 'data_age_hours' and 'checked_at'.
+    Stations whose circuit is open in the station health store are skipped
+    without a request; every probe result is recorded there (not saved).
+    """
+    result = {
+        "station_id": station_id,
+        "has_data": False,
+        "status": None,
+        "data_age_hours": None,
+        "checked_at": datetime.datetime.now().isoformat()
+    }
+    
+    health = get_health_store()
+    if health.state(station_id) == OPEN:
+        entry = health.get(station_id)
+        result["status"] = f"Skipped - repeated failures, retry after {entry['open_until']} (last error: {entry['last_error']})"
+        return result
+    
+    start = time.monotonic()
     try:
         url = f"https://api.weather.gov/stations/{station_id}/observations/latest"
-        response = requests.get(url, timeout=10)
+        response = nws_get(url, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
             props = data.get('properties', {})
             if props.get('timestamp'):
-                return True, "Has recent data"
+                age = observation_age_hours(props)
+                result["data_age_hours"] = round(age, 2) if age is not None else None
+                health.record_success(station_id, time.monotonic() - start, age)
+                if age is not None and age > STALE_DATA_HOURS:
+                    result["status"] = f"Stale data ({age:.1f} hours old)"
+                else:
+                    result["has_data"] = True
+                    result["status"] = "Has recent data" if age is None else f"Has recent data ({age:.1f} hours old)"
+                return result
         
-        return False, "No recent data"
+        health.record_failure(station_id, f"No recent data (HTTP {response.status_code})", time.monotonic() - start)
+        result["status"] = "No recent data"
         
     except Exception as e:
-        return False, f"Error: {str(e)}"
+        health.record_failure(station_id, e, time.monotonic() - start)
+        result["status"] = f"Error: {str(e)}"
+    return result
+
+class StationProber:
+    """Concurrent station probes, memoized per station for a short time
+    
+    Probes run on a bounded thread pool and go through the shared
+    api.weather.gov rate limiter. A station listed by many facilities is
+    probed once; later requests reuse the result until it expires.
+    """
+    
+    def __init__(self, workers=DEFAULT_PROBE_WORKERS, ttl_minutes=PROBE_CACHE_TTL_MINUTES):
+        self._results = RunCache(probe_station, ttl=ttl_minutes * 60)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    
+    def probe(self, station_id):
+        """Probe result for one station"""
+        return self._results.get(station_id)
+    
+    def probe_many(self, station_ids):
+        """Probe results for several stations at once, as {station_id: result}"""
+        station_ids = list(dict.fromkeys(station_ids))
+        results = dict(zip(station_ids, self._executor.map(self._results.get, station_ids)))
+        try:
+            get_health_store().save()
+        except OSError:
+            pass
+        return results
+    
+    @property
+    def cache_hits(self):
+        return self._results.hits
+    
+    @property
+    def probes_run(self):
+        return self._results.misses
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+_prober = None
+
+def get_station_prober(workers=DEFAULT_PROBE_WORKERS):
+    """Return the station prober shared by every facility in this run"""
+    global _prober
+    if _prober is None:
+        _prober = StationProber(workers)
+    return _prober
 
 def find_stations_for_location(name, lat, lon):
     """Find and test the 3 closest stations for a specific location"""
@@ -110,16 +169,16 @@ def find_stations_for_location(name, lat, lon):
     
     print(f"Found {len(stations)} closest stations:")
     
+    # Stations are probed together; the shared rate limiter keeps this
+    # respectful to the API, and stations tested for an earlier location
+    # are not tested again
+    results = get_station_prober().probe_many([station['id'] for station in stations])
+    
     for i, station in enumerate(stations):
-        print(f"Testing station {i+1}/3: {station['id']} ({station['distance']} mi)... ", end="")
-        
-        # Add delay to be respectful to the API
-        time.sleep(2)
+        result = results[station['id']]
+        print(f"Testing station {i+1}/3: {station['id']} ({station['distance']} mi)... {result['status']}")
         
-        has_data, status = test_station_data(station['id'])
-        print(status)
-        
-        if has_data:
+        if result['has_data']:
             working_stations.append(station['id'])
     
     print(f"\nWorking stations for {name}:")
@@ -138,9 +197,13 @@ def find_stations_for_location(name, lat, lon):
     all_station_ids = [station['id'] for station in stations]
     return all_station_ids
 
+def make_location_code(name):
+    """Location code used in the configuration for a location name"""
+    return name.lower().replace(' ', '_').replace('-', '_').replace('(', '').replace(')', '').replace(',', '')
+
 def generate_config_entry(name, lat, lon, stations, region="Unknown"):
     """Generate configuration code for a single location"""
-    location_code = name.lower().replace(' ', '_').replace('-', '_').replace('(', '').replace(')', '').replace(',', '')
+    location_code = make_location_code(name)
     
     primary = stations[0] if len(stations) > 0 else None
     backup1 = stations[1] if len(stations) > 1 else None
@@ -250,8 +313,134 @@ def batch_mode():
     
     return all_configs
 
+def _pick_field(row, field_names):
+    lowered = {str(key).strip().lower(): value for key, value in row.items()}
+    for field in field_names:
+        value = lowered.get(field)
+        if value not in (None, ''):
+            return value
+    return None
+
+def load_facilities(path):
+    """Read facilities from a CSV or GeoJSON file as (name, lat, lon, region) tuples
+    
+    CSV files need name, lat and lon columns (region/state is optional).
+    GeoJSON files need Point features with a name property.
+    """
+    rows = []
+    if path.lower().endswith(('.geojson', '.json')):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        for feature in data.get('features', []):
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') != 'Point':
+                continue
+            row = dict(feature.get('properties') or {})
+            row['lon'], row['lat'] = geometry['coordinates'][:2]
+            rows.append(row)
+    else:
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+    
+    facilities = []
+    skipped = 0
+    for row in rows:
+        name = _pick_field(row, NAME_FIELDS)
+        try:
+            lat = float(_pick_field(row, LAT_FIELDS))
+            lon = float(_pick_field(row, LON_FIELDS))
+        except (TypeError, ValueError):
+            lat = lon = None
+        if not name or lat is None or not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+            skipped += 1
+            continue
+        facilities.append((str(name).strip(), lat, lon, _pick_field(row, REGION_FIELDS) or "Unknown"))
+    
+    if skipped:
+        print(f"Skipped {skipped} rows without a name or valid coordinates")
+    return facilities
+
+def bulk_mode(path, output=FACILITY_CONFIG_FILE, workers=DEFAULT_PROBE_WORKERS):
+    """Find and test stations for every facility in a CSV or GeoJSON file
+    
+    Nearest stations come from the local station index. Each distinct
+    station is probed once through the station prober, and the result is
+    written as a JSON configuration file the collector loads with --config.
+    """
+    facilities = load_facilities(path)
+    print(f"BULK MODE: {len(facilities)} facilities from {path}")
+    print("=" * 60)
+    if not facilities:
+        return {}
+    
+    index = get_station_index()
+    nearby = {}
+    for name, lat, lon, region in facilities:
+        nearby[(name, lat, lon)] = index.nearest_stations(lat, lon, k=3, max_radius_miles=200)
+    
+    station_ids = sorted({station['id'] for stations in nearby.values() for station in stations})
+    print(f"Testing {len(station_ids)} distinct stations with {workers} workers...")
+    
+    results = get_station_prober(workers).probe_many(station_ids)
+    working = {station_id for station_id, result in results.items() if result['has_data']}
+    print(f"{len(working)} of {len(station_ids)} stations have recent data")
+    
+    locations = {}
+    no_stations = 0
+    for name, lat, lon, region in facilities:
+        stations = nearby[(name, lat, lon)]
+        if not stations:
+            no_stations += 1
+            print(f"No stations within 200 miles of {name}")
+            continue
+        
+        # Nearest working station is primary; the rest stay on as backups
+        ordered = sorted(stations, key=lambda station: station['id'] not in working)
+        
+        location_code = make_location_code(name)
+        suffix = 2
+        while location_code in locations:
+            location_code = f"{make_location_code(name)}_{suffix}"
+            suffix += 1
+        
+        locations[location_code] = {
+            "location_name": name,
+            "primary_station": ordered[0]['id'],
+            "backup_stations": [station['id'] for station in ordered[1:]],
+            "alerts_gps": {"lat": lat, "lon": lon},
+            "region": region,
+            "station_distances": {station['id']: station['distance'] for station in stations}
+        }
+    
+    save_facility_config(locations, output, source=os.path.abspath(path))
+    print(f"\nWrote {len(locations)} locations to {output}")
+    if no_stations:
+        print(f"{no_stations} facilities had no nearby stations and were left out")
+    print(f"Collect with: python3 weather_tracker_gdrive.py --config {output}")
+    return locations
+
 def main():
     """Main function - choose between interactive and batch mode"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Find the nearest weather stations for detention centers')
+    parser.add_argument('--bulk', metavar='FILE',
+                       help='CSV or GeoJSON file of facilities to process without prompts')
+    parser.add_argument('--output', default=FACILITY_CONFIG_FILE,
+                       help=f'Bulk mode: JSON configuration file to write (default: {FACILITY_CONFIG_FILE})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_PROBE_WORKERS,
+                       help=f'Bulk mode: stations tested at the same time (default: {DEFAULT_PROBE_WORKERS})')
+    parser.add_argument('--rate', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                       help=f'Maximum api.weather.gov requests per second (default: {DEFAULT_REQUESTS_PER_SECOND})')
+    
+    args = parser.parse_args()
+    
+    if args.bulk:
+        configure_rate_limit(args.rate, DEFAULT_BURST)
+        configure_session(max(args.workers, DEFAULT_POOL_SIZE))
+        bulk_mode(args.bulk, args.output, args.workers)
+        return
+    
     print("Weather Station Finder for Detention Centers")
     print("=" * 60)
     print("\nChoose mode:")
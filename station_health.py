@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# station_health.py
+# Persistent per-station health record with a circuit breaker
+
+import datetime
+import os
+import threading
+
+from nws_client import CACHE_DIR, load_json_file, save_json_file
+
+STATION_HEALTH_FILE = os.path.join(CACHE_DIR, "station_health.json")
+
+# Consecutive failures before a station's circuit opens
+FAILURE_THRESHOLD = 3
+
+# How long an open circuit stays open before a half-open probe. Each time
+# the circuit re-opens the wait doubles, up to the maximum.
+BASE_BACKOFF_MINUTES = 60
+MAX_BACKOFF_HOURS = 48
+
+# A station whose latest observation is older than this counts as failing
+STALE_DATA_HOURS = 2
+
+# Weight of the newest result in the availability / latency averages
+EWMA_WEIGHT = 0.2
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+def _now():
+    return datetime.datetime.now()
+
+class StationHealthStore:
+    """On-disk success, failure, latency and staleness history per station
+
+    Circuit states:
+      closed    - station is used normally
+      open      - station is skipped until its backoff expires
+      half_open - backoff expired; the next fetch is a probe that closes
+                  the circuit on success or re-opens it for longer on failure
+    """
+
+    def __init__(self, path=STATION_HEALTH_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stations = load_json_file(path, {}).get('stations', {})
+
+    def _entry(self, station_id):
+        return self._stations.setdefault(station_id, {
+            'successes': 0,
+            'failures': 0,
+            'consecutive_failures': 0,
+            'availability': 1.0,
+            'latency_seconds': None,
+            'last_data_age_hours': None,
+            'last_success': None,
+            'last_failure': None,
+            'last_error': None,
+            'state': CLOSED,
+            'open_until': None,
+            'times_opened': 0
+        })
+
+    def get(self, station_id):
+        """Return a copy of a station's health entry (defaults if never seen)"""
+        with self._lock:
+            return dict(self._entry(station_id))
+
+    def state(self, station_id):
+        """Current circuit state, moving expired open circuits to half-open"""
+        with self._lock:
+            entry = self._entry(station_id)
+            if entry['state'] == OPEN and entry['open_until']:
+                if _now() >= datetime.datetime.fromisoformat(entry['open_until']):
+                    entry['state'] = HALF_OPEN
+            return entry['state']
+
+    def is_available(self, station_id):
+        """True unless the station's circuit is open"""
+        return self.state(station_id) != OPEN
+
+    def score(self, station_id):
+        """Higher is healthier: availability, lightly penalised by latency
+
+        Rounded so that small differences keep the configured order.
+        """
+        entry = self.get(station_id)
+        latency = entry['latency_seconds'] or 0
+        return round(entry['availability'] - min(latency, 15) / 100, 2)
+
+    def _update_latency(self, entry, latency):
+        if latency is None:
+            return
+        if entry['latency_seconds'] is None:
+            entry['latency_seconds'] = round(latency, 3)
+        else:
+            entry['latency_seconds'] = round((1 - EWMA_WEIGHT) * entry['latency_seconds'] + EWMA_WEIGHT * latency, 3)
+
+    def record_success(self, station_id, latency=None, data_age_hours=None):
+        """Record a fetch that returned an observation
+
+        Observations older than STALE_DATA_HOURS count as failures, since a
+        dead station keeps serving its last report.
+        """
+        if data_age_hours is not None and data_age_hours > STALE_DATA_HOURS:
+            self.record_failure(station_id, f"Stale data ({data_age_hours:.1f} hours old)",
+                                latency, data_age_hours)
+            return
+
+        with self._lock:
+            entry = self._entry(station_id)
+            entry['successes'] += 1
+            entry['consecutive_failures'] = 0
+            entry['availability'] = round((1 - EWMA_WEIGHT) * entry['availability'] + EWMA_WEIGHT, 4)
+            entry['last_success'] = _now().isoformat()
+            if data_age_hours is not None:
+                entry['last_data_age_hours'] = round(data_age_hours, 2)
+            self._update_latency(entry, latency)
+
+            entry['state'] = CLOSED
+            entry['open_until'] = None
+            entry['times_opened'] = 0
+
+    def record_failure(self, station_id, error, latency=None, data_age_hours=None):
+        """Record a failed or stale fetch, opening the circuit if needed"""
+        with self._lock:
+            entry = self._entry(station_id)
+            entry['failures'] += 1
+            entry['consecutive_failures'] += 1
+            entry['availability'] = round((1 - EWMA_WEIGHT) * entry['availability'], 4)
+            entry['last_failure'] = _now().isoformat()
+            entry['last_error'] = str(error)[:200]
+            if data_age_hours is not None:
+                entry['last_data_age_hours'] = round(data_age_hours, 2)
+            self._update_latency(entry, latency)
+
+            # A failed half-open probe re-opens straight away
+            if entry['state'] == HALF_OPEN or entry['consecutive_failures'] >= FAILURE_THRESHOLD:
+                entry['times_opened'] += 1
+                backoff = datetime.timedelta(minutes=BASE_BACKOFF_MINUTES * 2 ** (entry['times_opened'] - 1))
+                backoff = min(backoff, datetime.timedelta(hours=MAX_BACKOFF_HOURS))
+                entry['state'] = OPEN
+                entry['open_until'] = (_now() + backoff).isoformat()
+
+    def rank_candidates(self, station_ids):
+        """Order usable stations for failover
+
+        Closed circuits come first (the first listed station stays first,
+        backups are ordered by health score), then half-open stations.
+        Open circuits are left out entirely.
+        """
+        station_ids = [s for s in dict.fromkeys(station_ids) if s]
+        closed = [s for s in station_ids if self.state(s) == CLOSED]
+        half_open = [s for s in station_ids if self.state(s) == HALF_OPEN]
+
+        if closed:
+            closed = closed[:1] + sorted(closed[1:], key=self.score, reverse=True)
+        return closed + half_open
+
+    def usable(self, station_ids):
+        """Stations without an open circuit, in the order given"""
+        return [s for s in dict.fromkeys(station_ids) if s and self.state(s) != OPEN]
+
+    def save(self):
+        """Write the health store to disk"""
+        with self._lock:
+            save_json_file(self.path, {'stations': self._stations})
+
+_health_store = None
+_health_store_lock = threading.Lock()
+
+def get_health_store():
+    """Return the process-wide station health store, loading it on first use"""
+    global _health_store
+    with _health_store_lock:
+        if _health_store is None:
+            _health_store = StationHealthStore()
+        return _health_store
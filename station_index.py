@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# station_index.py
+# Grid spatial index over the station catalog for fast nearest-station lookups
+
+import math
+
+import numpy as np
+
+from station_catalog import get_station_catalog
+
+EARTH_RADIUS_MILES = 3956
+
+# Grid bucket size (degrees) for the station index
+GRID_CELL_DEGREES = 1.0
+
+# First search radius for k-nearest queries; doubled until enough stations are found
+INITIAL_SEARCH_MILES = 25
+MAX_SEARCH_MILES = 1000
+
+MILES_PER_DEGREE_LAT = EARTH_RADIUS_MILES * math.pi / 180
+
+def haversine_miles(lat, lon, lats, lons):
+    """Distances in miles from one point to arrays of points, in one vectorized pass"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - np.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+class StationIndex:
+    """Latitude/longitude grid over station coordinates
+
+    Stations are bucketed into GRID_CELL_DEGREES cells. A query only
+    computes exact haversine distances for stations in the cells that can
+    hold points within the search radius.
+    """
+
+    def __init__(self, ids, names, lats, lons, elevations, cell_size=GRID_CELL_DEGREES):
+        self.ids = list(ids)
+        self.names = list(names)
+        self.elevations = list(elevations)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_size = cell_size
+        self._positions = None
+        self.lon_cells = int(math.ceil(360 / cell_size))
+
+        # Sort station positions by cell and remember each cell's slice
+        rows = np.floor((self.lats + 90) / cell_size).astype(np.int64)
+        cols = np.floor((self.lons + 180) / cell_size).astype(np.int64) % self.lon_cells
+        keys = rows * self.lon_cells + cols
+        self._order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[self._order]
+        unique_keys, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+        self._cells = {int(key): (int(start), int(start + count))
+                       for key, start, count in zip(unique_keys, starts, counts)}
+
+    @classmethod
+    def from_catalog(cls, catalog=None):
+        """Build an index over the cached station catalog"""
+        if catalog is None:
+            catalog = get_station_catalog()
+        columns = catalog.columns()
+        return cls(columns['ids'], columns['names'], columns['lats'], columns['lons'], columns['elevations'])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position(self, station_id):
+        """Index position of a station ID, or None if it is not in the catalog"""
+        if self._positions is None:
+            self._positions = {sid: i for i, sid in enumerate(self.ids)}
+        return self._positions.get(station_id)
+
+    def _candidates(self, lat, lon, radius_miles):
+        """Positions of stations in every grid cell within radius_miles of a point"""
+        lat_span = radius_miles / MILES_PER_DEGREE_LAT
+        row_min = int(math.floor((max(lat - lat_span, -90) + 90) / self.cell_size))
+        row_max = int(math.floor((min(lat + lat_span, 90) + 90) / self.cell_size))
+
+        # Longitude degrees shrink toward the poles; widen the span to match
+        max_abs_lat = min(abs(lat) + lat_span, 90)
+        cos_lat = math.cos(math.radians(max_abs_lat))
+        if cos_lat < 1e-6 or radius_miles / (MILES_PER_DEGREE_LAT * cos_lat) >= 180:
+            cols = range(self.lon_cells)
+        else:
+            lon_span = radius_miles / (MILES_PER_DEGREE_LAT * cos_lat)
+            col_min = int(math.floor((lon - lon_span + 180) / self.cell_size))
+            col_max = int(math.floor((lon + lon_span + 180) / self.cell_size))
+            cols = {col % self.lon_cells for col in range(col_min, col_max + 1)}
+
+        slices = []
+        for row in range(row_min, row_max + 1):
+            for col in cols:
+                cell = self._cells.get(row * self.lon_cells + col)
+                if cell:
+                    slices.append(self._order[cell[0]:cell[1]])
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices)
+
+    def within_radius(self, lat, lon, radius_miles):
+        """Return (positions, distances) of stations within radius_miles, nearest first"""
+        positions = self._candidates(lat, lon, radius_miles)
+        if len(positions) == 0:
+            return positions, np.empty(0)
+        distances = haversine_miles(lat, lon, self.lats[positions], self.lons[positions])
+        keep = distances <= radius_miles
+        positions, distances = positions[keep], distances[keep]
+        order = np.argsort(distances, kind='stable')
+        return positions[order], distances[order]
+
+    def nearest(self, lat, lon, k=3, max_radius_miles=MAX_SEARCH_MILES):
+        """Return (positions, distances) of the k nearest stations within max_radius_miles
+
+        Searches a growing radius, so dense areas only look at a few cells.
+        Every station inside the final radius is measured, so the result is exact.
+        """
+        radius = min(INITIAL_SEARCH_MILES, max_radius_miles)
+        while True:
+            positions, distances = self.within_radius(lat, lon, radius)
+            if len(positions) >= k or radius >= max_radius_miles:
+                return positions[:k], distances[:k]
+            radius = min(radius * 2, max_radius_miles)
+
+    def station(self, position, distance=None):
+        """Station dict for an index position, in the format station_finder uses"""
+        station = {'id': self.ids[position], 'name': self.names[position]}
+        if distance is not None:
+            station['distance'] = round(float(distance), 1)
+        station.update({
+            'lat': float(self.lats[position]),
+            'lon': float(self.lons[position]),
+            'elevation': self.elevations[position]
+        })
+        return station
+
+    def nearest_stations(self, lat, lon, k=3, max_radius_miles=MAX_SEARCH_MILES):
+        """k nearest stations as dicts with 'distance' in miles"""
+        positions, distances = self.nearest(lat, lon, k, max_radius_miles)
+        return [self.station(p, d) for p, d in zip(positions, distances)]
+
+    def stations_within(self, lat, lon, radius_miles):
+        """All stations within radius_miles as dicts, nearest first"""
+        positions, distances = self.within_radius(lat, lon, radius_miles)
+        return [self.station(p, d) for p, d in zip(positions, distances)]
+
+    def screen(self, points, k=3, max_radius_miles=MAX_SEARCH_MILES):
+        """k nearest stations for many (lat, lon) points, e.g. a national facility list"""
+        return [self.nearest_stations(lat, lon, k, max_radius_miles) for lat, lon in points]
+
+_index = None
+_index_version = None
+
+def get_station_index():
+    """Return an index over the current station catalog, rebuilding it if the catalog changed"""
+    global _index, _index_version
+    catalog = get_station_catalog()
+    if _index is None or _index_version != (id(catalog), catalog.version):
+        _index = StationIndex.from_catalog(catalog)
+        _index_version = (id(catalog), catalog.version)
+    return _index
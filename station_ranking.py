@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# station_ranking.py
+# Rank candidate stations for each facility by distance, elevation and reliability
+#
+# Run offline (for example once a day from cron). The collector loads the
+# table at the start of each run and tries stations in ranked order.
+
+import datetime
+import os
+from collections import defaultdict
+
+from facility_config import get_station_config, get_all_locations, use_facility_config
+from nws_client import CACHE_DIR, load_json_file, save_json_file
+from report_store import RAW_DIR, load_saved_reports
+from station_health import STALE_DATA_HOURS, get_health_store
+
+STATION_RANKINGS_FILE = os.path.join(CACHE_DIR, "station_rankings.json")
+
+# Collection history used for availability
+DEFAULT_LOOKBACK_DAYS = 14
+
+# Nearby stations considered besides the configured ones
+CANDIDATE_RADIUS_MILES = 50
+MAX_CANDIDATES = 5
+
+# Facility elevation is estimated from stations within this distance
+ELEVATION_RADIUS_MILES = 30
+ELEVATION_NEIGHBORS = 8
+
+# Availability assumed for a station with no history, and how many
+# location-hours of evidence that assumption is worth
+DEFAULT_AVAILABILITY = 0.9
+PRIOR_WEIGHT = 5
+
+# Score penalties (score is roughly availability, 0 - 1)
+DISTANCE_PENALTY_PER_MILE = 0.005
+ELEVATION_PENALTY_PER_100M = 0.05
+MAX_LATENCY_PENALTY = 0.1
+LATENCY_CEILING_SECONDS = 15
+
+def _record_data_age_hours(record):
+    """Hours between a record's observation time and its collection time"""
+    try:
+        collected = datetime.datetime.fromisoformat(record['collection_timestamp'])
+        observed = datetime.datetime.fromisoformat(record['nws_timestamp'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if collected.tzinfo is None:
+        collected = collected.astimezone()
+    if observed.tzinfo is None:
+        observed = observed.replace(tzinfo=datetime.timezone.utc)
+    return (collected - observed).total_seconds() / 3600
+
+def load_station_history(days=DEFAULT_LOOKBACK_DAYS, raw_dir=RAW_DIR):
+    """Count good and total location-hours per station from saved reports
+
+    A record with fresh data is a good hour for its station. Stations the
+    collector tried and failed before it got that record (`failed_stations`)
+    are charged a bad hour each; a primary that was simply ranked below
+    another station is not.
+    """
+    end = datetime.datetime.now()
+    start = end - datetime.timedelta(days=days)
+    history = defaultdict(lambda: {'good': 0, 'total': 0})
+
+    for report in load_saved_reports(start, end, raw_dir):
+        for record in report.get('location_data', []):
+            station_id = record.get('station_id')
+            if record.get('status') != 'SUCCESS' or not station_id or record.get('backfilled'):
+                continue
+
+            age = _record_data_age_hours(record)
+            history[station_id]['total'] += 1
+            if age is not None and age <= STALE_DATA_HOURS:
+                history[station_id]['good'] += 1
+
+            for failed_station in record.get('failed_stations', []):
+                if failed_station != station_id:
+                    history[failed_station]['total'] += 1
+
+    return dict(history)
+
+def estimate_elevation(index, lat, lon):
+    """Inverse-distance weighted elevation (meters) of nearby stations, or None"""
+    positions, distances = index.within_radius(lat, lon, ELEVATION_RADIUS_MILES)
+
+    weighted = 0.0
+    total_weight = 0.0
+    used = 0
+    for position, distance in zip(positions, distances):
+        elevation = index.elevations[position]
+        if elevation is None:
+            continue
+        if distance < 0.1:
+            return elevation
+        weight = 1 / distance ** 2
+        weighted += weight * elevation
+        total_weight += weight
+        used += 1
+        if used >= ELEVATION_NEIGHBORS:
+            break
+
+    return weighted / total_weight if total_weight else None
+
+def station_availability(station_id, history, health):
+    """Smoothed share of good hours, using the health store as the prior"""
+    counts = history.get(station_id, {'good': 0, 'total': 0})
+    entry = health.get(station_id)
+    seen = entry['successes'] + entry['failures'] > 0
+    prior = entry['availability'] if seen else DEFAULT_AVAILABILITY
+    return (counts['good'] + PRIOR_WEIGHT * prior) / (counts['total'] + PRIOR_WEIGHT)
+
+def score_station(distance, elevation_diff, availability, latency):
+    """Higher is better: availability minus distance, elevation and latency penalties"""
+    score = availability - DISTANCE_PENALTY_PER_MILE * distance
+    if elevation_diff is not None:
+        score -= ELEVATION_PENALTY_PER_100M * elevation_diff / 100
+    if latency is not None:
+        score -= MAX_LATENCY_PENALTY * min(latency, LATENCY_CEILING_SECONDS) / LATENCY_CEILING_SECONDS
+    return round(score, 4)
+
+def rank_location(config, index, history, health):
+    """Ranked candidate stations for one configured location"""
+    from station_index import haversine_miles
+
+    lat = config['alerts_gps']['lat']
+    lon = config['alerts_gps']['lon']
+    facility_elevation = estimate_elevation(index, lat, lon)
+
+    configured = [s for s in [config.get('primary_station')] + list(config.get('backup_stations', [])) if s]
+    nearby = index.nearest_stations(lat, lon, k=MAX_CANDIDATES, max_radius_miles=CANDIDATE_RADIUS_MILES)
+    candidates = {station['id']: station for station in nearby}
+
+    # Configured stations are always ranked, even if they are further away
+    for station_id in configured:
+        position = index.position(station_id)
+        if station_id not in candidates and position is not None:
+            distance = haversine_miles(lat, lon, index.lats[position], index.lons[position])
+            candidates[station_id] = index.station(position, distance)
+
+    ranked = []
+    for station_id, station in candidates.items():
+        elevation_diff = None
+        if facility_elevation is not None and station.get('elevation') is not None:
+            elevation_diff = round(abs(station['elevation'] - facility_elevation), 1)
+        availability = station_availability(station_id, history, health)
+        latency = health.get(station_id)['latency_seconds']
+        ranked.append({
+            "id": station_id,
+            "score": score_station(station['distance'], elevation_diff, availability, latency),
+            "distance_miles": station['distance'],
+            "elevation_diff_m": elevation_diff,
+            "availability": round(availability, 3),
+            "latency_seconds": latency,
+            "history_hours": history.get(station_id, {}).get('total', 0),
+            "configured": station_id in configured
+        })
+
+    # Configured stations missing from the catalog keep their configured order at the end
+    for station_id in configured:
+        if station_id not in candidates:
+            ranked.append({"id": station_id, "score": None, "configured": True})
+
+    ranked.sort(key=lambda s: s['score'] if s['score'] is not None else float('-inf'), reverse=True)
+    return {
+        "facility_elevation_m": round(facility_elevation, 1) if facility_elevation is not None else None,
+        "stations": ranked
+    }
+
+def build_station_rankings(days=DEFAULT_LOOKBACK_DAYS, raw_dir=RAW_DIR, path=STATION_RANKINGS_FILE):
+    """Rebuild the ranking table for every configured location and save it"""
+    # Imported here so the collector can load rankings without NumPy
+    from station_index import get_station_index
+
+    index = get_station_index()
+    health = get_health_store()
+    history = load_station_history(days, raw_dir)
+    print(f" History: {sum(h['total'] for h in history.values())} station-hours over {days} days")
+
+    locations = {}
+    for location_code in get_all_locations():
+        config = get_station_config(location_code)
+        if not config:
+            continue
+        locations[location_code] = rank_location(config, index, history, health)
+
+    table = {
+        "generated": datetime.datetime.now().isoformat(),
+        "lookback_days": days,
+        "locations": locations
+    }
+    save_json_file(path, table)
+    return table
+
+def load_station_rankings(path=STATION_RANKINGS_FILE):
+    """Return {location_code: [station IDs, best first]} from the ranking table"""
+    table = load_json_file(path, {}) or {}
+    return {location_code: [station['id'] for station in entry.get('stations', [])]
+            for location_code, entry in table.get('locations', {}).items()}
+
+def main():
+    """Rebuild the station ranking table"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rank candidate weather stations for each facility')
+    parser.add_argument('--days', type=int, default=DEFAULT_LOOKBACK_DAYS,
+                        help=f'Days of collection history used for availability (default: {DEFAULT_LOOKBACK_DAYS})')
+    parser.add_argument('--config', help='JSON configuration file from station_finder.py --bulk (default: configuration.py)')
+
+    args = parser.parse_args()
+
+    if args.config:
+        use_facility_config(args.config)
+
+    table = build_station_rankings(args.days)
+
+    changed = 0
+    for location_code, entry in table['locations'].items():
+        config = get_station_config(location_code)
+        best = entry['stations'][0]['id'] if entry['stations'] else None
+        if best and best != config.get('primary_station'):
+            changed += 1
+            print(f"   {location_code}: {best} ranks above configured primary {config.get('primary_station')}")
+
+    print(f"\n Ranked stations for {len(table['locations'])} locations ({changed} with a new first choice)")
+    print(f" Saved to {STATION_RANKINGS_FILE}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# test_alert_matcher.py
+# Local matching of area-wide alerts to facilities (python3 -m unittest test_alert_matcher)
+
+import unittest
+from unittest import mock
+
+import alert_matcher
+from alert_matcher import AlertIndex, AreaAlertMatcher, get_area_code, point_in_geometry
+
+# A square around Miami with a hole around Key Biscayne
+SQUARE = [[-80.6, 25.4], [-80.0, 25.4], [-80.0, 26.0], [-80.6, 26.0], [-80.6, 25.4]]
+HOLE = [[-80.2, 25.6], [-80.1, 25.6], [-80.1, 25.7], [-80.2, 25.7], [-80.2, 25.6]]
+KROME = (25.75, -80.48)
+
+def _alert(headline, geometry=None, zones=()):
+    return {"geometry": geometry,
+            "properties": {"headline": headline, "geocode": {"UGC": list(zones)},
+                           "affectedZones": [f"https://api.weather.gov/zones/county/{zone}" for zone in zones]}}
+
+class PointInGeometryTest(unittest.TestCase):
+
+    def test_polygon_with_hole(self):
+        polygon = {"type": "Polygon", "coordinates": [SQUARE, HOLE]}
+        self.assertTrue(point_in_geometry(-80.48, 25.75, polygon))
+        self.assertFalse(point_in_geometry(-80.15, 25.65, polygon))
+        self.assertFalse(point_in_geometry(-79.9, 25.75, polygon))
+
+    def test_multipolygon_and_other_geometries(self):
+        far = [[-81.0, 27.0], [-80.8, 27.0], [-80.8, 27.2], [-81.0, 27.0]]
+        multi = {"type": "MultiPolygon", "coordinates": [[far], [SQUARE]]}
+        self.assertTrue(point_in_geometry(-80.48, 25.75, multi))
+        self.assertFalse(point_in_geometry(-80.48, 25.75, {"type": "Point", "coordinates": [-80.48, 25.75]}))
+        self.assertFalse(point_in_geometry(-80.48, 25.75, None))
+
+class AlertIndexTest(unittest.TestCase):
+
+    def test_matches_polygons_and_zone_only_alerts_in_feed_order(self):
+        alerts = [
+            _alert("Flood Warning", {"type": "Polygon", "coordinates": [SQUARE]}),
+            _alert("Heat Advisory", zones=["FLZ173"]),
+            _alert("Tornado Warning", {"type": "Polygon", "coordinates": [HOLE]}),
+            _alert("Rip Current Statement", zones=["FLZ172"])
+        ]
+        index = AlertIndex(alerts)
+        self.assertTrue(index.has_zone_only_alerts)
+        matched = index.match(*KROME, zone_ids=["FLZ173", "FLC086"])
+        self.assertEqual([a["properties"]["headline"] for a in matched], ["Flood Warning", "Heat Advisory"])
+        self.assertEqual(index.match(25.65, -80.15), [alerts[0], alerts[2]])
+
+    def test_polygon_spanning_many_cells(self):
+        # A box wider than one grid cell is found from every cell it covers
+        box = [[-84.0, 24.5], [-80.0, 24.5], [-80.0, 31.0], [-84.0, 31.0], [-84.0, 24.5]]
+        index = AlertIndex([_alert("Tropical Storm Warning", {"type": "Polygon", "coordinates": [box]})])
+        self.assertFalse(index.has_zone_only_alerts)
+        for lat, lon in ((24.6, -83.9), (30.9, -80.1), KROME):
+            self.assertEqual(len(index.match(lat, lon)), 1)
+        self.assertEqual(index.match(31.5, -82.0), [])
+
+class AreaAlertMatcherTest(unittest.TestCase):
+
+    def test_one_fetch_per_area(self):
+        fetched = []
+        feed = [_alert("Flood Warning", {"type": "Polygon", "coordinates": [SQUARE]})]
+        config = {"region": "Florida", "alerts_gps": {"lat": KROME[0], "lon": KROME[1]}}
+        with mock.patch.object(alert_matcher, "fetch_area_alerts", lambda area: fetched.append(area) or feed), \
+                mock.patch.object(alert_matcher, "get_zone_cache") as zone_cache:
+            matcher = AreaAlertMatcher()
+            for _ in range(3):
+                self.assertEqual(matcher.alerts_for(config), feed)
+            self.assertIsNone(matcher.alerts_for({"region": "Atlantis", "alerts_gps": config["alerts_gps"]}))
+        self.assertEqual(fetched, ["FL"])
+        self.assertEqual(matcher.area_count(), 1)
+        # Every alert has a polygon, so no zone lookups were needed
+        zone_cache.assert_not_called()
+
+    def test_area_codes(self):
+        self.assertEqual(get_area_code("florida"), "FL")
+        self.assertEqual(get_area_code("tx"), "TX")
+        self.assertEqual(get_area_code(" New Mexico "), "NM")
+        self.assertIsNone(get_area_code("Atlantis"))
+        self.assertIsNone(get_area_code(None))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# test_alert_registry.py
+# Alert IDs read the same as headlines everywhere (python3 -m unittest test_alert_registry)
+
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from alert_registry import AlertRegistry, compact_alerts, record_alerts
+from daily_weather_analyzer import CenterAccumulator
+from delta_archive import DeltaArchive
+from hazard_rules import detect_hazards
+
+FEATURES = [
+    {"id": "urn:oid:1", "properties": {"id": "urn:oid:1", "event": "Flood Warning",
+                                       "headline": "Flood Warning issued July 1 by NWS Miami"}},
+    {"id": "urn:oid:2", "properties": {"id": "urn:oid:2", "event": "Heat Advisory",
+                                       "headline": "Heat Advisory issued July 1 by NWS Miami"}},
+]
+
+def _record(registry, collected, compact):
+    record = {
+        "collection_timestamp": collected,
+        "location_code": "krome",
+        "location_name": "Krome North Service Processing Center",
+        "region": "Miami",
+        "status": "SUCCESS",
+        "station_id": "KTMB",
+        "nws_timestamp": "2025-07-01T22:53:00+00:00",
+        "temperature_F": 86.0,
+        "alerts": [feature["properties"]["headline"] for feature in FEATURES],
+        "alert_ids": registry.register(FEATURES),
+        "alert_count": len(FEATURES)
+    }
+    return compact_alerts(record) if compact else record
+
+class AlertIdRoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = AlertRegistry(os.path.join(self.tmp.name, "alert_registry.jsonl"))
+        patcher = mock.patch('alert_registry._registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_registry_reloads_from_disk(self):
+        self.registry.register(FEATURES)
+        reloaded = AlertRegistry(self.registry.path)
+        self.assertEqual(reloaded.headline("urn:oid:1"), "Flood Warning issued July 1 by NWS Miami")
+        self.assertIn("urn:oid:2", reloaded)
+
+    def test_compact_record_reads_like_full_record(self):
+        full = _record(self.registry, "2025-07-01T23:00:00", compact=False)
+        compact = _record(self.registry, "2025-07-01T23:00:00", compact=True)
+
+        self.assertNotIn('alerts', compact)
+        self.assertEqual(record_alerts(compact), record_alerts(full))
+        self.assertEqual(detect_hazards(compact), detect_hazards(full))
+
+    def test_delta_archive_round_trip(self):
+        path = os.path.join(self.tmp.name, "delta")
+        archive = DeltaArchive(path)
+        written = [_record(self.registry, f"2025-07-01T{hour}:00:00", compact=True) for hour in (21, 22, 23)]
+        for record in written:
+            archive.append_report({"report_metadata": {"collection_timestamp": record["collection_timestamp"]},
+                                   "location_data": [dict(record)]})
+
+        read = list(DeltaArchive(path).records(datetime.datetime(2025, 7, 1), datetime.datetime(2025, 7, 2)))
+        self.assertEqual([record["alert_ids"] for record in read], [["urn:oid:1", "urn:oid:2"]] * 3)
+        self.assertTrue(all('alerts' not in record for record in read))
+
+    def test_analyzer_looks_up_headlines_by_alert_id(self):
+        # The aggregator's hazards carry the alert ID; without the headline
+        # the analyzer finds it in the registry, and one alert counts once
+        self.registry.register(FEATURES)
+        center = CenterAccumulator()
+        for hour, measurement in (('21', "Flood Warning issued July 1 by NWS Miami"), ('22', None)):
+            hazard = {'type': 'weather_alert', 'severity': 'HIGH', 'description': "Flood Warning",
+                      'measurement': measurement, 'risk_level': None, 'alert_id': "urn:oid:1"}
+            center.add({'analysis_timestamp': f"2025-07-01T{hour}:00:00", 'hazard_analysis': [hazard]})
+
+        alerts = center.result()['measurements']['alerts_detected']
+        self.assertEqual(alerts, ["Flood Warning issued July 1 by NWS Miami"])
+
+if __name__ == "__main__":
+    unittest.main()
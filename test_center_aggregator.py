@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# test_center_aggregator.py
+# Running center aggregates against the daily center report (python3 -m unittest test_center_aggregator)
+
+import json
+import random
+import tempfile
+import unittest
+
+from center_aggregator import DailyCenterAggregates, update_center_aggregates
+from daily_weather_analyzer import create_center_focused_report
+from hazard_rules import analysis_record, heat_index_f
+
+try:
+    import numpy
+    from weather_archive import heat_index_f as array_heat_index_f
+except ImportError:
+    numpy = None
+
+DAY = "2025-07-01"
+
+def _reports():
+    """A day of hourly reports for two centers, with heat, humidity and a flood warning"""
+    reports = []
+    for hour in range(24):
+        collected = f"{DAY}T{hour:02d}:05:00"
+        records = []
+        for code, name, base in (("krome", "Krome North SPC", 88), ("glades", "Glades County Detention Center", 84)):
+            temperature = base + 10 * (1 - abs(hour - 14) / 14)
+            record = {
+                "collection_timestamp": collected, "location_code": code, "location_name": name,
+                "status": "SUCCESS", "temperature_F": round(temperature, 1),
+                "relative_humidity": 90.0 if hour < 7 else 60.0, "wind_speed_mph": 10.0,
+                "alerts": ["Flood Warning issued July 1 by NWS Miami"] if 15 <= hour <= 18 else []
+            }
+            records.append(record)
+        if hour == 3:
+            records.append({"collection_timestamp": collected, "location_code": "glades",
+                            "status": "API_ERROR", "error_message": "HTTP 500"})
+        reports.append({"report_metadata": {"collection_timestamp": collected}, "location_data": records})
+    return reports
+
+def _expected(reports):
+    """The center report computed from scratch over every record"""
+    detailed = [analysis_record(record) for report in reports for record in report["location_data"]
+                if record["status"] == "SUCCESS"]
+    return create_center_focused_report(DAY, {"detailed_analysis": detailed})
+
+def _comparable(report):
+    return json.loads(json.dumps(report["centers"]))
+
+class CenterAggregatorTest(unittest.TestCase):
+
+    def test_snapshot_matches_report_from_scratch(self):
+        reports = _reports()
+        with tempfile.TemporaryDirectory() as path:
+            for report in reports:
+                self.assertTrue(update_center_aggregates(report, path))
+            self.assertFalse(update_center_aggregates(reports[5], path))
+            snapshot = DailyCenterAggregates(DAY, path).center_report()
+
+        self.assertEqual(snapshot["last_report"], f"{DAY}T23:05:00")
+        self.assertEqual(_comparable(snapshot), _comparable(_expected(reports)))
+        krome = snapshot["centers"]["Krome North SPC"]
+        self.assertIn("extreme_heat", krome["hazard_summary"])
+        self.assertEqual(krome["measurements"]["alerts_detected"], ["Flood Warning issued July 1 by NWS Miami"])
+
+    def test_late_reports_fold_in_without_a_rebuild(self):
+        reports = _reports()
+        shuffled = reports[:]
+        random.Random(7).shuffle(shuffled)
+        with tempfile.TemporaryDirectory() as path:
+            for report in shuffled:
+                update_center_aggregates(report, path)
+            aggregates = DailyCenterAggregates(DAY, path)
+            snapshot = aggregates.center_report()
+
+        self.assertEqual(aggregates.state["reports"], sorted(r["report_metadata"]["collection_timestamp"] for r in reports))
+        self.assertEqual(_comparable(snapshot), _comparable(_expected(reports)))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_heat_index_matches_the_archive(self):
+        temperatures = numpy.arange(60.0, 115.0, 0.5)
+        for humidity in (5.0, 12.0, 40.0, 86.0, 100.0):
+            expected = array_heat_index_f(temperatures, numpy.full(len(temperatures), humidity))
+            actual = [heat_index_f(t, humidity) for t in temperatures]
+            numpy.testing.assert_allclose(actual, expected, rtol=1e-12)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# test_date_range_analysis.py
+# Analyzing a range of days and combining them (python3 -m unittest test_date_range_analysis)
+
+import json
+import os
+import tempfile
+import unittest
+
+from daily_weather_analyzer import analyze_date_range, create_range_summary, dates_between
+from hazard_rules import analysis_record
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Highest temperature per day at each center; None means no analysis file
+DAYS = {"2025-07-01": {"krome": 97.0, "glades": 90.0}, "2025-07-02": None,
+        "2025-07-03": {"krome": 94.0, "glades": 99.5}}
+NAMES = {"krome": "Krome North SPC", "glades": "Glades County Detention Center"}
+
+def _analysis(date_str, peaks):
+    records = []
+    for hour in range(24):
+        for code, peak in peaks.items():
+            records.append(analysis_record({
+                "collection_timestamp": f"{date_str}T{hour:02d}:05:00", "location_code": code,
+                "location_name": NAMES[code], "status": "SUCCESS",
+                "temperature_F": peak - abs(hour - 15), "relative_humidity": 55.0,
+                "alerts": ["Flood Warning issued by NWS Miami"] if code == "krome" and hour == 12 else []
+            }))
+    return {"date": date_str, "detailed_analysis": records}
+
+class DateRangeAnalysisTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._cwd = os.getcwd()
+        os.chdir(self._dir.name)
+        os.makedirs("daily_analysis")
+        for date_str, peaks in DAYS.items():
+            if peaks:
+                with open(f"daily_analysis/enhanced_analysis_{date_str}.json", "w") as f:
+                    json.dump(_analysis(date_str, peaks), f)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._dir.cleanup()
+
+    def _range(self, workers=1, engine='python'):
+        return analyze_date_range(dates_between("2025-07-01", "2025-07-03"), workers=workers,
+                                  from_analysis=True, engine=engine)
+
+    def test_dates_between(self):
+        self.assertEqual(dates_between("2025-06-30", "2025-07-02"), ["2025-06-30", "2025-07-01", "2025-07-02"])
+        self.assertEqual(dates_between("2025-07-02", "2025-07-01"), [])
+
+    def test_range_summary(self):
+        days = self._range()
+        self.assertEqual([day["date"] for day in days], list(DAYS))
+        self.assertIn("error", days[1])
+        for date_str in ("2025-07-01", "2025-07-03"):
+            self.assertTrue(os.path.exists(f"center_reports/center_analysis_{date_str}.json"))
+
+        summary = create_range_summary(days)
+        self.assertEqual((summary["start_date"], summary["end_date"]), ("2025-07-01", "2025-07-03"))
+        self.assertEqual((summary["days_requested"], summary["days_analyzed"]), (3, 2))
+        self.assertEqual(summary["missing_dates"], ["2025-07-02"])
+        krome = summary["centers"]["Krome North SPC"]
+        self.assertEqual((krome["max_temperature"], krome["max_temperature_date"]), (97.0, "2025-07-01"))
+        self.assertEqual(krome["days_with_hazards"], 2)
+        self.assertEqual(krome["hazard_summary"], {"extreme_heat": 5, "weather_alert": 2})
+        self.assertEqual(krome["alerts_detected"], ["Flood Warning issued by NWS Miami"])
+        glades = summary["centers"]["Glades County Detention Center"]
+        self.assertEqual((glades["max_temperature"], glades["max_temperature_date"]), (99.5, "2025-07-03"))
+        self.assertEqual((glades["min_temperature"], glades["min_temperature_date"]), (75.0, "2025-07-01"))
+
+    def test_workers_give_the_same_summaries(self):
+        self.assertEqual(self._range(workers=2), self._range(workers=1))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy_engine_gives_the_same_summaries(self):
+        self.assertEqual(self._range(engine='numpy'), self._range())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# test_delta_archive.py
+# Round trips through the delta archive (python3 -m unittest test_delta_archive)
+
+import datetime
+import tempfile
+import unittest
+
+from delta_archive import DeltaArchive
+
+def _report(collected, status='SUCCESS'):
+    record = {
+        "collection_timestamp": collected,
+        "location_code": "krome",
+        "location_name": "Krome North Service Processing Center",
+        "region": "Miami",
+        "status": status,
+        "alerts": ["Heat Advisory issued July 1"]
+    }
+    if status == 'SUCCESS':
+        record.update({"station_id": "KTMB", "nws_timestamp": "2025-07-01T22:53:00+00:00",
+                       "temperature_C": 30.0, "temperature_F": 86.0, "relative_humidity": 70.0})
+    return {"report_metadata": {"collection_timestamp": collected}, "location_data": [record]}
+
+class DeltaArchiveTest(unittest.TestCase):
+
+    def test_repeat_after_failed_first_record_of_day(self):
+        # A failed first run of a day must not stop the next successful run
+        # from writing the repeated observation into the new day's file
+        with tempfile.TemporaryDirectory() as path:
+            archive = DeltaArchive(path)
+            archive.append_report(_report("2025-07-01T23:00:00"))
+            archive.append_report(_report("2025-07-02T00:00:00", status='ERROR'))
+            archive.append_report(_report("2025-07-02T01:00:00"))
+
+            day = datetime.datetime(2025, 7, 2)
+            records = list(DeltaArchive(path).records(day, day + datetime.timedelta(days=1)))
+
+        self.assertEqual(len(records), 2)
+        repeated = records[1]
+        self.assertEqual(repeated["station_id"], "KTMB")
+        self.assertEqual(repeated["temperature_F"], 86.0)
+        self.assertTrue(repeated["repeated_observation"])
+        self.assertEqual(repeated["unchanged_since"], "2025-07-01T23:00:00")
+        self.assertEqual(repeated["alerts"], ["Heat Advisory issued July 1"])
+
+    def test_failed_record_keeps_its_fields(self):
+        # A STATIONS_UNAVAILABLE record's placeholder text and null values
+        # must come back as they were written
+        unavailable = _report("2025-07-02T00:00:00", status='STATIONS_UNAVAILABLE')
+        unavailable["location_data"][0].update({
+            "error_message": "All stations down", "temperature_C": None, "temperature_F": None,
+            "relative_humidity": None, "text_description": "NA - Stations in Region of Interest Unavailable"})
+        with tempfile.TemporaryDirectory() as path:
+            archive = DeltaArchive(path)
+            archive.append_report(_report("2025-07-01T23:00:00"))
+            archive.append_report(unavailable)
+            archive.append_report(_report("2025-07-02T01:00:00"))
+
+            day = datetime.datetime(2025, 7, 2)
+            failed, repeated = DeltaArchive(path).records(day, day + datetime.timedelta(days=1))
+
+        original = unavailable["location_data"][0]
+        self.assertEqual(failed, original)
+        self.assertEqual(repeated["temperature_F"], 86.0)
+        self.assertTrue(repeated["repeated_observation"])
+
+if __name__ == "__main__":
+    unittest.main()
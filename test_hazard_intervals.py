@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# test_hazard_intervals.py
+# Merging hazard readings into intervals and querying them (python3 -m unittest test_hazard_intervals)
+
+import datetime
+import tempfile
+import unittest
+
+from hazard_intervals import HazardIntervals
+
+def _record(center, timestamp, *hazard_types):
+    return {"location": center, "analysis_timestamp": timestamp,
+            "hazard_analysis": [{"type": hazard_type} for hazard_type in hazard_types]}
+
+def _hourly(center, day, hours, hazard_type):
+    return [_record(center, f"{day}T{hour:02d}:05:00", *([hazard_type] if on else []))
+            for hour, on in hours]
+
+class HazardIntervalsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.store = HazardIntervals(self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _periods(self, **query):
+        return [(p["start"], p["end"], p["readings"], p["ongoing"]) for p in self.store.query(**query)]
+
+    def test_consecutive_readings_merge_into_one_interval(self):
+        self.store.add_day("2025-07-01", _hourly("Krome", "2025-07-01",
+                                                  [(10, False), (11, True), (12, True), (13, True), (14, False)],
+                                                  "extreme_heat"))
+        self.assertEqual(self._periods(), [("2025-07-01T11:05:00", "2025-07-01T14:05:00", 3, False)])
+
+    def test_period_across_midnight_stays_one_interval(self):
+        self.store.add_day("2025-07-01", _hourly("Krome", "2025-07-01", [(22, True), (23, True)], "high_humidity"))
+        self.store.add_day("2025-07-02", _hourly("Krome", "2025-07-02", [(0, True), (1, True), (2, False)],
+                                                  "high_humidity"))
+        self.assertEqual(self._periods(), [("2025-07-01T22:05:00", "2025-07-02T02:05:00", 4, False)])
+
+    def test_gap_in_readings_splits_a_period(self):
+        # One missed hourly run keeps the period; a longer silence ends it
+        # one reading after the last one
+        self.store.add_day("2025-07-01", _hourly("Krome", "2025-07-01",
+                                                  [(1, True), (3, True), (8, True), (9, False)], "extreme_heat"))
+        self.assertEqual(self._periods(), [("2025-07-01T01:05:00", "2025-07-01T04:05:00", 2, False),
+                                           ("2025-07-01T08:05:00", "2025-07-01T09:05:00", 1, False)])
+
+    def test_open_period_is_ongoing(self):
+        self.store.add_day("2025-07-01", _hourly("Krome", "2025-07-01", [(20, False), (21, True), (22, True)],
+                                                  "extreme_heat"))
+        self.assertEqual(self._periods(), [("2025-07-01T21:05:00", "2025-07-01T23:05:00", 2, True)])
+
+    def test_readings_out_of_order_within_a_day(self):
+        records = _hourly("Krome", "2025-07-01", [(3, True), (1, True), (2, True)], "extreme_heat")
+        self.store.add_day("2025-07-01", records)
+        self.assertEqual(self._periods(), [("2025-07-01T01:05:00", "2025-07-01T04:05:00", 3, True)])
+
+    def test_query_filters(self):
+        records = (_hourly("Krome North", "2025-07-01", [(h, 10 <= h < 16) for h in range(24)], "extreme_heat")
+                   + _hourly("Glades", "2025-07-01", [(h, h in (2, 20)) for h in range(24)], "high_humidity"))
+        self.store.add_day("2025-07-01", records)
+
+        self.assertEqual(len(self.store.query()), 3)
+        self.assertEqual([p["center"] for p in self.store.query(center="krome")], ["Krome North"])
+        self.assertEqual(len(self.store.query(hazard_type="high_humidity")), 2)
+        self.assertEqual([p["hours"] for p in self.store.query(min_hours=2)], [6.0])
+        window = self.store.query(start=datetime.datetime(2025, 7, 1, 15), end=datetime.datetime(2025, 7, 1, 20, 30))
+        self.assertEqual([(p["center"], p["start"]) for p in window],
+                         [("Krome North", "2025-07-01T10:05:00"), ("Glades", "2025-07-01T20:05:00")])
+
+    def test_state_survives_a_reload(self):
+        self.store.add_day("2025-07-01", _hourly("Krome", "2025-07-01", [(22, True), (23, True)], "extreme_heat"))
+        self.store.save()
+        reloaded = HazardIntervals(self._dir.name)
+        reloaded.add_day("2025-07-02", _hourly("Krome", "2025-07-02", [(0, True), (1, False)], "extreme_heat"))
+        self.assertEqual([(p["start"], p["end"]) for p in reloaded.query()],
+                         [("2025-07-01T22:05:00", "2025-07-02T01:05:00")])
+        self.assertEqual(reloaded.last_day(), "2025-07-02")
+
+if __name__ == "__main__":
+    unittest.main()
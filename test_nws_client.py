@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# test_nws_client.py
+# Rate limiting, single-flight caching and conditional GETs (python3 -m unittest test_nws_client)
+
+import json
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import nws_client
+from nws_client import RunCache, TokenBucket
+
+class _Clock:
+    """monotonic() and sleep() for nws_client, advancing only when slept"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+class TokenBucketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = mock.patch.object(nws_client, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_then_steady_rate(self):
+        bucket = TokenBucket(rate=2, burst=3)
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0.5, 0.5, 0.5])
+        self.assertEqual(self.clock.now, 1001.5)
+
+    def test_idle_time_refills_up_to_burst(self):
+        bucket = TokenBucket(rate=1, burst=2)
+        bucket.acquire()
+        bucket.acquire()
+        self.clock.now += 60
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0.0, 0.0, 1.0])
+
+    def test_waiting_callers_reserve_tokens_in_order(self):
+        # A caller that has to wait has already taken its token, so the
+        # next caller waits behind it instead of for the same token
+        bucket = TokenBucket(rate=4, burst=1)
+        bucket.acquire()
+        with mock.patch.object(self.clock, "sleep", self.clock.slept.append):
+            waits = [bucket.acquire() for _ in range(3)]
+        self.assertEqual(waits, [0.25, 0.5, 0.75])
+
+    def test_rejects_bad_settings(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0, burst=1)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, burst=0)
+
+class RunCacheTest(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_fetch(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fetch(key):
+            calls.append(key)
+            started.set()
+            release.wait(5)
+            return {"station": key}
+
+        cache = RunCache(fetch)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("KTMB"))) for _ in range(5)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(calls, ["KTMB"])
+        self.assertEqual(results, [{"station": "KTMB"}] * 5)
+        self.assertEqual((cache.misses, cache.hits), (1, 4))
+
+    def test_exception_is_shared_too(self):
+        calls = []
+
+        def fetch(key):
+            calls.append(key)
+            raise RuntimeError("HTTP 500")
+
+        cache = RunCache(fetch)
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                cache.get("KTMB")
+        self.assertEqual(calls, ["KTMB"])
+
+    def test_ttl_refetches_old_results(self):
+        clock = _Clock()
+        calls = []
+        with mock.patch.object(nws_client, "time", clock):
+            cache = RunCache(lambda key: calls.append(key) or len(calls), ttl=60)
+            self.assertEqual(cache.get("KTMB"), 1)
+            clock.now += 30
+            self.assertEqual(cache.get("KTMB"), 1)
+            clock.now += 31
+            self.assertEqual(cache.get("KTMB"), 2)
+            self.assertEqual(cache.get("KMIA"), 3)
+        self.assertEqual(len(cache), 2)
+
+class _Response:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.text = json.dumps(body) if body is not None else ""
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+class ConditionalGetTest(unittest.TestCase):
+
+    URL = "https://api.weather.gov/stations/KTMB/observations/latest"
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        patcher = mock.patch.object(nws_client, "HTTP_CACHE_DIR", self._dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.requests = []
+        self.responses = []
+
+    def _get(self, url, timeout=15, headers=None):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+    def test_not_modified_reuses_the_cached_body(self):
+        body = {"properties": {"temperature": {"value": 30}}}
+        self.responses = [_Response(200, body, {"ETag": '"abc"', "Last-Modified": "Tue, 01 Jul 2025 22:53:00 GMT"}),
+                          _Response(304)]
+        with mock.patch.object(nws_client, "nws_get", self._get):
+            self.assertEqual(nws_client.nws_get_json(self.URL), body)
+            self.assertEqual(nws_client.nws_get_json(self.URL), body)
+
+        self.assertEqual(self.requests[0], {})
+        self.assertEqual(self.requests[1], {"If-None-Match": '"abc"',
+                                            "If-Modified-Since": "Tue, 01 Jul 2025 22:53:00 GMT"})
+
+    def test_changed_response_replaces_the_cache(self):
+        self.responses = [_Response(200, {"n": 1}, {"ETag": '"v1"'}), _Response(200, {"n": 2}, {"ETag": '"v2"'}),
+                          _Response(304)]
+        with mock.patch.object(nws_client, "nws_get", self._get):
+            results = [nws_client.nws_get_json(self.URL) for _ in range(3)]
+        self.assertEqual(results, [{"n": 1}, {"n": 2}, {"n": 2}])
+        self.assertEqual(self.requests[2], {"If-None-Match": '"v2"'})
+
+    def test_unconditional_requests_send_no_validators(self):
+        self.responses = [_Response(200, {"n": 1}, {"ETag": '"v1"'}), _Response(200, {"n": 2}, {"ETag": '"v2"'})]
+        with mock.patch.object(nws_client, "nws_get", self._get):
+            nws_client.nws_get_json(self.URL)
+            self.assertEqual(nws_client.nws_get_json(self.URL, conditional=False), {"n": 2})
+        self.assertEqual(self.requests[1], {})
+
+    def test_errors_raise(self):
+        self.responses = [_Response(503)]
+        with mock.patch.object(nws_client, "nws_get", self._get):
+            with self.assertRaises(RuntimeError):
+                nws_client.nws_get_json(self.URL)
+
+if __name__ == "__main__":
+    unittest.main()
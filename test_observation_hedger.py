@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# test_observation_hedger.py
+# Hedged observation fetches (python3 -m unittest test_observation_hedger)
+
+import datetime
+import time
+import unittest
+
+from nws_client import RunCache
+from observation_hedger import LatencyTracker, ObservationHedger
+
+def _observation(hours_old=0):
+    observed = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=hours_old)
+    return {'timestamp': observed.isoformat()}
+
+def _hedger(stations, hedge_delay=0.05):
+    """Hedger over fake stations: {station_id: props, exception, or (seconds, props)}"""
+    def fetch(station_id):
+        result = stations[station_id]
+        if isinstance(result, tuple):
+            time.sleep(result[0])
+            result = result[1]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return ObservationHedger(RunCache(fetch), LatencyTracker(), hedge_delay=hedge_delay)
+
+class ObservationHedgerTest(unittest.TestCase):
+
+    def test_fast_primary_is_not_hedged(self):
+        hedger = _hedger({'KTMB': _observation(), 'KMIA': _observation()})
+        failed = []
+        winner, props, hedged = hedger.fetch('KTMB', ['KMIA'], failed)
+        hedger.shutdown()
+
+        self.assertEqual((winner, hedged, failed), ('KTMB', False, []))
+        self.assertEqual(hedger.hedges_started, 0)
+
+    def test_slow_primary_loses_to_backup(self):
+        hedger = _hedger({'KTMB': (1.0, _observation()), 'KMIA': _observation()})
+        winner, props, hedged = hedger.fetch('KTMB', ['KMIA'])
+        hedger.shutdown()
+
+        self.assertEqual((winner, hedged), ('KMIA', True))
+        self.assertEqual(hedger.hedges_started, 1)
+
+    def test_failed_primary_is_recorded(self):
+        hedger = _hedger({'KTMB': RuntimeError("HTTP 500"), 'KMIA': _observation()})
+        failed = []
+        winner, props, hedged = hedger.fetch('KTMB', ['KMIA'], failed)
+        hedger.shutdown()
+
+        self.assertEqual(winner, 'KMIA')
+        self.assertEqual(failed, ['KTMB'])
+
+    def test_every_station_failing_raises_and_records_both(self):
+        hedger = _hedger({'KTMB': RuntimeError("HTTP 500"), 'KMIA': RuntimeError("timeout")})
+        failed = []
+        with self.assertRaisesRegex(RuntimeError, "HTTP 500"):
+            hedger.fetch('KTMB', ['KMIA'], failed)
+        hedger.shutdown()
+
+        self.assertEqual(sorted(failed), ['KMIA', 'KTMB'])
+
+    def test_stale_primary_without_backup_is_returned(self):
+        stale = _observation(hours_old=5)
+        hedger = _hedger({'KTMB': stale})
+        winner, props, hedged = hedger.fetch('KTMB', [])
+        hedger.shutdown()
+
+        self.assertEqual((winner, props, hedged), ('KTMB', stale, False))
+
+if __name__ == "__main__":
+    unittest.main()
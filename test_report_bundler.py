@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# test_report_bundler.py
+# Sealing finished days into bundles and checking them (python3 -m unittest test_report_bundler)
+
+import datetime
+import json
+import os
+import tempfile
+import unittest
+
+from report_bundler import (BundleChecksumError, ReportBundle, bundle_complete_days, bundle_path,
+                            latest_bundled_report)
+from report_store import ReportStore, load_saved_reports, report_filename
+
+def _report(collected):
+    return {
+        "report_metadata": {"collection_timestamp": collected},
+        "location_data": [{"collection_timestamp": collected, "location_code": "krome",
+                           "status": "SUCCESS", "temperature_F": 86.0}]
+    }
+
+class ReportBundlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.raw_dir = self._dir.name
+        self.bundle_dir = os.path.join(self.raw_dir, "bundles")
+        self.store = ReportStore(os.path.join(self.raw_dir, "report_store"))
+        self.stored = [_report("2025-07-01T10:00:00"), _report("2025-07-01T11:00:00"),
+                       _report("2025-07-02T09:00:00")]
+        for report in self.stored:
+            self.store.append(report)
+        # A failed upload leaves a per-run file next to the store
+        self.loose = _report("2025-07-01T12:00:00")
+        with open(os.path.join(self.raw_dir, report_filename("2025-07-01T12:00:00")), 'w') as f:
+            json.dump(self.loose, f)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _bundle(self, keep_originals=False):
+        return bundle_complete_days(self.raw_dir, self.bundle_dir, keep_originals, today=datetime.date(2025, 7, 2))
+
+    def test_seals_finished_days_only(self):
+        results = self._bundle()
+
+        self.assertEqual(list(results), [datetime.date(2025, 7, 1)])
+        self.assertEqual(results[datetime.date(2025, 7, 1)][0], 3)
+        bundle = ReportBundle(bundle_path(datetime.date(2025, 7, 1), self.bundle_dir))
+        self.assertEqual(bundle.names(), [report_filename(ts) for ts in
+                                          ("2025-07-01T10:00:00", "2025-07-01T11:00:00", "2025-07-01T12:00:00")])
+        self.assertEqual(bundle.verify(), [])
+        # The finished day's segment and per-run file are gone; today's segment stays
+        self.assertEqual(self.store.segments(), ["segment_2025-07-02.jsonl"])
+        self.assertFalse(any(name.endswith(".json") for name in os.listdir(self.raw_dir)))
+        self.assertEqual(latest_bundled_report(self.bundle_dir), self.loose)
+
+    def test_saved_reports_read_once_across_store_and_bundles(self):
+        start, end = datetime.datetime(2025, 7, 1), datetime.datetime(2025, 7, 3)
+        expected = sorted(self.stored + [self.loose], key=lambda r: r["report_metadata"]["collection_timestamp"])
+
+        self._bundle(keep_originals=True)
+        # Everything is now in both the bundle and the store or per-run file
+        kept = sorted(load_saved_reports(start, end, self.raw_dir),
+                      key=lambda r: r["report_metadata"]["collection_timestamp"])
+        self.assertEqual(kept, expected)
+
+        self._bundle()
+        sealed = sorted(load_saved_reports(start, end, self.raw_dir),
+                        key=lambda r: r["report_metadata"]["collection_timestamp"])
+        self.assertEqual(sealed, expected)
+
+    def test_corrupted_frame_fails_its_checksum(self):
+        self._bundle()
+        path = bundle_path(datetime.date(2025, 7, 1), self.bundle_dir)
+        frame = ReportBundle(path).frames[1]
+        with open(path, 'r+b') as f:
+            f.seek(frame['offset'] + frame['length'] // 2)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes([byte[0] ^ 0xFF]))
+
+        bundle = ReportBundle(path)
+        self.assertEqual(bundle.verify(), [frame['name']])
+        with self.assertRaises(BundleChecksumError):
+            bundle.read(frame['name'])
+        # The other reports in the day are still readable
+        self.assertEqual(bundle.read(bundle.frames[0]['name']), self.stored[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# test_report_store.py
+# Index and segment reads of the report store (python3 -m unittest test_report_store)
+
+import datetime
+import os
+import tempfile
+import unittest
+
+from report_store import INDEX_SUFFIX, ReportStore
+
+def _report(collected, locations=("krome", "broward")):
+    return {
+        "report_metadata": {"collection_timestamp": collected, "total_locations": len(locations)},
+        "location_data": [{"collection_timestamp": collected, "location_code": code,
+                           "status": "SUCCESS", "temperature_F": 80.0 + i}
+                          for i, code in enumerate(locations)]
+    }
+
+class ReportStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.store = ReportStore(self._dir.name)
+        self.reports = [_report("2025-07-01T22:00:00"), _report("2025-07-01T23:00:00"),
+                        _report("2025-07-02T00:00:00")]
+        for report in self.reports:
+            self.store.append(report)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_one_segment_per_day(self):
+        self.assertEqual(self.store.segments(), ["segment_2025-07-01.jsonl", "segment_2025-07-02.jsonl"])
+        self.assertEqual(self.store.days(), [datetime.date(2025, 7, 1), datetime.date(2025, 7, 2)])
+        self.assertEqual(self.store.day_segments(datetime.date(2025, 7, 2)), ["segment_2025-07-02.jsonl"])
+
+    def test_reports_round_trip(self):
+        self.assertEqual(list(self.store.reports()), self.reports)
+        start = datetime.datetime(2025, 7, 1, 23)
+        self.assertEqual(list(self.store.reports(start, start + datetime.timedelta(hours=1))),
+                         [self.reports[1]])
+
+    def test_records_for_one_location(self):
+        records = list(self.store.records(locations=["broward"]))
+        self.assertEqual([record["collection_timestamp"] for record in records],
+                         ["2025-07-01T22:00:00", "2025-07-01T23:00:00", "2025-07-02T00:00:00"])
+        self.assertTrue(all(record["location_code"] == "broward" for record in records))
+
+    def test_index_points_at_each_line(self):
+        entries = [entry for _, entry in self.store.index_entries()]
+        self.assertEqual(len(entries), 9)
+        self.assertEqual([entry[1] for entry in entries[:3]], [None, "krome", "broward"])
+        with open(os.path.join(self._dir.name, "segment_2025-07-01.jsonl"), 'rb') as f:
+            data = f.read()
+        self.assertEqual(entries[0][2], 0)
+        self.assertEqual(sum(entry[3] for entry in entries[:6]), len(data))
+
+    def test_segment_reports_and_latest(self):
+        self.assertEqual(list(self.store.segment_reports("segment_2025-07-01.jsonl")), self.reports[:2])
+        self.assertEqual(self.store.latest_report(), self.reports[2])
+
+    def test_remove_segment(self):
+        self.store.remove_segment("segment_2025-07-02.jsonl")
+        self.assertFalse(os.path.exists(os.path.join(self._dir.name, "segment_2025-07-02.jsonl" + INDEX_SUFFIX)))
+        self.assertEqual(self.store.latest_report(), self.reports[1])
+        self.assertEqual(self.store.segment_bytes("segment_2025-07-02.jsonl"), 0)
+
+    def test_segment_rolls_over_when_full(self):
+        with tempfile.TemporaryDirectory() as path:
+            store = ReportStore(path, max_segment_bytes=1)
+            for report in self.reports[:2]:
+                store.append(report)
+            self.assertEqual(store.segments(), ["segment_2025-07-01.jsonl", "segment_2025-07-01_001.jsonl"])
+            self.assertEqual(list(store.reports()), self.reports[:2])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# test_station_catalog.py
+# State assignment of catalog stations (python3 -m unittest test_station_catalog)
+
+import unittest
+
+from station_catalog import state_from_station
+
+ZONES = "https://api.weather.gov/zones"
+
+class StateFromStationTest(unittest.TestCase):
+
+    def test_county_zone(self):
+        props = {'county': f"{ZONES}/county/FLC086", 'forecast': f"{ZONES}/forecast/FLZ173"}
+        self.assertEqual(state_from_station(props), 'FL')
+
+    def test_marine_zone_is_not_a_state(self):
+        self.assertIsNone(state_from_station({'forecast': f"{ZONES}/forecast/GMZ656"}))
+        self.assertIsNone(state_from_station({'forecast': f"{ZONES}/forecast/PZZ530"}))
+
+    def test_marine_forecast_zone_falls_through_to_fire_zone(self):
+        props = {'forecast': f"{ZONES}/forecast/AMZ630", 'fireWeatherZone': f"{ZONES}/fire/FLZ073"}
+        self.assertEqual(state_from_station(props), 'FL')
+
+    def test_state_property_wins(self):
+        props = {'state': 'tx', 'forecast': f"{ZONES}/forecast/GMZ250"}
+        self.assertEqual(state_from_station(props), 'TX')
+
+    def test_territory(self):
+        self.assertEqual(state_from_station({'forecast': f"{ZONES}/forecast/GUZ001"}), 'GU')
+
+if __name__ == "__main__":
+    unittest.main()
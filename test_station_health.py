@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# test_station_health.py
+# Circuit breaker transitions of the station health store (python3 -m unittest test_station_health)
+
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import station_health
+from station_health import CLOSED, FAILURE_THRESHOLD, HALF_OPEN, OPEN, StationHealthStore
+
+START = datetime.datetime(2025, 7, 1, 12, 0)
+
+class StationHealthTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.now = START
+        patcher = mock.patch.object(station_health, "_now", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = StationHealthStore(os.path.join(self._dir.name, "station_health.json"))
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _open(self, station_id="KTMB"):
+        for _ in range(FAILURE_THRESHOLD):
+            self.store.record_failure(station_id, "HTTP 500")
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(FAILURE_THRESHOLD - 1):
+            self.store.record_failure("KTMB", "HTTP 500")
+        self.assertEqual(self.store.state("KTMB"), CLOSED)
+        self.store.record_failure("KTMB", "HTTP 500")
+        self.assertEqual(self.store.state("KTMB"), OPEN)
+        self.assertFalse(self.store.is_available("KTMB"))
+
+    def test_success_resets_the_failure_count(self):
+        for _ in range(FAILURE_THRESHOLD - 1):
+            self.store.record_failure("KTMB", "HTTP 500")
+        self.store.record_success("KTMB", latency=0.5)
+        self.store.record_failure("KTMB", "HTTP 500")
+        self.assertEqual(self.store.state("KTMB"), CLOSED)
+
+    def test_half_open_probe_closes_on_success(self):
+        self._open()
+        self.now = START + datetime.timedelta(minutes=station_health.BASE_BACKOFF_MINUTES)
+        self.assertEqual(self.store.state("KTMB"), HALF_OPEN)
+        self.assertTrue(self.store.is_available("KTMB"))
+        self.store.record_success("KTMB")
+        self.assertEqual(self.store.state("KTMB"), CLOSED)
+        self.assertEqual(self.store.get("KTMB")["times_opened"], 0)
+
+    def test_failed_probe_reopens_for_longer(self):
+        self._open()
+        self.now = START + datetime.timedelta(minutes=station_health.BASE_BACKOFF_MINUTES)
+        self.assertEqual(self.store.state("KTMB"), HALF_OPEN)
+        self.store.record_failure("KTMB", "timeout")
+        entry = self.store.get("KTMB")
+        self.assertEqual(entry["state"], OPEN)
+        self.assertEqual(datetime.datetime.fromisoformat(entry["open_until"]) - self.now,
+                         datetime.timedelta(minutes=2 * station_health.BASE_BACKOFF_MINUTES))
+
+    def test_backoff_is_capped(self):
+        self._open()
+        for _ in range(12):
+            self.now = datetime.datetime.fromisoformat(self.store.get("KTMB")["open_until"])
+            self.assertEqual(self.store.state("KTMB"), HALF_OPEN)
+            self.store.record_failure("KTMB", "timeout")
+        open_for = datetime.datetime.fromisoformat(self.store.get("KTMB")["open_until"]) - self.now
+        self.assertEqual(open_for, datetime.timedelta(hours=station_health.MAX_BACKOFF_HOURS))
+
+    def test_stale_observations_count_as_failures(self):
+        for _ in range(FAILURE_THRESHOLD):
+            self.store.record_success("KTMB", data_age_hours=station_health.STALE_DATA_HOURS + 1)
+        self.assertEqual(self.store.state("KTMB"), OPEN)
+        self.assertEqual(self.store.get("KTMB")["successes"], 0)
+
+    def test_rank_candidates_skips_open_and_puts_half_open_last(self):
+        self._open("KOPEN")
+        self._open("KPROBE")
+        self.store.record_failure("KWEAK", "HTTP 500")
+        self.now = START + datetime.timedelta(minutes=station_health.BASE_BACKOFF_MINUTES)
+        self._open("KOPEN")
+        self.store.record_success("KGOOD")
+        ranked = self.store.rank_candidates(["KPRIMARY", "KOPEN", "KPROBE", "KWEAK", "KGOOD", "KPRIMARY"])
+        self.assertEqual(ranked, ["KPRIMARY", "KGOOD", "KWEAK", "KPROBE"])
+
+    def test_state_survives_a_reload(self):
+        self._open()
+        self.store.save()
+        reloaded = StationHealthStore(self.store.path)
+        self.assertEqual(reloaded.state("KTMB"), OPEN)
+        self.assertEqual(reloaded.get("KTMB")["consecutive_failures"], FAILURE_THRESHOLD)
+
+if __name__ == "__main__":
+    unittest.main()
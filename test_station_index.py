@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# test_station_index.py
+# Grid nearest-station search against a brute-force scan (python3 -m unittest test_station_index)
+
+import random
+import unittest
+
+try:
+    import numpy as np
+    from station_index import StationIndex, haversine_miles
+except ImportError:
+    np = None
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class StationIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(5)
+        # Mostly the continental US, plus Alaska, Hawaii and stations on both
+        # sides of the date line
+        points = [(rng.uniform(24, 49), rng.uniform(-125, -67)) for _ in range(800)]
+        points += [(rng.uniform(55, 71), rng.uniform(-170, -140)) for _ in range(100)]
+        points += [(rng.uniform(19, 22), rng.uniform(-160, -154)) for _ in range(50)]
+        points += [(52.0, 179.9), (52.0, -179.9), (51.8, 179.5)]
+        self.lats = [lat for lat, lon in points]
+        self.lons = [lon for lat, lon in points]
+        ids = [f"K{i:04d}" for i in range(len(points))]
+        self.index = StationIndex(ids, ids, self.lats, self.lons, [None] * len(points))
+
+    def _brute_force(self, lat, lon):
+        return haversine_miles(lat, lon, np.array(self.lats), np.array(self.lons))
+
+    def test_haversine(self):
+        # Miami to Atlanta is about 600 miles
+        self.assertAlmostEqual(float(haversine_miles(25.79, -80.29, np.array([33.64]), np.array([-84.43]))[0]),
+                               595, delta=5)
+        self.assertEqual(float(haversine_miles(25.0, -80.0, np.array([25.0]), np.array([-80.0]))[0]), 0.0)
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(9)
+        queries = [(rng.uniform(20, 70), rng.uniform(-170, -65)) for _ in range(200)] + [(52.0, 180.0), (51.9, -179.95)]
+        for lat, lon in queries:
+            positions, distances = self.index.nearest(lat, lon, k=3)
+            expected = np.sort(self._brute_force(lat, lon))[:3]
+            expected = expected[expected <= 1000]
+            np.testing.assert_allclose(distances, expected)
+
+    def test_within_radius_matches_brute_force(self):
+        for lat, lon, radius in ((25.75, -80.48, 60), (61.2, -149.9, 200), (52.0, 180.0, 30), (40.0, -100.0, 0.1)):
+            positions, distances = self.index.within_radius(lat, lon, radius)
+            everything = self._brute_force(lat, lon)
+            self.assertEqual(sorted(positions.tolist()), np.flatnonzero(everything <= radius).tolist())
+            self.assertTrue(np.all(np.diff(distances) >= 0))
+
+    def test_date_line_neighbours(self):
+        stations = self.index.nearest_stations(52.0, 179.95, k=2)
+        self.assertEqual({s["id"] for s in stations}, {"K0950", "K0951"})
+        self.assertEqual(set(stations[0]), {"id", "name", "distance", "lat", "lon", "elevation"})
+
+    def test_no_station_in_range(self):
+        positions, distances = self.index.nearest(-60.0, 0.0, k=3, max_radius_miles=100)
+        self.assertEqual(len(positions), 0)
+        self.assertIsNone(self.index.position("KXXXX"))
+        self.assertEqual(self.index.position("K0002"), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# test_station_ranking.py
+# Reliability-weighted failover ranking (python3 -m unittest test_station_ranking)
+
+import datetime
+import os
+import tempfile
+import unittest
+
+from nws_client import save_json_file
+from report_store import ReportStore
+from station_health import StationHealthStore
+from station_ranking import (DEFAULT_AVAILABILITY, PRIOR_WEIGHT, load_station_history, load_station_rankings,
+                             rank_location, score_station, station_availability)
+
+try:
+    from station_index import StationIndex
+except ImportError:
+    StationIndex = None
+
+def _record(collected, station_id, age_hours=0.5, **fields):
+    observed = datetime.datetime.fromisoformat(collected).astimezone(datetime.timezone.utc) \
+        - datetime.timedelta(hours=age_hours)
+    record = {"collection_timestamp": collected, "location_code": "krome", "status": "SUCCESS",
+              "station_id": station_id, "nws_timestamp": observed.isoformat()}
+    record.update(fields)
+    return record
+
+class StationRankingTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        self.health = StationHealthStore(os.path.join(self._dir.name, "station_health.json"))
+
+    def test_history_charges_only_failed_stations(self):
+        store = ReportStore(os.path.join(self._dir.name, "report_store"))
+        now = datetime.datetime.now().replace(microsecond=0)
+        records = [
+            _record((now - datetime.timedelta(hours=3)).isoformat(), "KTMB"),
+            # The primary failed and the backup answered
+            _record((now - datetime.timedelta(hours=2)).isoformat(), "KMIA", failed_stations=["KTMB"]),
+            # Stale data counts toward the total but is not a good hour
+            _record((now - datetime.timedelta(hours=1)).isoformat(), "KTMB", age_hours=5),
+            # Backfilled hours say nothing about live availability
+            _record((now - datetime.timedelta(minutes=30)).isoformat(), "KOPF", backfilled=True)
+        ]
+        for record in records:
+            store.append({"report_metadata": {"collection_timestamp": record["collection_timestamp"]},
+                          "location_data": [record]})
+
+        history = load_station_history(days=1, raw_dir=self._dir.name)
+        self.assertEqual(history, {"KTMB": {"good": 1, "total": 3}, "KMIA": {"good": 1, "total": 1}})
+
+    def test_availability_uses_the_health_store_as_prior(self):
+        history = {"KTMB": {"good": 5, "total": 10}}
+        self.assertAlmostEqual(station_availability("KNEW", {}, self.health), DEFAULT_AVAILABILITY)
+        self.assertAlmostEqual(station_availability("KTMB", history, self.health),
+                               (5 + PRIOR_WEIGHT * DEFAULT_AVAILABILITY) / (10 + PRIOR_WEIGHT))
+        self.health.record_failure("KTMB", "HTTP 500")
+        self.assertAlmostEqual(station_availability("KTMB", history, self.health), (5 + PRIOR_WEIGHT * 0.8) / 15)
+
+    def test_score_penalties(self):
+        self.assertEqual(score_station(0, None, 0.9, None), 0.9)
+        self.assertEqual(score_station(10, None, 0.9, None), 0.85)
+        self.assertEqual(score_station(0, 200, 0.9, None), 0.8)
+        self.assertEqual(score_station(0, None, 0.9, 30), 0.8)
+
+    @unittest.skipIf(StationIndex is None, "numpy is not installed")
+    def test_rank_location(self):
+        stations = [("KTMB", 25.65, -80.43, 3), ("KMIA", 25.79, -80.29, 2), ("KFLAKY", 25.74, -80.47, 3),
+                    ("KFAR", 27.0, -81.0, 20)]
+        index = StationIndex(*zip(*[(s[0], s[0], s[1], s[2], s[3]) for s in stations]))
+        config = {"alerts_gps": {"lat": 25.75, "lon": -80.48}, "primary_station": "KTMB",
+                  "backup_stations": ["KFAR", "KGONE"]}
+        history = {"KFLAKY": {"good": 2, "total": 40}}
+
+        ranking = rank_location(config, index, history, self.health)
+        ids = [station["id"] for station in ranking["stations"]]
+        # The closest station is so unreliable that it drops below the far
+        # configured backup; one missing from the catalog comes last
+        self.assertEqual(ids, ["KTMB", "KMIA", "KFAR", "KFLAKY", "KGONE"])
+        by_id = {station["id"]: station for station in ranking["stations"]}
+        self.assertTrue(by_id["KFAR"]["configured"])
+        self.assertFalse(by_id["KMIA"]["configured"])
+        self.assertIsNone(by_id["KGONE"]["score"])
+        self.assertIsNotNone(ranking["facility_elevation_m"])
+
+    def test_load_station_rankings(self):
+        path = os.path.join(self._dir.name, "station_rankings.json")
+        save_json_file(path, {"locations": {"krome": {"stations": [{"id": "KMIA"}, {"id": "KTMB"}]}}})
+        self.assertEqual(load_station_rankings(path), {"krome": ["KMIA", "KTMB"]})
+        self.assertEqual(load_station_rankings(os.path.join(self._dir.name, "missing.json")), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# test_vectorized_analyzer.py
+# The NumPy engine against the per-record center analysis (python3 -m unittest test_vectorized_analyzer)
+
+import json
+import random
+import unittest
+
+from daily_weather_analyzer import analyze_center_hazards, organize_by_detention_center
+from hazard_rules import analysis_record
+
+try:
+    from vectorized_analyzer import analyze_centers
+except ImportError:
+    analyze_centers = None
+
+DAY = "2025-07-01"
+CENTERS = (("krome", "Krome North SPC", 88), ("glades", "Glades County Detention Center", 84),
+           ("broward", "Broward Transitional Center", 80))
+
+def _sample_day():
+    """detailed_analysis records for a day at three centers: heat, humidity, wind, a flood warning"""
+    records = []
+    for hour in range(24):
+        collected = f"{DAY}T{hour:02d}:05:00"
+        for code, name, base in CENTERS:
+            temperature = base + 10 * (1 - abs(hour - 14) / 14)
+            records.append(analysis_record({
+                "collection_timestamp": collected, "location_code": code, "location_name": name,
+                "status": "SUCCESS", "temperature_F": round(temperature, 1),
+                "relative_humidity": 90.0 if hour < 7 or hour == 9 else 60.0,
+                "wind_speed_mph": 45.0 if code == "glades" and hour in (20, 21) else 10.0,
+                "alerts": ["Flood Warning issued July 1 by NWS Miami"] if 15 <= hour <= 18 else []
+            }))
+    return records
+
+def _reference(records):
+    return {name: analyze_center_hazards(center_records)
+            for name, center_records in organize_by_detention_center({'detailed_analysis': records}).items()}
+
+@unittest.skipIf(analyze_centers is None, "numpy is not installed")
+class VectorizedAnalyzerTest(unittest.TestCase):
+
+    def assertSameReport(self, records):
+        # Compared as JSON, so 86 and 86.0 or a list and a tuple would differ
+        self.assertEqual(json.dumps(analyze_centers(records)), json.dumps(_reference(records)))
+
+    def test_sample_day(self):
+        records = _sample_day()
+        self.assertSameReport(records)
+        krome = analyze_centers(records)["Krome North SPC"]
+        self.assertEqual(krome["hazard_periods"]["high_humidity"],
+                         [{"start_hour": 0, "end_hour": 6, "duration": 7},
+                          {"start_hour": 9, "end_hour": 9, "duration": 1}])
+        self.assertEqual(krome["measurements"]["alerts_detected"], ["Flood Warning issued July 1 by NWS Miami"])
+
+    def test_records_out_of_order(self):
+        records = _sample_day()
+        random.Random(7).shuffle(records)
+        self.assertSameReport(records)
+
+    def test_edge_cases(self):
+        # Duplicate and unparseable timestamps, zero and tied measurements,
+        # alerts keyed by ID and a weather alert without text
+        records = [
+            {"location": "A", "analysis_timestamp": f"{DAY}T05:00:00",
+             "raw_measurements": {"temperature_f": 86, "heat_index_f": 0},
+             "hazard_analysis": [{"type": "weather_alert", "severity": "HIGH", "description": "Flood Warning",
+                                  "measurement": "Flood Warning until noon", "alert_id": "urn:1"}]},
+            {"location": "A", "analysis_timestamp": f"{DAY}T03:00:00",
+             "raw_measurements": {"temperature_f": 86.0, "humidity_percent": 90},
+             "hazard_analysis": [{"type": "high_humidity", "severity": "MODERATE", "description": "RH 90%",
+                                  "measurement": 90}]},
+            {"location": "B", "analysis_timestamp": "not a time", "raw_measurements": {},
+             "hazard_analysis": [{"type": "weather_alert", "severity": "HIGH", "description": "Tornado Warning",
+                                  "measurement": ""}]},
+            {"location": "A", "analysis_timestamp": f"{DAY}T05:00:00",
+             "raw_measurements": {"temperature_f": 70},
+             "hazard_analysis": [{"type": "weather_alert", "severity": "HIGH", "description": "Flood Warning",
+                                  "measurement": "Flood Warning extended", "alert_id": "urn:1"},
+                                 {"type": "high_humidity", "severity": "MODERATE", "description": "RH 88%",
+                                  "measurement": 88}]},
+            {"location": "B", "analysis_timestamp": "", "raw_measurements": {"temperature_f": None}},
+            {"location": "A", "analysis_timestamp": f"{DAY}T04:00:00", "raw_measurements": {}}
+        ]
+        self.assertSameReport(records)
+        self.assertEqual(analyze_centers(records)["A"]["measurements"]["alerts_detected"], ["Flood Warning until noon"])
+
+    def test_random_records(self):
+        rng = random.Random(11)
+        types = ("extreme_heat", "high_humidity", "dangerous_wind", "weather_alert")
+        for _ in range(50):
+            records = []
+            for _ in range(rng.randint(1, 60)):
+                hazards = []
+                for _ in range(rng.choice((0, 0, 1, 2))):
+                    hazard_type = rng.choice(types)
+                    hazard = {"type": hazard_type, "severity": "HIGH", "description": hazard_type,
+                              "measurement": rng.choice(("Heat Advisory", "Flood Watch", 95.0))}
+                    if hazard_type == "weather_alert" and rng.random() < 0.5:
+                        hazard["alert_id"] = rng.choice(("urn:1", "urn:2"))
+                    hazards.append(hazard)
+                records.append({
+                    "location": rng.choice("ABC"),
+                    "analysis_timestamp": f"{DAY}T{rng.randint(0, 23):02d}:{rng.choice((0, 30)):02d}:00",
+                    "raw_measurements": {"temperature_f": rng.choice((None, 0, 80, 80.0, 95.5)),
+                                         "heat_index_f": rng.choice((None, 90.1, 101.3)),
+                                         "humidity_percent": rng.choice((None, 60, 90))},
+                    "hazard_analysis": hazards
+                })
+            self.assertSameReport(records)
+
+if __name__ == "__main__":
+    unittest.main()
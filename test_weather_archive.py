@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# test_weather_archive.py
+# Compaction and queries of the columnar archive (python3 -m unittest test_weather_archive)
+
+import datetime
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    import numpy as np
+    import weather_archive
+    from weather_archive import WeatherArchive
+except ImportError:
+    np = None
+
+def _report(collected, records):
+    return {"report_metadata": {"collection_timestamp": collected}, "location_data": records}
+
+def _record(collected, location_code, temperature, humidity, wind=None):
+    return {"collection_timestamp": collected, "location_code": location_code, "station_id": "KTMB",
+            "status": "SUCCESS", "temperature_F": temperature, "relative_humidity": humidity,
+            "wind_speed_mph": wind}
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class WeatherArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.archive = WeatherArchive(self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _compact(self, reports, key="2025-07"):
+        with mock.patch.object(weather_archive, "load_saved_reports", lambda start, end: iter(reports)):
+            return self.archive.compact_month(key)
+
+    def test_compaction_keeps_each_record_once(self):
+        # The same report read from two places (store and a per-run file),
+        # and a sub-second variant of it, are one row
+        reports = [
+            _report("2025-07-01T10:05:00", [_record("2025-07-01T10:05:00", "krome", 90.0, 60.0),
+                                            {"collection_timestamp": "2025-07-01T10:05:00", "location_code": "glades",
+                                             "status": "API_ERROR"}]),
+            _report("2025-07-01T10:05:00", [_record("2025-07-01T10:05:00", "krome", 90.0, 60.0)]),
+            _report("2025-07-01T10:05:00.250000", [_record("2025-07-01T10:05:00.250000", "krome", 91.0, 60.0)]),
+            _report("2025-07-01T11:05:00", [_record("2025-07-01T11:05:00", "krome", 92.0, 55.0),
+                                            _record("2025-07-01T11:05:00", "glades", 88.0, 70.0)])
+        ]
+        self.assertEqual(self._compact(reports), 3)
+
+        table = self.archive.query(("timestamp", "location_code", "temperature_F"))
+        rows = sorted(zip(table["timestamp"].astype(str).tolist(), table["location_code"].tolist(),
+                          table["temperature_F"].tolist()))
+        self.assertEqual(rows, [("2025-07-01T10:05:00", "krome", 91.0), ("2025-07-01T11:05:00", "glades", 88.0),
+                                ("2025-07-01T11:05:00", "krome", 92.0)])
+        info = WeatherArchive(self._dir.name).manifest["partitions"]["2025-07"]
+        self.assertEqual((info["rows"], info["source_reports"]), (3, 4))
+        self.assertEqual(info["stats"]["temperature_F"], {"min": 88.0, "max": 92.0})
+
+    def test_compacting_an_empty_month_drops_its_partition(self):
+        self._compact([_report("2025-07-01T10:05:00", [_record("2025-07-01T10:05:00", "krome", 90.0, 60.0)])])
+        self.assertEqual(self._compact([]), 0)
+        self.assertEqual(self.archive.partitions(), [])
+        self.assertEqual(len(self.archive.query(("timestamp",))["timestamp"]), 0)
+
+    def test_query_filters_rows(self):
+        self._compact([_report(f"2025-07-01T{hour:02d}:05:00",
+                               [_record(f"2025-07-01T{hour:02d}:05:00", code, 80.0 + hour, 50.0)
+                                for code in ("krome", "glades")]) for hour in range(6)])
+        table = self.archive.query(("timestamp", "temperature_F"), start=datetime.datetime(2025, 7, 1, 2),
+                                   end=datetime.datetime(2025, 7, 1, 5), locations=["krome"],
+                                   where=[("temperature_F", ">=", 83)])
+        self.assertEqual(table["temperature_F"].tolist(), [83.0, 84.0])
+
+    def test_center_summary_matches_per_location_numpy(self):
+        rng = random.Random(3)
+        reports = []
+        for day in (1, 2):
+            for hour in range(24):
+                collected = f"2025-07-{day:02d}T{hour:02d}:05:00"
+                records = [_record(collected, code, round(rng.uniform(70, 100), 1), round(rng.uniform(30, 95)),
+                                   None if code == "glades" else round(rng.uniform(0, 40), 1))
+                           for code in ("krome", "glades", "broward") if not (code == "broward" and hour % 3)]
+                reports.append(_report(collected, records))
+        self._compact(reports)
+
+        summary = self.archive.center_summary()
+        table = self.archive.query(("timestamp", "location_code", "temperature_F", "relative_humidity", "wind_speed_mph"))
+        self.assertEqual(sorted(summary), ["broward", "glades", "krome"])
+        for code, entry in summary.items():
+            rows = table["location_code"] == code
+            self.assertEqual(entry["records"], int(rows.sum()))
+            self.assertEqual(entry["hours_with_records"], 16 if code == "broward" else 48)
+            self.assertEqual(entry["first"], str(table["timestamp"][rows].min()))
+            heat = weather_archive.heat_index_f(table["temperature_F"][rows], table["relative_humidity"][rows])
+            for name, values in (("temperature_F", table["temperature_F"][rows]), ("heat_index_f", heat),
+                                 ("wind_speed_mph", table["wind_speed_mph"][rows])):
+                values = values.astype(np.float64)
+                values = values[~np.isnan(values)]
+                if not len(values):
+                    self.assertEqual(set(entry[name].values()), {None})
+                    continue
+                self.assertAlmostEqual(entry[name]["min"], values.min(), places=3)
+                self.assertAlmostEqual(entry[name]["max"], values.max(), places=3)
+                for p in (50, 90, 99):
+                    self.assertAlmostEqual(entry[name][f"p{p}"], np.percentile(values, p), places=3)
+
+if __name__ == "__main__":
+    unittest.main()
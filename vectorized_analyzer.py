@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# vectorized_analyzer.py
+# NumPy engine for the center-focused analysis (daily_weather_analyzer.py --engine numpy)
+#
+# Records for every center are read once into flat columns. Sorting,
+# timestamp parsing (once per distinct timestamp), measurement ranges,
+# hazard counts, periods and hour coverage are then computed for all
+# centers together with group-by array operations. The report is
+# identical, field for field, to the one CenterAccumulator builds record
+# by record.
+
+import datetime
+from itertools import islice
+
+import numpy as np
+
+from alert_registry import hazard_alert
+from daily_weather_analyzer import CenterAccumulator
+
+FIELDS = ('heat_index_f', 'temperature_f', 'humidity_percent', 'precipitation_rate_in_hr')
+
+# Records flattened into columns at a time
+CHUNK_RECORDS = 50000
+
+class _Columns:
+    """detailed_analysis records flattened into integer-coded columns
+
+    Centers, timestamps and hazard types are coded as integers in order of
+    first appearance, so the arrays built from them never hold strings.
+    Records are taken CHUNK_RECORDS at a time, so a streamed file is never
+    held in memory as a whole.
+    """
+
+    def __init__(self, records):
+        self.center_names = {}
+        self.timestamp_values = {}
+        self.type_names = {}
+        self.center = []
+        self.timestamp = []
+        # One (FIELDS values) tuple per record
+        self.values = []
+        # One row per hazard: record number, type code and the hazard itself
+        self.hazard_record = []
+        self.hazard_type = []
+        self.hazards = []
+        # One row per weather alert hazard: hazard row number and (key, headline)
+        self.alert_hazard = []
+        self.alerts = []
+
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, CHUNK_RECORDS))
+            if not chunk:
+                break
+            self._add_chunk(chunk)
+
+    def _add_chunk(self, chunk):
+        offset = len(self.center)
+        center_names, timestamp_values, type_names = self.center_names, self.timestamp_values, self.type_names
+
+        self.center.extend([center_names.setdefault(record['location'], len(center_names)) for record in chunk])
+        self.timestamp.extend([timestamp_values.setdefault(record.get('analysis_timestamp', ''), len(timestamp_values))
+                               for record in chunk])
+        raw = [record.get('raw_measurements', {}) for record in chunk]
+        self.values.extend([tuple(map(measurements.get, FIELDS)) for measurements in raw])
+
+        hazard_start = len(self.hazards)
+        rows = [(offset + seq, hazard) for seq, record in enumerate(chunk) for hazard in record.get('hazard_analysis', [])]
+        self.hazard_record.extend([seq for seq, hazard in rows])
+        self.hazards.extend([hazard for seq, hazard in rows])
+        self.hazard_type.extend([type_names.setdefault(hazard['type'], len(type_names)) for seq, hazard in rows])
+
+        for row, (seq, hazard) in enumerate(rows, hazard_start):
+            if hazard['type'] != 'weather_alert':
+                continue
+            alert = hazard_alert(hazard)
+            if alert:
+                self.alert_hazard.append(row)
+                self.alerts.append(alert)
+
+def _hour(timestamp):
+    try:
+        return datetime.datetime.fromisoformat(timestamp).hour
+    except (TypeError, ValueError):
+        return -1
+
+def _first_extreme(values, group_start, larger):
+    """Position of each group's first largest (or smallest) value, -1 for all-NaN groups
+
+    `values` are in group order; `group_start` is where each group begins.
+    """
+    reduce = np.fmax if larger else np.fmin
+    extremes = reduce.reduceat(values, group_start)
+    group_of = np.repeat(np.arange(len(group_start)), np.diff(np.r_[group_start, len(values)]))
+    positions = np.where(values == extremes[group_of], np.arange(len(values)), len(values))
+    first = np.minimum.reduceat(positions, group_start)
+    return np.where(first < len(values), first, -1)
+
+def analyze_centers(records):
+    """{center name: analysis} for all centers at once, in order of first appearance"""
+    columns = _Columns(records)
+    n = len(columns.center)
+    if n == 0:
+        return {}
+    center_count = len(columns.center_names)
+    center_of = np.array(columns.center, dtype=np.int64)
+
+    # Sort records by center, then timestamp (stable, like CenterAccumulator).
+    # Only the distinct timestamps are compared and parsed.
+    timestamps = list(columns.timestamp_values)
+    timestamp_rank = np.empty(len(timestamps), dtype=np.int64)
+    timestamp_rank[sorted(range(len(timestamps)), key=timestamps.__getitem__)] = np.arange(len(timestamps))
+    record_timestamp = np.array(columns.timestamp, dtype=np.int64)
+    order = np.lexsort((np.arange(n), timestamp_rank[record_timestamp], center_of))
+
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+    record_counts = np.bincount(center_of, minlength=center_count)
+    group_start = np.r_[0, np.cumsum(record_counts)[:-1]]
+
+    # Hours; unparseable timestamps fall back to the record's position in
+    # its center's sorted list
+    hour_of_timestamp = np.array([_hour(value) for value in timestamps], dtype=np.int64)
+    hours = hour_of_timestamp[record_timestamp]
+    hours = np.where(hours < 0, rank - group_start[center_of], hours)
+    hour_by_rank = np.empty(n, dtype=np.int64)
+    hour_by_rank[rank] = hours
+
+    # Measurement ranges: the first record in time order among equal
+    # extremes, so the value is returned exactly as it was recorded
+    measurements = [{} for _ in range(center_count)]
+    # Missing values become NaN, which fmax/fmin skip; zero counts as missing too
+    numbers = np.array(columns.values, dtype=float)[order]
+    numbers[numbers == 0] = np.nan
+    for key, field, larger in CenterAccumulator.EXTREMES:
+        column = FIELDS.index(field)
+        for center, position in enumerate(_first_extreme(numbers[:, column], group_start, larger).tolist()):
+            measurements[center][key] = columns.values[order[position]][column] if position >= 0 else None
+
+    # Hazards in time order (and in record order within a record)
+    hazard_count = len(columns.hazard_record)
+    type_names = list(columns.type_names)
+    type_count = max(len(type_names), 1)
+    hazard_record = np.array(columns.hazard_record, dtype=np.int64)
+    hazard_type = np.array(columns.hazard_type, dtype=np.int64)
+    hazard_rank = rank[hazard_record]
+    hazard_center = center_of[hazard_record]
+    hazard_order = np.lexsort((np.arange(hazard_count), hazard_rank))
+
+    total_hazards = np.bincount(hazard_center, minlength=center_count)
+
+    # hazard_summary and hazard_periods both keep types in order of first detection
+    summary_key = (hazard_center * type_count + hazard_type)[hazard_order]
+    keys, first_index, key_counts = np.unique(summary_key, return_index=True, return_counts=True)
+    hazard_summary = [[] for _ in range(center_count)]
+    for first, key, count in sorted(zip(first_index.tolist(), keys.tolist(), key_counts.tolist())):
+        hazard_summary[key // type_count].append((type_names[key % type_count], count))
+
+    # Hours with at least one hazard
+    hours_covered = np.zeros(center_count, dtype=np.int64)
+    if hazard_count:
+        span = int(hours.max()) + 1
+        hour_keys = np.unique(hazard_center * span + hour_by_rank[hazard_rank])
+        hours_covered = np.bincount(hour_keys // span, minlength=center_count)
+
+    # Periods: runs of consecutive records (ranks) with the same hazard type
+    periods = {}
+    if hazard_count:
+        # One (center, type, rank) entry per record and type, sorted
+        presence_key = np.unique((hazard_center * type_count + hazard_type) * n + hazard_rank)
+        presence_center = presence_key // (type_count * n)
+        presence_type = presence_key // n % type_count
+        presence_rank = presence_key % n
+        run_start = np.r_[True, (presence_center[1:] != presence_center[:-1]) | (presence_type[1:] != presence_type[:-1])
+                          | (presence_rank[1:] != presence_rank[:-1] + 1)]
+        starts = np.flatnonzero(run_start)
+        ends = np.r_[starts[1:], len(presence_key)] - 1
+        start_hours = hour_by_rank[presence_rank[starts]].tolist()
+        end_hours = hour_by_rank[presence_rank[ends]].tolist()
+
+        for center, type_code, start_hour, end_hour in zip(presence_center[starts].tolist(), presence_type[starts].tolist(),
+                                                           start_hours, end_hours):
+            periods.setdefault((center, type_code), []).append(
+                {'start_hour': start_hour, 'end_hour': end_hour, 'duration': end_hour - start_hour + 1})
+
+    # Timelines and alerts, built in time order
+    timelines = [[] for _ in range(center_count)]
+    hour_list = hours.tolist()
+    for row in hazard_order.tolist():
+        hazard = columns.hazards[row]
+        record = columns.hazard_record[row]
+        timelines[columns.center[record]].append({
+            'hour': hour_list[record],
+            'type': hazard['type'],
+            'severity': hazard['severity'],
+            'description': hazard['description'],
+            'measurement': hazard.get('measurement'),
+            'risk_level': hazard.get('risk_level'),
+            'timestamp': timestamps[columns.timestamp[record]]
+        })
+
+    # Alerts keep the first headline seen for each alert key
+    alerts = [{} for _ in range(center_count)]
+    if columns.alert_hazard:
+        position_in_order = np.empty(hazard_count, dtype=np.int64)
+        position_in_order[hazard_order] = np.arange(hazard_count)
+        alert_hazard = np.array(columns.alert_hazard, dtype=np.int64)
+        for index in np.argsort(position_in_order[alert_hazard], kind='stable').tolist():
+            center = columns.center[columns.hazard_record[columns.alert_hazard[index]]]
+            alert_key, alert_text = columns.alerts[index]
+            alerts[center].setdefault(alert_key, alert_text)
+
+    results = {}
+    for name, center in columns.center_names.items():
+        summary = dict(hazard_summary[center])
+        measurements[center]['alerts_detected'] = list(alerts[center].values())
+        results[name] = {
+            'total_records': int(record_counts[center]),
+            'total_hazards': int(total_hazards[center]),
+            'unique_hazard_types': len(summary),
+            'hazard_summary': summary,
+            'most_frequent_hazard': max(summary.items(), key=lambda x: x[1]) if summary else None,
+            'hazard_timeline': timelines[center],
+            'hazard_periods': {hazard_type: periods[(center, columns.type_names[hazard_type])]
+                               for hazard_type in summary},
+            'measurements': measurements[center],
+            'hours_covered': int(hours_covered[center])
+        }
+    return results
+
+def create_center_focused_report_vectorized(date_str, records):
+    """Center-focused report for an iterable of detailed_analysis records"""
+    report = {
+        'date': date_str,
+        'analysis_timestamp': datetime.datetime.now().isoformat(),
+        'total_centers': 0,
+        'centers': {}
+    }
+    report['centers'] = analyze_centers(records)
+    report['total_centers'] = len(report['centers'])
+    return report
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# weather_archive.py
+# Columnar monthly archive of observations for fast historical queries
+#
+# Compaction turns the saved reports into one compressed NumPy .npz file
+# per month with one array per column. A manifest keeps each month's row
+# count and min/max values, so queries skip months that cannot match and
+# only decompress the columns they use.
+
+import datetime
+import json
+import os
+
+import numpy as np
+
+from nws_client import save_json_file
+from report_store import load_saved_reports
+
+ARCHIVE_DIR = "../weather_archive"
+MANIFEST_FILE = "manifest.json"
+PARTITION_PREFIX = "observations_"
+
+# Columns summarized per center by center_summary(), plus the heat index
+SUMMARY_COLUMNS = ("temperature_F", "relative_humidity", "wind_speed_mph")
+SUMMARY_PERCENTILES = (50, 90, 99)
+
+# Column name -> NumPy dtype. Text columns are stored as integer codes
+# plus a `<column>__values` lookup array.
+COLUMNS = {
+    "timestamp": "datetime64[s]",
+    "location_code": "text",
+    "station_id": "text",
+    "temperature_C": "float32",
+    "temperature_F": "float32",
+    "relative_humidity": "float32",
+    "wind_speed_mph": "float32",
+    "barometric_pressure": "float32",
+    "visibility": "float32",
+    "alert_count": "int16",
+}
+TEXT_COLUMNS = [name for name, dtype in COLUMNS.items() if dtype == "text"]
+NUMERIC_COLUMNS = [name for name, dtype in COLUMNS.items() if dtype.startswith(("float", "int"))]
+
+OPERATORS = {
+    "==": np.equal, "!=": np.not_equal,
+    "<": np.less, "<=": np.less_equal,
+    ">": np.greater, ">=": np.greater_equal,
+}
+
+def month_key(day):
+    return f"{day.year:04d}-{day.month:02d}"
+
+def month_bounds(key):
+    """(first moment of the month, first moment of the next month)"""
+    start = datetime.datetime.strptime(key, "%Y-%m")
+    end = (start + datetime.timedelta(days=32)).replace(day=1)
+    return start, end
+
+def heat_index_f(temperature_f, humidity):
+    """NWS heat index (°F) for arrays of temperature (°F) and relative humidity (%)
+
+    hazard_rules.heat_index_f is the same formula for one reading, without NumPy.
+    """
+    t = np.asarray(temperature_f, dtype=np.float64)
+    rh = np.asarray(humidity, dtype=np.float64)
+
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+    full = (-42.379 + 2.04901523 * t + 10.14333127 * rh - 0.22475541 * t * rh
+            - 0.00683783 * t * t - 0.05481717 * rh * rh + 0.00122874 * t * t * rh
+            + 0.00085282 * t * rh * rh - 0.00000199 * t * t * rh * rh)
+
+    # Rothfusz adjustments for very dry and very humid air
+    dry = (rh < 13) & (t >= 80) & (t <= 112)
+    full = np.where(dry, full - ((13 - rh) / 4) * np.sqrt(np.clip((17 - np.abs(t - 95)) / 17, 0, None)), full)
+    humid = (rh > 85) & (t >= 80) & (t <= 87)
+    full = np.where(humid, full + ((rh - 85) / 10) * ((87 - t) / 5), full)
+
+    return np.where((simple + t) / 2 >= 80, full, simple)
+
+def _stat(value):
+    if value is None:
+        return None
+    value = float(value)
+    return None if np.isnan(value) else round(value, 3)
+
+class WeatherArchive:
+    """Monthly .npz partitions of successful location records"""
+
+    def __init__(self, path=ARCHIVE_DIR):
+        self.path = path
+        self.manifest_path = os.path.join(path, MANIFEST_FILE)
+        try:
+            with open(self.manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {"partitions": {}}
+
+    def _partition_path(self, key):
+        return os.path.join(self.path, f"{PARTITION_PREFIX}{key}.npz")
+
+    # Compaction
+
+    def compact_month(self, key):
+        """Rebuild one month's partition from the saved reports; returns its row count"""
+        start, end = month_bounds(key)
+
+        rows = {}
+        report_count = 0
+        for report in load_saved_reports(start, end):
+            report_count += 1
+            for record in report.get('location_data', []):
+                if record.get('status') != 'SUCCESS' or not record.get('location_code'):
+                    continue
+                timestamp = record.get('collection_timestamp', '')[:19]
+                # A record seen twice (same collection time, to the second) is kept once
+                rows[(timestamp, record['location_code'])] = record
+
+        if not rows:
+            # Nothing left for this month: drop what an earlier compaction wrote
+            if self.manifest["partitions"].pop(key, None) is not None:
+                save_json_file(self.manifest_path, self.manifest)
+            try:
+                os.remove(self._partition_path(key))
+            except FileNotFoundError:
+                pass
+            return 0
+
+        keys = sorted(rows)
+        records = [rows[k] for k in keys]
+        arrays = {"timestamp": np.array([k[0] for k in keys], dtype="datetime64[s]")}
+
+        for name in TEXT_COLUMNS:
+            values = [record.get(name) or "" for record in records]
+            lookup, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+            arrays[name] = codes.astype(np.int32)
+            arrays[f"{name}__values"] = lookup
+
+        for name in NUMERIC_COLUMNS:
+            if COLUMNS[name].startswith("int"):
+                arrays[name] = np.array([record.get(name) or 0 for record in records], dtype=COLUMNS[name])
+            else:
+                arrays[name] = np.array([np.nan if record.get(name) is None else record[name] for record in records],
+                                        dtype=COLUMNS[name])
+
+        os.makedirs(self.path, exist_ok=True)
+        partition_path = self._partition_path(key)
+        tmp_path = f"{partition_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, partition_path)
+
+        stats = {}
+        for name in NUMERIC_COLUMNS:
+            column = arrays[name].astype(np.float64)
+            has_values = not np.all(np.isnan(column))
+            stats[name] = {"min": _stat(np.nanmin(column)) if has_values else None,
+                           "max": _stat(np.nanmax(column)) if has_values else None}
+
+        self.manifest["partitions"][key] = {
+            "file": os.path.basename(partition_path),
+            "rows": len(records),
+            "source_reports": report_count,
+            "first_timestamp": str(arrays["timestamp"].min()),
+            "last_timestamp": str(arrays["timestamp"].max()),
+            "locations": arrays["location_code__values"].tolist(),
+            "stations": arrays["station_id__values"].tolist(),
+            "stats": stats,
+            "compacted_at": datetime.datetime.now().isoformat()
+        }
+        save_json_file(self.manifest_path, self.manifest)
+        return len(records)
+
+    def compact(self, months):
+        """Rebuild the given months ('YYYY-MM'); returns {month: rows}"""
+        return {key: self.compact_month(key) for key in months}
+
+    # Queries
+
+    def _partition_may_match(self, key, start, end, locations, where):
+        """Use the manifest to rule out months without reading them"""
+        info = self.manifest["partitions"][key]
+        first = datetime.datetime.fromisoformat(info["first_timestamp"])
+        last = datetime.datetime.fromisoformat(info["last_timestamp"])
+        if (start is not None and last < start) or (end is not None and first >= end):
+            return False
+        if locations is not None and not set(locations) & set(info["locations"]):
+            return False
+
+        for column, op, value in where:
+            stats = info["stats"].get(column)
+            if not stats or op not in ("<", "<=", ">", ">=", "=="):
+                continue
+            low, high = stats["min"], stats["max"]
+            if low is None:
+                return False
+            if (op == ">" and high <= value) or (op == ">=" and high < value):
+                return False
+            if (op == "<" and low >= value) or (op == "<=" and low > value):
+                return False
+            if op == "==" and not (low <= value <= high):
+                return False
+        return True
+
+    def partitions(self, start=None, end=None, locations=None, where=()):
+        """Month keys that may hold matching rows, oldest first"""
+        return [key for key in sorted(self.manifest["partitions"])
+                if self._partition_may_match(key, start, end, locations, where)]
+
+    def _column(self, data, name):
+        """Decode one stored column (text columns become string arrays)"""
+        if name in TEXT_COLUMNS:
+            return data[f"{name}__values"][data[name]]
+        return data[name]
+
+    def query(self, columns=None, start=None, end=None, locations=None, where=()):
+        """Return {column: array} for rows matching every filter
+
+        `columns` limits which columns are read. `start` / `end` bound the
+        collection time, `locations` keeps only some location codes, and
+        `where` is a list of (column, operator, value) tuples such as
+        ('temperature_F', '>=', 90). Months whose manifest statistics rule
+        out a match are never opened, and only the needed columns are
+        decompressed.
+        """
+        columns = list(columns or COLUMNS)
+        unknown = [name for name in columns + [w[0] for w in where] if name not in COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+
+        pieces = {name: [] for name in columns}
+        for key in self.partitions(start, end, locations, where):
+            with np.load(self._partition_path(key)) as data:
+                timestamps = data["timestamp"]
+                mask = np.ones(len(timestamps), dtype=bool)
+                if start is not None:
+                    mask &= timestamps >= np.datetime64(start, 's')
+                if end is not None:
+                    mask &= timestamps < np.datetime64(end, 's')
+                if locations is not None:
+                    lookup = data["location_code__values"]
+                    wanted = np.flatnonzero(np.isin(lookup, list(locations)))
+                    mask &= np.isin(data["location_code"], wanted)
+                for column, op, value in where:
+                    values = self._column(data, column)
+                    if op == "in":
+                        mask &= np.isin(values, list(value))
+                    else:
+                        mask &= OPERATORS[op](values, value)
+
+                if not mask.any():
+                    continue
+                for name in columns:
+                    pieces[name].append(self._column(data, name)[mask])
+
+        result = {}
+        for name in columns:
+            if pieces[name]:
+                result[name] = np.concatenate(pieces[name])
+            elif name in TEXT_COLUMNS:
+                result[name] = np.array([], dtype=str)
+            else:
+                result[name] = np.array([], dtype=COLUMNS[name])
+        return result
+
+    def daily_max_heat_index(self, start=None, end=None, locations=None):
+        """Return [(location_code, date, max heat index °F)] sorted by location and date"""
+        table = self.query(["timestamp", "location_code", "temperature_F", "relative_humidity"],
+                           start, end, locations)
+        heat = heat_index_f(table["temperature_F"], table["relative_humidity"])
+        valid = ~np.isnan(heat)
+        if not valid.any():
+            return []
+
+        days = table["timestamp"][valid].astype("datetime64[D]")
+        location_codes = table["location_code"][valid]
+        heat = heat[valid]
+
+        # Group by (location, day) and keep each group's maximum
+        groups, inverse = np.unique(np.rec.fromarrays([location_codes, days]), return_inverse=True)
+        maxima = np.full(len(groups), -np.inf)
+        np.maximum.at(maxima, inverse.ravel(), heat)
+        return [(str(group[0]), str(group[1]), round(float(value), 1)) for group, value in zip(groups, maxima)]
+
+    def center_summary(self, start=None, end=None, locations=None, percentiles=SUMMARY_PERCENTILES):
+        """Per-location record counts, hours with records and min/max/percentiles of each summary column
+
+        Returns {location_code: {'records', 'hours_with_records', 'first',
+        'last', <column>: {'min', 'max', 'p50', ...}}}. These are archive
+        statistics, not the center report: `hours_with_records` counts the
+        clock hours with at least one observation. Every statistic is
+        computed for all locations at once on rows grouped by one sort, so
+        the cost is reading the columns, not the number of centers.
+        """
+        table = self.query(("timestamp", "location_code") + SUMMARY_COLUMNS, start, end, locations)
+        if not len(table["timestamp"]):
+            return {}
+        table["heat_index_f"] = heat_index_f(table["temperature_F"], table["relative_humidity"])
+
+        location_codes, inverse = np.unique(table["location_code"], return_inverse=True)
+        inverse = inverse.ravel()
+        group_count = len(location_codes)
+        order = np.argsort(inverse, kind="stable")
+        counts = np.bincount(inverse, minlength=group_count)
+        group_start = np.r_[0, np.cumsum(counts)[:-1]]
+
+        timestamps = table["timestamp"][order]
+        first = np.minimum.reduceat(timestamps, group_start)
+        last = np.maximum.reduceat(timestamps, group_start)
+        hours = table["timestamp"].astype("datetime64[h]").astype(np.int64)
+        hour_keys = np.unique(np.rec.fromarrays([inverse, hours]))
+        hours_with_records = np.bincount(hour_keys["f0"], minlength=group_count)
+
+        stats = {name: _grouped_stats(table[name].astype(np.float64), inverse, group_count, percentiles)
+                 for name in SUMMARY_COLUMNS + ("heat_index_f",)}
+
+        summary = {}
+        for position, location_code in enumerate(location_codes.tolist()):
+            entry = {
+                "records": int(counts[position]),
+                "hours_with_records": int(hours_with_records[position]),
+                "first": str(first[position]),
+                "last": str(last[position])
+            }
+            for name, columns in stats.items():
+                entry[name] = {key: _stat(values[position]) for key, values in columns.items()}
+            summary[location_code] = entry
+        return summary
+
+def _grouped_stats(values, groups, group_count, percentiles):
+    """{'min', 'max', 'p50', ...: array per group} of the non-NaN values, NaN for empty groups
+
+    Values are sorted within their group once; each percentile is then
+    read off every group together (linear interpolation, as np.percentile).
+    """
+    valid = ~np.isnan(values)
+    values, groups = values[valid], groups[valid]
+    order = np.lexsort((values, groups))
+    values = values[order]
+    counts = np.bincount(groups, minlength=group_count)
+    group_start = np.r_[0, np.cumsum(counts)[:-1]]
+    has_values = counts > 0
+    start = group_start[has_values]
+    last = start + counts[has_values] - 1
+
+    def per_group(result):
+        column = np.full(group_count, np.nan)
+        column[has_values] = result
+        return column
+
+    stats = {"min": per_group(values[start]), "max": per_group(values[last])}
+    for p in percentiles:
+        rank = (counts[has_values] - 1) * (p / 100)
+        below = np.floor(rank).astype(np.int64)
+        above = np.ceil(rank).astype(np.int64)
+        low, high = values[start + below], values[start + above]
+        stats[f"p{p}"] = per_group(low + (high - low) * (rank - below))
+    return stats
+
+def recent_months(count=2, today=None):
+    """Keys of the last `count` months, including the current one"""
+    day = (today or datetime.date.today()).replace(day=1)
+    months = []
+    for _ in range(count):
+        months.append(month_key(day))
+        day = (day - datetime.timedelta(days=1)).replace(day=1)
+    return sorted(months)
+
+def main():
+    """Compact reports into the archive or run an example query"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Columnar archive of collected observations')
+    parser.add_argument('--compact', nargs='*', metavar='YYYY-MM',
+                        help='Rebuild these months (default: this month and last month)')
+    parser.add_argument('--heat-index', action='store_true',
+                        help='Print the maximum heat index per location per day')
+    parser.add_argument('--center-summary', action='store_true',
+                        help='Print per-location ranges and percentiles (temperature, heat index, humidity, wind)')
+    parser.add_argument('--start', help='Query start date (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Query end date, exclusive (YYYY-MM-DD)')
+    parser.add_argument('--location', action='append', help='Only this location code (can be repeated)')
+
+    args = parser.parse_args()
+
+    archive = WeatherArchive()
+
+    if args.compact is not None:
+        months = args.compact or recent_months()
+        for key, rows in archive.compact(months).items():
+            print(f" {key}: {rows} rows")
+        print(f" Archive: {archive.path}")
+
+    start = datetime.datetime.fromisoformat(args.start) if args.start else None
+    end = datetime.datetime.fromisoformat(args.end) if args.end else None
+
+    if args.heat_index:
+        for location_code, day, value in archive.daily_max_heat_index(start, end, args.location):
+            print(f"{day}  {location_code:30s} {value:6.1f}°F")
+
+    if args.center_summary:
+        for location_code, entry in archive.center_summary(start, end, args.location).items():
+            print(f"\n{location_code}: {entry['records']} records in {entry['hours_with_records']} hours "
+                  f"({entry['first']} - {entry['last']})")
+            for name in SUMMARY_COLUMNS + ("heat_index_f",):
+                stats = entry[name]
+                print(f"  {name:20s} " + "  ".join(f"{key} {value if value is not None else '-'}"
+                                                   for key, value in stats.items()))
+
+    if args.compact is None and not args.heat_index and not args.center_summary:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,36 @@
 #!/usr/bin/env python3
 #For hourly weather tracking
 
-import requests
 import datetime
+import io
 import json
 import os
+import random
+import signal
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaIoBaseUpload
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 
-# Import our station configuration
-from configuration import get_station_config, get_working_station, get_alerts_url, get_all_locations
+# Import our station configuration (configuration.py, or the JSON file
+# written by station_finder.py --bulk)
+from facility_config import get_station_config, get_working_station, get_alerts_url, get_all_locations, use_facility_config
+from alert_matcher import AreaAlertMatcher, ZoneAlertMatcher
+from alert_registry import compact_alerts, get_alert_registry
+from observation_hedger import LatencyTracker, ObservationHedger, DEFAULT_HEDGE_PERCENTILE, observation_age_hours
+from station_health import HALF_OPEN, get_health_store
+from station_ranking import load_station_rankings
+from report_store import ReportStore, get_report_store, report_filename
+from report_bundler import latest_bundled_report
+from delta_archive import get_delta_archive
+from center_aggregator import update_center_aggregates
+from nws_client import (RunCache, configure_rate_limit, configure_session, nws_get_json, save_json_file,
+                        DEFAULT_REQUESTS_PER_SECOND, DEFAULT_BURST, DEFAULT_POOL_SIZE, DEFAULT_RETRIES)
 
 # Google Drive API setup
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
@@ -22,6 +38,44 @@ CREDENTIALS_FILE = 'credentials.json'
 TOKEN_FILE = 'token.json'
 DRIVE_FOLDER_ID = 'Find this in the browser of the folder'
 
+# Number of locations collected at the same time. All workers share one
+# api.weather.gov rate limiter, so this only controls overlap of waiting.
+DEFAULT_WORKERS = 8
+
+# How active alerts are looked up:
+#   point - one /alerts/active?point= query per location (original behaviour)
+#   area  - one /alerts/active?area= query per state, matched to locations locally
+#   zone  - one /alerts/active/zone/ query per unique forecast zone and county
+ALERT_MODES = ('point', 'area', 'zone')
+DEFAULT_ALERT_MODE = 'point'
+
+# Where consolidated reports are saved
+RAW_DIR = "../raw_weather_json"
+
+# Sub-hourly mode: every observation since the previous run is kept. When a
+# station has no previous run, look back this far (and never further than
+# the maximum, so a long outage does not pull days of data)
+DEFAULT_SERIES_LOOKBACK_HOURS = 2
+MAX_SERIES_LOOKBACK_HOURS = 12
+
+# Columns of the compact observation_series stored with each record
+SERIES_FIELDS = [
+    ("timestamp", None),
+    ("temperature_C", "temperature"),
+    ("relative_humidity", "relativeHumidity"),
+    ("heat_index_C", "heatIndex"),
+    ("wind_speed_kph", "windSpeed"),
+    ("wind_gust_kph", "windGust"),
+    ("barometric_pressure", "barometricPressure"),
+    ("visibility", "visibility"),
+    ("precipitation_last_hour_mm", "precipitationLastHour")
+]
+
+# Daemon mode: collection runs at the top of each hour plus a random delay
+# of up to DEFAULT_JITTER_SECONDS, and reports its progress in STATUS_FILE
+DEFAULT_JITTER_SECONDS = 120
+STATUS_FILE = "collector_status.json"
+
 def authenticate_google_drive():
     """Authenticate and return Google Drive service object"""
     creds = None
@@ -41,20 +95,31 @@ def authenticate_google_drive():
     
     return build('drive', 'v3', credentials=creds)
 
-def upload_to_google_drive(service, file_path, folder_id):
-    """Upload file to specified Google Drive folder"""
+_drive_service = None
+_drive_service_lock = threading.Lock()
+
+def get_drive_service():
+    """Return a Google Drive service, reusing it across runs in daemon mode"""
+    global _drive_service
+    with _drive_service_lock:
+        if _drive_service is None:
+            _drive_service = authenticate_google_drive()
+        return _drive_service
+
+def reset_drive_service():
+    """Forget the cached Drive service so the next upload authenticates again"""
+    global _drive_service
+    with _drive_service_lock:
+        _drive_service = None
+
+def upload_report_to_google_drive(service, report, filename, folder_id):
+    """Upload a report to Google Drive straight from memory; returns the file ID or None"""
     try:
-        filename = os.path.basename(file_path)
-        
-        file_metadata = {
-            'name': filename,
-            'parents': [folder_id]
-        }
-        
-        media = MediaFileUpload(file_path, mimetype='application/json')
+        data = json.dumps(report, separators=(',', ':')).encode('utf-8')
+        media = MediaIoBaseUpload(io.BytesIO(data), mimetype='application/json')
         
         file = service.files().create(
-            body=file_metadata,
+            body={'name': filename, 'parents': [folder_id]},
             media_body=media,
             fields='id'
         ).execute()
@@ -66,10 +131,241 @@ def upload_to_google_drive(service, file_path, folder_id):
         print(f" ❌ Error uploading to Google Drive: {e}")
         return None
 
-def collect_weather_data(location_code):
-    """Collect weather data for a specific location with polite delays"""
+def fetch_latest_observation(station_id):
+    """Fetch the latest observation properties for a station"""
+    url = f"https://api.weather.gov/stations/{station_id}/observations/latest"
+    data = nws_get_json(url, timeout=15)
+    return data.get('properties', {})
+
+class StationObservationCache(RunCache):
+    """Fetch each station's latest observation at most once per collection run
+    
+    If a LatencyTracker is given, the time of every network fetch is recorded.
+    If a StationHealthStore is given, every fetch's outcome, latency and
+    data age is recorded in it.
+    """
+    
+    def __init__(self, latency=None, health=None):
+        self.latency = latency
+        self.health = health
+        super().__init__(self._fetch)
+    
+    def fetch_observation(self, station_id):
+        """Network fetch for one station (overridden by other collection modes)"""
+        return fetch_latest_observation(station_id)
+    
+    def _fetch(self, station_id):
+        start = time.monotonic()
+        try:
+            props = self.fetch_observation(station_id)
+        except Exception as e:
+            if self.health is not None:
+                self.health.record_failure(station_id, e, time.monotonic() - start)
+            raise
+        finally:
+            if self.latency is not None:
+                self.latency.record(time.monotonic() - start)
+        
+        if self.health is not None:
+            self.health.record_success(station_id, time.monotonic() - start, observation_age_hours(props))
+        return props
+    
+    def station_count(self):
+        """Number of unique stations requested so far"""
+        return len(self)
+
+def parse_nws_time(timestamp):
+    """Parse an NWS ISO timestamp as an aware datetime, or None"""
+    try:
+        parsed = datetime.datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+
+def load_previous_nws_timestamps(raw_dir=None):
+    """Newest nws_timestamp per station from the most recent saved report
+    
+    The report store holds the days report_bundler.py has not sealed yet.
+    When it is empty (just after the bundler ran, or before the store
+    existed) the newest bundled report or per-run file is used.
+    """
+    raw_dir = raw_dir or RAW_DIR
+    if raw_dir == RAW_DIR:
+        store = get_report_store()
+    else:
+        store = ReportStore(os.path.join(raw_dir, "report_store"))
+    report = store.latest_report()
+    
+    if report is None:
+        report = latest_bundled_report(os.path.join(raw_dir, "bundles"))
+        try:
+            reports = sorted(f for f in os.listdir(raw_dir)
+                             if f.startswith("consolidated_weather_report_") and f.endswith(".json"))
+            newest = report.get('report_metadata', {}).get('collection_timestamp', '') if report else ''
+            if reports and report_filename(newest) < reports[-1]:
+                with open(os.path.join(raw_dir, reports[-1]), 'r') as f:
+                    report = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if report is None:
+            return {}
+    
+    timestamps = {}
+    for record in report.get('location_data', []):
+        station_id = record.get('station_id')
+        observed = parse_nws_time(record.get('nws_timestamp'))
+        if station_id and observed and (station_id not in timestamps or observed > timestamps[station_id]):
+            timestamps[station_id] = observed
+    return timestamps
+
+def fetch_observations_since(station_id, since):
+    """Fetch all of a station's observations after `since`
+    
+    Usually one request; follows pagination if the NWS splits the range
+    across pages.
+    """
+    since_utc = since.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    url = f"https://api.weather.gov/stations/{station_id}/observations?start={since_utc}"
+    
+    observations = []
+    while url:
+        data = nws_get_json(url, timeout=15, conditional=False)
+        features = data.get('features', [])
+        observations.extend(feature.get('properties', {}) for feature in features)
+        url = data.get('pagination', {}).get('next') if features else None
+    return observations
+
+def compact_observation_series(observations):
+    """Pack observations into {"fields": [...], "rows": [[...], ...]}, oldest first"""
+    rows = []
+    for props in sorted(observations, key=lambda p: p.get('timestamp') or ''):
+        row = []
+        for name, source in SERIES_FIELDS:
+            if source is None:
+                row.append(props.get(name))
+            else:
+                row.append((props.get(source) or {}).get('value'))
+        rows.append(row)
+    return {"fields": [name for name, source in SERIES_FIELDS], "rows": rows}
+
+class SubHourlyObservationCache(StationObservationCache):
+    """Fetch every observation since the previous run with one request per station
+    
+    The newest observation becomes the hourly snapshot, so this costs the
+    same number of requests as /observations/latest while also keeping the
+    5-20 minute reports in between runs.
+    """
+    
+    def __init__(self, previous_timestamps, latency=None, health=None):
+        super().__init__(latency, health)
+        self.previous_timestamps = previous_timestamps
+        self._series = {}
+    
+    def fetch_observation(self, station_id):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        since = self.previous_timestamps.get(station_id) or now - datetime.timedelta(hours=DEFAULT_SERIES_LOOKBACK_HOURS)
+        since = max(since, now - datetime.timedelta(hours=MAX_SERIES_LOOKBACK_HOURS))
+        
+        observations = [p for p in fetch_observations_since(station_id, since)
+                        if parse_nws_time(p.get('timestamp')) and parse_nws_time(p['timestamp']) > since]
+        self._series[station_id] = compact_observation_series(observations)
+        
+        # Nothing new since the last run: fall back to the latest report
+        if not observations:
+            return fetch_latest_observation(station_id)
+        return max(observations, key=lambda p: parse_nws_time(p['timestamp']))
+    
+    def series(self, station_id):
+        """Compact series of observations since the previous run for a station"""
+        return self._series.get(station_id)
+
+def build_observation_record(location_code, config, station_id, is_backup, props, current_time=None):
+    """Build a location record from an NWS observation's properties"""
+    current_time = current_time or datetime.datetime.now()
+    record = {
+        "collection_timestamp": current_time.isoformat(),
+        "collection_date": current_time.strftime("%Y-%m-%d"),
+        "collection_time": current_time.strftime("%H:%M:%S"),
+        "location_code": location_code,
+        "location_name": config['location_name'],
+        "region": config['region'],
+        "station_id": station_id,
+        "is_backup_station": is_backup,
+        "station_status": "BACKUP" if is_backup else "PRIMARY",
+        "status": "SUCCESS",
+        "nws_timestamp": props.get('timestamp'),
+        "temperature_C": props.get('temperature', {}).get('value'),
+        "temperature_F": None,
+        "relative_humidity": props.get('relativeHumidity', {}).get('value'),
+        "wind_speed_kph": props.get('windSpeed', {}).get('value'),
+        "wind_speed_mph": None,
+        "text_description": props.get('textDescription'),
+        "barometric_pressure": props.get('barometricPressure', {}).get('value'),
+        "visibility": props.get('visibility', {}).get('value')
+    }
+    
+    # Convert units
+    if record["temperature_C"] is not None:
+        record["temperature_F"] = round((record["temperature_C"] * 9/5) + 32, 1)
+    
+    if record["wind_speed_kph"] is not None:
+        record["wind_speed_mph"] = round(record["wind_speed_kph"] * 0.621371, 1)
+    
+    return record
+
+def choose_station(location_code, config, health=None, rankings=None):
+    """Pick the station to use for a location
+    
+    With a StationHealthStore, stations with open circuits are skipped and
+    the configured backups are ordered by health, so failover is a lookup
+    instead of a timeout. With `rankings` from station_ranking.py, stations
+    are tried in ranked order (open circuits left out) instead. Returns
+    (station_id, is_backup, status_message, fallback_station_ids).
+    """
+    if health is None or not config.get('primary_station'):
+        station_id, is_backup, status_message = get_working_station(location_code)
+        fallbacks = [s for s in [config.get('primary_station')] + list(config.get('backup_stations', []))
+                     if s and s != station_id]
+        return station_id, is_backup, status_message, fallbacks
+    
+    primary = config['primary_station']
+    configured = [primary] + list(config.get('backup_stations', []))
+    ranked = (rankings or {}).get(location_code)
+    if ranked:
+        # The ranking already weighs health; keep its order for failover
+        candidates = health.usable(ranked + configured)
+    else:
+        candidates = health.rank_candidates(configured)
+    
+    if not candidates:
+        return None, False, "All stations failing (circuit open) - skipped until their retry time", []
+    
+    station_id = candidates[0]
+    if station_id == primary:
+        status_message = "Primary station healthy"
+    elif ranked and station_id == ranked[0]:
+        status_message = f"Using top-ranked station {station_id} instead of primary {primary}"
+    else:
+        status_message = f"Primary station {primary} unavailable - using backup {station_id}"
+    return station_id, station_id != primary, status_message, candidates[1:]
+
+def collect_weather_data(location_code, observations=None, area_alerts=None, hedger=None, health=None,
+                         rankings=None):
+    """Collect weather data for a specific location through the shared rate limiter
+    
+    Pass a StationObservationCache as `observations` to share station
+    fetches between locations in the same run, an AreaAlertMatcher as
+    `area_alerts` (or ZoneAlertMatcher) to match alerts from a shared feed
+    instead of a point query, an ObservationHedger as `hedger` to race
+    the first backup station when the chosen station is slow, a
+    StationHealthStore as `health` to choose stations by recorded health,
+    and station rankings as `rankings` to try stations in ranked order.
+    """
     print(f" Collecting: {location_code}")
     
+    if observations is None:
+        observations = StationObservationCache()
+    
     # Get station configuration
     config = get_station_config(location_code)
     if not config:
@@ -81,7 +377,7 @@ def collect_weather_data(location_code):
         }
     
     # Find working weather station
-    station_id, is_backup, status_message = get_working_station(location_code)
+    station_id, is_backup, status_message, fallbacks = choose_station(location_code, config, health, rankings)
     
     if not station_id:
         # All stations down - create NA record
@@ -105,15 +401,31 @@ def collect_weather_data(location_code):
             "alerts_gps": config['alerts_gps']
         }
     
-    # Polite delay between API calls
-    time.sleep(2)
-    
-    # Get weather observation
+    # Get weather observation (shared with other locations using this station)
+    hedged = False
+    failed_stations = []
     try:
-        url = f"https://api.weather.gov/stations/{station_id}/observations/latest"
-        response = requests.get(url, timeout=15)
-        data = response.json()
-        props = data.get('properties', {})
+        if hedger:
+            # Health outcomes of both stations are recorded by the shared
+            # observation cache, as on the sequential path
+            winner, props, hedged = hedger.fetch(station_id, fallbacks, failed_stations)
+            if winner != station_id:
+                station_id, is_backup = winner, winner != config.get('primary_station')
+        elif health is not None:
+            # Fail over down the ranked candidates instead of giving up
+            candidates = [station_id] + fallbacks
+            for attempt, candidate in enumerate(candidates):
+                try:
+                    props = observations.get(candidate)
+                    break
+                except Exception:
+                    failed_stations.append(candidate)
+                    if attempt == len(candidates) - 1:
+                        raise
+            if candidate != station_id:
+                station_id, is_backup = candidate, candidate != config.get('primary_station')
+        else:
+            props = observations.get(station_id)
     except Exception as e:
         return {
             "location_code": location_code,
@@ -125,58 +437,37 @@ def collect_weather_data(location_code):
         }
     
     # Create comprehensive record
-    current_time = datetime.datetime.now()
-    record = {
-        "collection_timestamp": current_time.isoformat(),
-        "collection_date": current_time.strftime("%Y-%m-%d"),
-        "collection_time": current_time.strftime("%H:%M:%S"),
-        "location_code": location_code,
-        "location_name": config['location_name'],
-        "region": config['region'],
-        "station_id": station_id,
-        "is_backup_station": is_backup,
-        "station_status": "BACKUP" if is_backup else "PRIMARY",
-        "status": "SUCCESS",
-        "nws_timestamp": props.get('timestamp'),
-        "temperature_C": props.get('temperature', {}).get('value'),
-        "temperature_F": None,
-        "relative_humidity": props.get('relativeHumidity', {}).get('value'),
-        "wind_speed_kph": props.get('windSpeed', {}).get('value'),
-        "wind_speed_mph": None,
-        "text_description": props.get('textDescription'),
-        "barometric_pressure": props.get('barometricPressure', {}).get('value'),
-        "visibility": props.get('visibility', {}).get('value')
-    }
-    
-    # Convert units
-    if record["temperature_C"] is not None:
-        record["temperature_F"] = round((record["temperature_C"] * 9/5) + 32, 1)
-    
-    if record["wind_speed_kph"] is not None:
-        record["wind_speed_mph"] = round(record["wind_speed_kph"] * 0.621371, 1)
-    
-    # Polite delay before alerts API call
-    time.sleep(2)
-    
-    # Get weather alerts
-    alerts_url = get_alerts_url(location_code)
+    record = build_observation_record(location_code, config, station_id, is_backup, props)
+    record["hedged_request"] = hedged
+    if failed_stations:
+        record["failed_stations"] = failed_stations
+    if isinstance(observations, SubHourlyObservationCache):
+        record["observation_series"] = observations.series(station_id)
+    
+    # Get weather alerts (regional feed matched locally, falling back to a point query)
     try:
-        alerts_resp = requests.get(alerts_url, timeout=15)
-        alerts_data = alerts_resp.json()
+        features = area_alerts.alerts_for(config) if area_alerts else None
+        if features is None:
+            alerts_data = nws_get_json(get_alerts_url(location_code), timeout=15)
+            features = alerts_data.get("features", [])
         alerts = [alert.get("properties", {}).get("headline", "No details") 
-                 for alert in alerts_data.get("features", [])]
+                 for alert in features]
+        alert_ids = get_alert_registry().register(features)
     except Exception as e:
         alerts = [f"Error fetching alerts: {str(e)}"]
+        alert_ids = None
     
     record["alerts"] = alerts
+    if alert_ids is not None:
+        record["alert_ids"] = alert_ids
     record["alert_count"] = len(alerts)
     record["alerts_gps"] = config['alerts_gps']
     
     return record
 
-def create_consolidated_report(all_records):
+def create_consolidated_report(all_records, current_time=None):
     """Create a consolidated report with summary statistics"""
-    current_time = datetime.datetime.now()
+    current_time = current_time or datetime.datetime.now()
     
     # Calculate summary statistics
     successful_collections = [r for r in all_records if r.get('status') == 'SUCCESS']
@@ -199,37 +490,56 @@ def create_consolidated_report(all_records):
         "summary_statistics": {
             "locations_with_alerts": len([r for r in successful_collections if r.get('alert_count', 0) > 0]),
             "backup_stations_used": len([r for r in successful_collections if r.get('is_backup_station', False)]),
+            "unique_stations_used": len(set(r.get('station_id') for r in successful_collections)),
+            "hedged_requests": len([r for r in successful_collections if r.get('hedged_request')]),
             "unavailable_regions": list(set(r.get('region', 'Unknown') for r in failed_collections))
         }
     }
     
     return report
 
-def save_consolidated_report(report):
-    """Save consolidated report locally and to Google Drive with smart error handling"""
+def save_consolidated_report(report, upload=True):
+    """Save consolidated report locally and to Google Drive with smart error handling
+    
+    The report store is the local copy. A per-run report file is only
+    written when the Drive upload fails, so the bulk uploader (drive_uploader.py) can
+    upload it later. With upload=False the report is only stored; callers
+    saving many reports (observation_backfill.py) upload them afterwards
+    with one upload_consolidated_reports() call.
+    """
     # Always save locally first (this always works)
-    raw_dir = "../raw_weather_json"
-    os.makedirs(raw_dir, exist_ok=True)
+    store = get_report_store()
+    segment = store.append(report)
+    saved_path = os.path.join(store.path, segment)
     
-    timestamp = report['report_metadata']['collection_timestamp'].replace(':', '-').replace('.', '-')
-    filename = f"consolidated_weather_report_{timestamp}.json"
-    local_path = os.path.join(raw_dir, filename)
+    # Keep today's running per-center hazard totals current
+    try:
+        update_center_aggregates(report)
+    except Exception as e:
+        print(f" Could not update center aggregates: {e}")
     
-    # Save individual report
-    with open(local_path, "w") as f:
-        json.dump(report, f, separators=(',', ':'))
+    if upload:
+        kept = upload_consolidated_reports([report])
+        if kept:
+            saved_path = kept[0]
     
-    # Append to continuous log
-    log_path = os.path.join(raw_dir, "consolidated_weather_log.json")
-    with open(log_path, "a") as f:
-        json.dump(report, f, separators=(',', ':'))
-        f.write("\n")
+    return saved_path
+
+def upload_consolidated_reports(reports):
+    """Upload saved reports to Google Drive, signing in at most once
     
-    # Now try Google Drive upload with smart error handling
+    After a failure the remaining reports are not tried; a per-run file is
+    written for each report not uploaded. Returns the paths of those files.
+    """
+    uploaded = 0
     try:
         print(" Attempting Google Drive upload...")
-        drive_service = authenticate_google_drive()
-        upload_to_google_drive(drive_service, local_path, DRIVE_FOLDER_ID)
+        drive_service = get_drive_service()
+        for report in reports:
+            filename = report_filename(report['report_metadata']['collection_timestamp'])
+            if not upload_report_to_google_drive(drive_service, report, filename, DRIVE_FOLDER_ID):
+                raise RuntimeError("upload returned no file ID")
+            uploaded += 1
         print(" Successfully uploaded to Google Drive")
         
         # Check if we just restored auth (remove flag and notify)
@@ -245,6 +555,7 @@ def save_consolidated_report(report):
                 print(" Google Drive authentication restored (no notification system)")
         
     except Exception as e:
+        reset_drive_service()
         error_msg = str(e).lower()
         
         # Check if this is an authentication error
@@ -275,9 +586,16 @@ def save_consolidated_report(report):
         else:
             # Non-auth error (network, API limits, etc.)
             print(f"Google Drive upload failed (non-auth error): {e}")
-            print(" Data saved locally - will retry next hour")
-    
-    return local_path
+            print(" Data saved locally - drive_uploader.py will upload it later")
+    
+    # Keep a per-run file of each report not uploaded for the bulk uploader to retry
+    kept = []
+    for report in reports[uploaded:]:
+        os.makedirs(RAW_DIR, exist_ok=True)
+        kept.append(os.path.join(RAW_DIR, report_filename(report['report_metadata']['collection_timestamp'])))
+        with open(kept[-1], "w") as f:
+            json.dump(report, f, separators=(',', ':'))
+    return kept
 
 def print_collection_summary(report):
     """Print summary of collection results"""
@@ -307,8 +625,114 @@ def print_collection_summary(report):
         for location in locations_with_alerts:
             print(f"   • {location['location_name']}: {location['alert_count']} alert(s)")
 
-def main():
-    """Main function with auth status checking"""
+def probe_half_open_stations(locations, observations, health):
+    """Recheck configured stations whose circuit backoff has expired
+    
+    Stations already fetched this run are not fetched again; the probe
+    result is recorded in the health store by the observation cache.
+    """
+    station_ids = set()
+    for location_code in locations:
+        config = get_station_config(location_code) or {}
+        station_ids.update([config.get('primary_station')] + list(config.get('backup_stations', [])))
+    station_ids.discard(None)
+    
+    probed = 0
+    for station_id in sorted(station_ids):
+        if health.state(station_id) == HALF_OPEN:
+            try:
+                observations.get(station_id)
+            except Exception:
+                pass
+            probed += 1
+    return probed
+
+def collect_all_locations(locations, workers=DEFAULT_WORKERS, alert_mode=DEFAULT_ALERT_MODE,
+                          hedge=False, hedge_delay=None, hedge_percentile=DEFAULT_HEDGE_PERCENTILE,
+                          use_health=True, subhourly=False, use_rankings=True):
+    """Collect every location concurrently, returning records in location order
+    
+    Observations are fetched once per unique station and fanned out to
+    every location that uses it. With `hedge`, a slow station is raced
+    against the location's first backup after `hedge_delay` seconds (or
+    the `hedge_percentile` latency seen so far in the run). With
+    `use_health`, stations are chosen from the persistent health store.
+    With `subhourly`, every observation since the previous run is kept.
+    With `use_rankings` (and `use_health`), stations are tried in the order
+    of the table built by station_ranking.py, if there is one.
+    """
+    all_records = [None] * len(locations)
+    health = get_health_store() if use_health else None
+    rankings = load_station_rankings() if health and use_rankings else None
+    if rankings:
+        print(f" Using station rankings for {len(set(rankings) & set(locations))} location(s)")
+    latency = LatencyTracker()
+    if subhourly:
+        observations = SubHourlyObservationCache(load_previous_nws_timestamps(), latency, health)
+    else:
+        observations = StationObservationCache(latency, health)
+    hedger = ObservationHedger(observations, latency, hedge_delay, hedge_percentile,
+                               max_workers=2 * max(1, workers)) if hedge else None
+    if alert_mode == 'area':
+        area_alerts = AreaAlertMatcher()
+    elif alert_mode == 'zone':
+        area_alerts = ZoneAlertMatcher()
+    else:
+        area_alerts = None
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(collect_weather_data, location_code, observations, area_alerts, hedger, health,
+                                   rankings): i
+                   for i, location_code in enumerate(locations)}
+        
+        for completed, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            location_code = locations[i]
+            try:
+                record = future.result()
+                
+                # Status indicator
+                if record.get('status') == 'SUCCESS':
+                    status_icon = "✅"
+                elif 'UNAVAILABLE' in record.get('status', ''):
+                    status_icon = "🚫"
+                else:
+                    status_icon = "❌"
+                
+                print(f"[{completed}/{len(locations)}] {status_icon} {record.get('location_name', location_code)}")
+                
+            except Exception as e:
+                print(f"[{completed}/{len(locations)}] {location_code}: Unexpected error - {str(e)}")
+                record = {
+                    "location_code": location_code,
+                    "status": "SYSTEM_ERROR",
+                    "error_message": str(e),
+                    "collection_timestamp": datetime.datetime.now().isoformat()
+                }
+            
+            all_records[i] = record
+    
+    if health:
+        probed = probe_half_open_stations(locations, observations, health)
+        if probed:
+            print(f" Rechecked {probed} station(s) after their failure backoff")
+        try:
+            health.save()
+        except OSError as e:
+            print(f" Could not save station health: {e}")
+    
+    print(f" Fetched {observations.station_count()} unique stations for {len(locations)} locations")
+    if hedger:
+        hedger.shutdown()
+        print(f" Hedged {hedger.hedges_started} slow observation request(s) to backup stations")
+    if isinstance(area_alerts, AreaAlertMatcher):
+        print(f" Fetched alerts for {area_alerts.area_count()} area(s) instead of {len(locations)} point queries")
+    elif isinstance(area_alerts, ZoneAlertMatcher):
+        print(f" Fetched alerts for {area_alerts.zone_count()} zone(s) instead of {len(locations)} point queries")
+    return all_records
+
+def run_collection(args):
+    """Run one complete collection and save the consolidated report"""
     # Check if we need manual authentication
     auth_flag = "google_auth_needed.flag"
     if os.path.exists(auth_flag):
@@ -318,42 +742,32 @@ def main():
         print()
     
     print(f"  Starting consolidated weather collection...")
-    print(f"⏱  Using polite delays between API calls...")
+    print(f"⏱  Limiting api.weather.gov to {args.rate:g} requests/second (burst {args.burst}) across {args.workers} workers...")
     
     locations = get_all_locations()
-    all_records = []
     
     start_time = time.time()
     
-    for i, location_code in enumerate(locations, 1):
-        print(f"[{i}/{len(locations)}] ", end="")
-        try:
-            record = collect_weather_data(location_code)
-            all_records.append(record)
-            
-            # Status indicator
-            if record.get('status') == 'SUCCESS':
-                status_icon = "✅"
-            elif 'UNAVAILABLE' in record.get('status', ''):
-                status_icon = "🚫"
-            else:
-                status_icon = "❌"
-            
-            print(f"{status_icon} {record.get('location_name', location_code)}")
-            
-        except Exception as e:
-            print(f" {location_code}: Unexpected error - {str(e)}")
-            all_records.append({
-                "location_code": location_code,
-                "status": "SYSTEM_ERROR",
-                "error_message": str(e),
-                "collection_timestamp": datetime.datetime.now().isoformat()
-            })
+    all_records = collect_all_locations(locations, workers=args.workers, alert_mode=args.alerts_mode,
+                                        hedge=args.hedge, hedge_delay=args.hedge_delay,
+                                        hedge_percentile=args.hedge_percentile,
+                                        use_health=not args.ignore_station_health,
+                                        subhourly=args.subhourly,
+                                        use_rankings=not args.ignore_rankings)
+    
+    if args.compact_alerts:
+        for record in all_records:
+            compact_alerts(record)
     
     # Create and save consolidated report
     print(f"\n Creating consolidated report...")
     report = create_consolidated_report(all_records)
     saved_path = save_consolidated_report(report)
+    if args.delta_archive:
+        try:
+            get_delta_archive().append_report(report)
+        except Exception as e:
+            print(f" Could not add report to the delta archive: {e}")
     
     # Print summary
     print_collection_summary(report)
@@ -361,6 +775,143 @@ def main():
     elapsed_time = time.time() - start_time
     print(f"\n Collection complete! ({elapsed_time:.1f} seconds)")
     print(f" Report saved: {saved_path}")
+    
+    return report, saved_path
+
+def next_collection_time(now, jitter_seconds=DEFAULT_JITTER_SECONDS):
+    """Start of the next hour plus a random delay of up to jitter_seconds"""
+    next_hour = now.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+    return next_hour + datetime.timedelta(seconds=random.uniform(0, max(0, jitter_seconds)))
+
+def write_status(status, path=STATUS_FILE):
+    """Write the daemon status file for monitoring"""
+    try:
+        save_json_file(path, status)
+    except OSError as e:
+        print(f" Could not write status file: {e}")
+
+def run_daemon(args):
+    """Stay resident and collect once per hour until SIGINT or SIGTERM
+    
+    The HTTP session, Drive credentials, station health and zone caches
+    stay warm between runs instead of being rebuilt by cron every hour.
+    """
+    stop = threading.Event()
+    
+    def request_stop(signum, frame):
+        print(f"\n Received signal {signum} - stopping after the current step")
+        stop.set()
+    
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    
+    status = {
+        "state": "starting",
+        "pid": os.getpid(),
+        "daemon_started": datetime.datetime.now().isoformat(),
+        "runs_completed": 0,
+        "runs_failed": 0,
+        "last_run_started": None,
+        "last_run_finished": None,
+        "last_run_duration_seconds": None,
+        "last_run_successful_collections": None,
+        "last_run_total_locations": None,
+        "last_report": None,
+        "last_error": None,
+        "next_run": None
+    }
+    
+    print(f" Collector daemon started (pid {os.getpid()}), status in {STATUS_FILE}")
+    
+    while not stop.is_set():
+        next_run = next_collection_time(datetime.datetime.now(), args.jitter)
+        status.update({"state": "waiting", "next_run": next_run.isoformat()})
+        write_status(status)
+        print(f" Next collection at {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        if stop.wait(max(0, (next_run - datetime.datetime.now()).total_seconds())):
+            break
+        
+        started = datetime.datetime.now()
+        status.update({"state": "collecting", "last_run_started": started.isoformat(), "next_run": None})
+        write_status(status)
+        
+        try:
+            report, saved_path = run_collection(args)
+            metadata = report['report_metadata']
+            status.update({
+                "runs_completed": status["runs_completed"] + 1,
+                "last_run_successful_collections": metadata['successful_collections'],
+                "last_run_total_locations": metadata['total_locations'],
+                "last_report": saved_path,
+                "last_error": None
+            })
+        except Exception as e:
+            print(f" Collection run failed: {e}")
+            status.update({"runs_failed": status["runs_failed"] + 1, "last_error": str(e)})
+        
+        finished = datetime.datetime.now()
+        status.update({
+            "last_run_finished": finished.isoformat(),
+            "last_run_duration_seconds": round((finished - started).total_seconds(), 1)
+        })
+    
+    status.update({"state": "stopped", "next_run": None, "stopped_at": datetime.datetime.now().isoformat()})
+    write_status(status)
+    print(" Collector daemon stopped")
+
+def main():
+    """Main function with auth status checking"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Collect hourly weather data for all configured locations')
+    parser.add_argument('--config', help='JSON configuration file from station_finder.py --bulk (default: configuration.py)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                       help=f'Locations to collect at the same time (default: {DEFAULT_WORKERS}, 1 = one at a time)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                       help=f'Maximum api.weather.gov requests per second (default: {DEFAULT_REQUESTS_PER_SECOND})')
+    parser.add_argument('--burst', type=int, default=DEFAULT_BURST,
+                       help=f'Requests allowed back-to-back before the rate applies (default: {DEFAULT_BURST})')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                       help=f'Keep-alive connections to api.weather.gov (default: {DEFAULT_POOL_SIZE})')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                       help=f'Retries for transient API errors (default: {DEFAULT_RETRIES})')
+    parser.add_argument('--hedge', action='store_true',
+                       help='Race the first backup station when the chosen station is slow to answer')
+    parser.add_argument('--hedge-delay', type=float, default=None,
+                       help='Seconds to wait before hedging (default: the --hedge-percentile latency so far)')
+    parser.add_argument('--hedge-percentile', type=float, default=DEFAULT_HEDGE_PERCENTILE,
+                       help=f'Latency percentile used as the hedging budget (default: {DEFAULT_HEDGE_PERCENTILE})')
+    parser.add_argument('--ignore-station-health', action='store_true',
+                       help='Choose stations with configuration.get_working_station instead of recorded station health')
+    parser.add_argument('--ignore-rankings', action='store_true',
+                       help='Try stations in configured order even if station_ranking.py has built a ranking table')
+    parser.add_argument('--alerts-mode', choices=ALERT_MODES, default=DEFAULT_ALERT_MODE,
+                       help='point: one alert query per location; area: one query per state; zone: one query per unique zone')
+    parser.add_argument('--compact-alerts', action='store_true',
+                       help='Store only alert IDs in each record; headlines stay in the alert registry')
+    parser.add_argument('--subhourly', action='store_true',
+                       help='Also keep every observation since the previous run (same number of requests)')
+    parser.add_argument('--delta-archive', action='store_true',
+                       help='Also add each report to the delta archive (see delta_archive.py)')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Stay running and collect at the start of every hour (use instead of cron)')
+    parser.add_argument('--jitter', type=float, default=DEFAULT_JITTER_SECONDS,
+                       help=f'Daemon mode: random delay after the hour in seconds (default: {DEFAULT_JITTER_SECONDS})')
+    
+    args = parser.parse_args()
+    
+    configure_rate_limit(args.rate, args.burst)
+    configure_session(max(args.pool_size, args.workers), args.retries)
+    
+    if args.config:
+        use_facility_config(args.config)
+        print(f" Using {len(get_all_locations())} locations from {args.config}")
+    
+    if args.daemon:
+        run_daemon(args)
+    else:
+        run_collection(args)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# zone_cache.py
+# On-disk cache of which NWS forecast zone and county each location falls in
+
+import datetime
+import os
+import threading
+
+from nws_client import CACHE_DIR, NWS_API_BASE, load_json_file, nws_get, save_json_file
+
+ZONE_CACHE_FILE = os.path.join(CACHE_DIR, "zone_cache.json")
+
+# Zone boundaries almost never change, so resolve each point about once a month
+ZONE_CACHE_TTL_DAYS = 30
+
+def zone_id_from_url(url):
+    """Turn a zone URL such as .../zones/forecast/FLZ173 into FLZ173"""
+    return url.rstrip('/').rsplit('/', 1)[-1] if url else None
+
+def resolve_point_zones(lat, lon):
+    """Look up the forecast zone, county and fire weather zone for a point"""
+    response = nws_get(f"{NWS_API_BASE}/points/{lat},{lon}", timeout=15)
+    response.raise_for_status()
+    props = response.json().get('properties', {})
+
+    return {
+        'forecast': zone_id_from_url(props.get('forecastZone')),
+        'county': zone_id_from_url(props.get('county')),
+        'fire': zone_id_from_url(props.get('fireWeatherZone'))
+    }
+
+class ZoneCache:
+    """Persistent point -> zone ID mapping, refreshed on a long TTL"""
+
+    def __init__(self, path=ZONE_CACHE_FILE, ttl_days=ZONE_CACHE_TTL_DAYS):
+        self.path = path
+        self.ttl = datetime.timedelta(days=ttl_days)
+        self._lock = threading.Lock()
+        self._points = load_json_file(path, {}).get('points', {})
+
+    @staticmethod
+    def _key(lat, lon):
+        return f"{round(lat, 4)},{round(lon, 4)}"
+
+    def _is_fresh(self, entry):
+        try:
+            resolved_at = datetime.datetime.fromisoformat(entry['resolved_at'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return datetime.datetime.now() - resolved_at < self.ttl
+
+    def get_zones(self, lat, lon):
+        """Return {'forecast', 'county', 'fire'} zone IDs for a point
+
+        Resolves through /points on a miss or when the entry is older than
+        the TTL. A stale entry is still used if the refresh fails.
+        """
+        key = self._key(lat, lon)
+        with self._lock:
+            entry = self._points.get(key)
+        if entry and self._is_fresh(entry):
+            return entry['zones']
+
+        try:
+            zones = resolve_point_zones(*key.split(','))
+        except Exception:
+            if entry:
+                return entry['zones']
+            raise
+
+        with self._lock:
+            self._points[key] = {
+                'zones': zones,
+                'resolved_at': datetime.datetime.now().isoformat()
+            }
+            save_json_file(self.path, {'points': self._points})
+        return zones
+
+    def get_zone_ids(self, lat, lon):
+        """Return the non-empty zone IDs for a point as a list"""
+        return [zone_id for zone_id in self.get_zones(lat, lon).values() if zone_id]
+
+_zone_cache = None
+_zone_cache_lock = threading.Lock()
+
+def get_zone_cache():
+    """Return the process-wide zone cache, loading it on first use"""
+    global _zone_cache
+    with _zone_cache_lock:
+        if _zone_cache is None:
+            _zone_cache = ZoneCache()
+        return _zone_cache